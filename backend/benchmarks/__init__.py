@@ -0,0 +1 @@
+"""Seeded performance benchmarks for the backend; run with ``python -m benchmarks``."""
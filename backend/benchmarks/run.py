@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import argparse
+from collections.abc import Sequence
+from datetime import UTC, datetime
+import json
+import os
+from pathlib import Path
+import platform
+import sqlite3
+import sys
+import tempfile
+from typing import Any
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+LAYERS = ('service', 'asgi')
+SESSION_ID = 'bench-session'
+DEFAULT_TOLERANCE = 0.2
+
+
+def run_benchmarks(
+    memories: int,
+    themes: int,
+    iterations: int,
+    warmup: int = 5,
+    seed: int = 0,
+    layers: Sequence[str] = LAYERS,
+) -> dict[str, Any]:
+    """Seed one session into the configured database and time every scenario.
+
+    ``TIMELINE_DB_PATH`` must already point at the database to use, since ``src``
+    binds its engines on import.
+    """
+    import anyio
+    import httpx
+
+    from benchmarks.scenarios import Workload, asgi_scenarios, service_scenarios
+    from benchmarks.seed import seed_session
+    from benchmarks.stats import measure, measure_async
+    from src.db import SQLITE_PROFILE, engine_for, init_db
+    from src.main import app
+
+    init_db()
+    engine = engine_for(SESSION_ID)
+    seed_session(engine, SESSION_ID, memories, themes, seed)
+    workload = Workload(engine, SESSION_ID, seed)
+    results: dict[str, Any] = {}
+    if 'service' in layers:
+        for scenario in service_scenarios(workload):
+            result = measure(scenario.run, iterations, warmup, scenario.before)
+            results[f'service.{scenario.name}'] = result.to_json()
+
+    async def run_asgi() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            for scenario in asgi_scenarios(workload, client):
+                result = await measure_async(scenario.run, iterations, warmup, scenario.before)
+                results[f'asgi.{scenario.name}'] = result.to_json()
+
+    if 'asgi' in layers:
+        anyio.run(run_asgi)
+    return {
+        'meta': {
+            'memories': memories,
+            'themes': themes,
+            'seed': seed,
+            'iterations': iterations,
+            'warmup': warmup,
+            'db_profile': SQLITE_PROFILE.name,
+            'db_async': os.getenv('TIMELINE_DB_ASYNC', '1'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'created_at': datetime.now(UTC).isoformat(),
+        },
+        'results': results,
+    }
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Time the backend against a seeded session.')
+    parser.add_argument('--size', choices=sorted(SIZES), default='1k', help='memories to seed (default: 1k)')
+    parser.add_argument('--memories', type=int, help='exact memory count; overrides --size')
+    parser.add_argument('--themes', type=int, help='theme count (default: a tenth of the memories)')
+    parser.add_argument('--iterations', type=int, default=50, help='timed samples per scenario (default: 50)')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed samples per scenario (default: 5)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for data and requests (default: 0)')
+    parser.add_argument('--layer', choices=LAYERS, action='append', help='only run this layer (repeatable)')
+    parser.add_argument('--db', type=Path, help='keep the seeded database at this new path instead of a temp dir')
+    parser.add_argument('--out', type=Path, help='write the results JSON here')
+    parser.add_argument('--baseline', type=Path, help='compare against a previous results JSON')
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help='allowed p50/p95 slowdown against the baseline (default: 0.2 = 20%%)',
+    )
+    args = parser.parse_args(argv)
+    if args.iterations < 1:
+        parser.error('--iterations must be >= 1')
+    if args.db is not None and args.db.exists():
+        parser.error(f'{args.db} already exists; benchmarks always seed a fresh database')
+    return args
+
+
+def _print_results(results: dict[str, dict[str, float]]) -> None:
+    width = max(len(name) for name in results)
+    print(f'{"scenario":<{width}}  {"p50 ms":>10}  {"p95 ms":>10}  {"p99 ms":>10}  {"rows/s":>12}')
+    for name, result in results.items():
+        print(
+            f'{name:<{width}}  {result["p50_ms"]:>10.3f}  {result["p95_ms"]:>10.3f}'
+            f'  {result["p99_ms"]:>10.3f}  {result["rows_per_sec"]:>12.1f}'
+        )
+
+
+def _check_baseline(report: dict[str, Any], path: Path, tolerance: float) -> int:
+    from benchmarks.stats import compare
+
+    baseline = json.loads(path.read_text())
+    for key in ('memories', 'themes'):
+        if baseline['meta'][key] != report['meta'][key]:
+            print(
+                f'baseline {path} was recorded with {key}={baseline["meta"][key]}, '
+                f'this run used {report["meta"][key]}',
+                file=sys.stderr,
+            )
+            return 2
+    regressions = compare(report['results'], baseline['results'], tolerance)
+    for regression in regressions:
+        print(
+            f'REGRESSION {regression.scenario} {regression.metric}: '
+            f'{regression.baseline:.3f} -> {regression.current:.3f} ms ({regression.ratio:.2f}x)'
+        )
+    if not regressions:
+        print(f'no regressions against {path} (tolerance {tolerance:.0%})')
+    return 1 if regressions else 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parse_args(argv)
+    memories = args.memories if args.memories is not None else SIZES[args.size]
+    themes = args.themes if args.themes is not None else memories // 10
+    with tempfile.TemporaryDirectory(prefix='timeline-bench-') as scratch:
+        os.environ['TIMELINE_DB_PATH'] = str(args.db or Path(scratch) / 'bench.db')
+        report = run_benchmarks(memories, themes, args.iterations, args.warmup, args.seed, args.layer or LAYERS)
+    _print_results(report['results'])
+    if args.out is not None:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2) + '\n')
+    if args.baseline is not None:
+        return _check_baseline(report, args.baseline, args.tolerance)
+    return 0
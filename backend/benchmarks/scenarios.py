@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import random
+from typing import Any
+
+import httpx
+from sqlalchemy import Engine, text
+from sqlmodel import Session
+
+from benchmarks.seed import EPOCH, SPAN, TAGS, WORDS
+from src.models.memory_schemas import MemoryBatchRequest, MemoryCreateRequest, MemoryUpdateRequest
+from src.models.theme_schemas import ThemeCreateRequest, ThemeUpdateRequest
+from src.services.memory_service import MemoryService
+from src.services.payload_cache import payload_cache
+from src.services.theme_layout import compute_layout
+from src.services.theme_service import ThemeService
+
+PAGE_SIZE = 500
+BATCH_OPERATIONS = 100
+MEMORY_WINDOW = timedelta(days=1)
+THEME_WINDOW = timedelta(days=7)
+# Ids sampled from the seeded session for patch scenarios.
+ID_SAMPLE = 10_000
+# Themes spanning the same week in separate rows: none overlap vertically, so the
+# layout sweep has nothing to report and should stay near O(n log n).
+STACKED_THEMES = 2_000
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """``run`` returns (or, for ASGI scenarios, resolves to) the number of rows it touched."""
+
+    name: str
+    run: Callable[[], Any]
+    # Untimed setup ahead of every sample, e.g. creating the row a delete removes.
+    before: Callable[[], Any] | None = None
+
+
+class Workload:
+    """Shared state and request builders for one seeded session."""
+
+    def __init__(self, engine: Engine, session_id: str, seed: int = 0) -> None:
+        self.engine = engine
+        self.session_id = session_id
+        self.rng = random.Random(seed + 1)
+        with engine.connect() as connection:
+            self.memory_ids = self._sample_ids(connection, 'memory')
+            self.theme_ids = self._sample_ids(connection, 'theme')
+
+    def _sample_ids(self, connection: Any, table: str) -> list[str]:
+        rows = connection.execute(
+            text(f'SELECT id FROM {table} WHERE session_id = :session_id LIMIT :limit'),
+            {'session_id': self.session_id, 'limit': ID_SAMPLE},
+        )
+        return [str(row[0]) for row in rows]
+
+    def timestamp(self, window: timedelta = timedelta(0)) -> datetime:
+        return EPOCH + timedelta(seconds=self.rng.uniform(0, (SPAN - window).total_seconds()))
+
+    def window(self, size: timedelta) -> tuple[datetime, datetime]:
+        start = self.timestamp(size)
+        return start, start + size
+
+    def title(self) -> str:
+        return ' '.join(self.rng.choice(WORDS) for _ in range(3)).capitalize()
+
+    def memory_payload(self) -> dict[str, Any]:
+        if self.rng.random() < 0.5:
+            anchor: dict[str, Any] = {'type': 'point', 'timestamp': self.timestamp().isoformat() + 'Z'}
+        else:
+            start, end = self.window(timedelta(hours=self.rng.uniform(1, 72)))
+            anchor = {'type': 'range', 'start': start.isoformat() + 'Z', 'end': end.isoformat() + 'Z'}
+        return {'anchor': anchor, 'title': self.title(), 'tags': self.rng.sample(TAGS, 2)}
+
+    def theme_payload(self) -> dict[str, Any]:
+        start, end = self.window(timedelta(days=self.rng.uniform(1, 14)))
+        top = self.rng.randrange(0, 480, 4)
+        return {
+            'startTime': start.isoformat() + 'Z',
+            'endTime': end.isoformat() + 'Z',
+            'title': self.title(),
+            'tags': self.rng.sample(TAGS, 1),
+            'color': '#3b82f6',
+            'opacity': 0.25,
+            'priority': self.rng.randrange(0, 1001, 10),
+            'topPx': top,
+            'bottomPx': top + 96,
+        }
+
+    def batch_payload(self) -> dict[str, Any]:
+        """Half creates, half patches of seeded memories."""
+        operations = []
+        for index in range(BATCH_OPERATIONS):
+            if index % 2 == 0:
+                operations.append({'op': 'create', 'memory': self.memory_payload()})
+            else:
+                operations.append(
+                    {'op': 'patch', 'id': self.rng.choice(self.memory_ids), 'memory': {'title': self.title()}}
+                )
+        return {'operations': operations}
+
+
+def stacked_theme_rows(count: int = STACKED_THEMES) -> list[tuple[str, datetime, datetime, float, float]]:
+    end = EPOCH + THEME_WINDOW
+    return [
+        (f'stacked-{index}', EPOCH + timedelta(hours=index % 24), end, index * 100.0, index * 100.0 + 96)
+        for index in range(count)
+    ]
+
+
+def _rows(body: bytes) -> int:
+    # Every memory, theme and layout entry carries exactly one "id" key.
+    return body.count(b'"id":')
+
+
+def service_scenarios(workload: Workload) -> list[Scenario]:
+    """Call the services directly, one database session per call as the routes do."""
+    session_id = workload.session_id
+    cursors: dict[str, str | None] = {'memories': None, 'themes': None}
+    pending_memories: list[str] = []
+    pending_themes: list[str] = []
+
+    def memories(call: Callable[[MemoryService], Any]) -> Any:
+        with Session(workload.engine) as session:
+            return call(MemoryService(session))
+
+    def themes(call: Callable[[ThemeService], Any]) -> Any:
+        with Session(workload.engine) as session:
+            return call(ThemeService(session))
+
+    def memory_page() -> int:
+        body, cursors['memories'] = memories(
+            lambda service: service.list_memories_json(session_id, after=cursors['memories'], limit=PAGE_SIZE)
+        )
+        return _rows(body)
+
+    def memory_window() -> int:
+        start, end = workload.window(MEMORY_WINDOW)
+        body, _ = memories(lambda service: service.list_memories_json(session_id, start, end))
+        return _rows(body)
+
+    def theme_page() -> int:
+        body, cursors['themes'] = themes(
+            lambda service: service.list_themes_json(session_id, after=cursors['themes'], limit=PAGE_SIZE)
+        )
+        return _rows(body)
+
+    def theme_viewport() -> int:
+        start, end = workload.window(THEME_WINDOW)
+        return len(themes(lambda service: service.list_themes_in_viewport(session_id, start, end)).themes)
+
+    def theme_layout() -> int:
+        start, end = workload.window(THEME_WINDOW)
+        return _rows(themes(lambda service: service.get_layout(session_id, start, end)))
+
+    stacked = stacked_theme_rows()
+
+    def theme_layout_stacked() -> int:
+        return len(compute_layout(stacked, EPOCH, EPOCH + THEME_WINDOW))
+
+    def create_memory() -> int:
+        payload = MemoryCreateRequest.model_validate(workload.memory_payload())
+        memories(lambda service: service.create_memory(session_id, payload))
+        return 1
+
+    def stage_memory() -> None:
+        payload = MemoryCreateRequest.model_validate(workload.memory_payload())
+        pending_memories.append(memories(lambda service: service.create_memory(session_id, payload)).id)
+
+    def patch_memory() -> int:
+        payload = MemoryUpdateRequest(title=workload.title())
+        memories(lambda service: service.update_memory(session_id, workload.rng.choice(workload.memory_ids), payload))
+        return 1
+
+    def delete_memory() -> int:
+        memory_id = pending_memories.pop()
+        memories(lambda service: service.delete_memory(session_id, memory_id))
+        return 1
+
+    def batch() -> int:
+        payload = MemoryBatchRequest.model_validate(workload.batch_payload())
+        return len(memories(lambda service: service.apply_batch(session_id, payload)).results)
+
+    def create_theme() -> int:
+        payload = ThemeCreateRequest.model_validate(workload.theme_payload())
+        themes(lambda service: service.create_theme(session_id, payload))
+        return 1
+
+    def stage_theme() -> None:
+        payload = ThemeCreateRequest.model_validate(workload.theme_payload())
+        pending_themes.append(themes(lambda service: service.create_theme(session_id, payload)).id)
+
+    def patch_theme() -> int:
+        payload = ThemeUpdateRequest(title=workload.title())
+        themes(lambda service: service.update_theme(session_id, workload.rng.choice(workload.theme_ids), payload))
+        return 1
+
+    def delete_theme() -> int:
+        theme_id = pending_themes.pop()
+        themes(lambda service: service.delete_theme(session_id, theme_id))
+        return 1
+
+    return [
+        Scenario('memories.list.page', memory_page),
+        Scenario('memories.list.window', memory_window),
+        Scenario('themes.list.page', theme_page),
+        Scenario('themes.viewport', theme_viewport),
+        Scenario('themes.layout', theme_layout),
+        Scenario('themes.layout.stacked', theme_layout_stacked),
+        Scenario('memories.create', create_memory),
+        Scenario('memories.patch', patch_memory),
+        Scenario('memories.delete', delete_memory, before=stage_memory),
+        Scenario('memories.batch', batch),
+        Scenario('themes.create', create_theme),
+        Scenario('themes.patch', patch_theme),
+        Scenario('themes.delete', delete_theme, before=stage_theme),
+    ]
+
+
+def asgi_scenarios(workload: Workload, client: httpx.AsyncClient) -> list[Scenario]:
+    """Drive the app in-process over ASGI, so routing, validation and encoding are included.
+
+    List scenarios clear the payload cache before each request to measure the query
+    path; ``memories.list.cached`` repeats one request to measure a cache hit.
+    """
+    memories_url = f'/api/v1/sessions/{workload.session_id}/memories'
+    themes_url = f'/api/v1/sessions/{workload.session_id}/themes'
+    cursors: dict[str, str | None] = {'memories': None, 'themes': None}
+    pending_memories: list[str] = []
+    pending_themes: list[str] = []
+
+    async def request(method: str, url: str, **kwargs: Any) -> httpx.Response:
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def window_params(size: timedelta) -> dict[str, str]:
+        start, end = workload.window(size)
+        return {'from': start.isoformat() + 'Z', 'to': end.isoformat() + 'Z'}
+
+    async def page(kind: str, url: str) -> int:
+        params: dict[str, Any] = {'limit': PAGE_SIZE}
+        if cursors[kind] is not None:
+            params['after'] = cursors[kind]
+        response = await request('GET', url, params=params)
+        cursors[kind] = response.headers.get('x-next-cursor')
+        return _rows(response.content)
+
+    async def memory_page() -> int:
+        return await page('memories', memories_url)
+
+    async def memory_window() -> int:
+        return _rows((await request('GET', memories_url, params=window_params(MEMORY_WINDOW))).content)
+
+    async def memory_cached() -> int:
+        return _rows((await request('GET', memories_url, params={'limit': PAGE_SIZE})).content)
+
+    async def theme_page() -> int:
+        return await page('themes', themes_url)
+
+    async def theme_viewport() -> int:
+        return _rows((await request('GET', f'{themes_url}/viewport', params=window_params(THEME_WINDOW))).content)
+
+    async def theme_layout() -> int:
+        return _rows((await request('GET', f'{themes_url}/layout', params=window_params(THEME_WINDOW))).content)
+
+    async def create_memory() -> int:
+        await request('POST', memories_url, json=workload.memory_payload())
+        return 1
+
+    async def stage_memory() -> None:
+        pending_memories.append((await request('POST', memories_url, json=workload.memory_payload())).json()['id'])
+
+    async def patch_memory() -> int:
+        memory_id = workload.rng.choice(workload.memory_ids)
+        await request('PATCH', f'{memories_url}/{memory_id}', json={'title': workload.title()})
+        return 1
+
+    async def delete_memory() -> int:
+        await request('DELETE', f'{memories_url}/{pending_memories.pop()}')
+        return 1
+
+    async def batch() -> int:
+        return len((await request('POST', f'{memories_url}:batch', json=workload.batch_payload())).json()['results'])
+
+    async def create_theme() -> int:
+        await request('POST', themes_url, json=workload.theme_payload())
+        return 1
+
+    async def stage_theme() -> None:
+        pending_themes.append((await request('POST', themes_url, json=workload.theme_payload())).json()['id'])
+
+    async def patch_theme() -> int:
+        theme_id = workload.rng.choice(workload.theme_ids)
+        await request('PATCH', f'{themes_url}/{theme_id}', json={'title': workload.title()})
+        return 1
+
+    async def delete_theme() -> int:
+        await request('DELETE', f'{themes_url}/{pending_themes.pop()}')
+        return 1
+
+    return [
+        Scenario('memories.list.page', memory_page, before=payload_cache.clear),
+        Scenario('memories.list.window', memory_window, before=payload_cache.clear),
+        Scenario('memories.list.cached', memory_cached),
+        Scenario('themes.list.page', theme_page, before=payload_cache.clear),
+        Scenario('themes.viewport', theme_viewport, before=payload_cache.clear),
+        Scenario('themes.layout', theme_layout, before=payload_cache.clear),
+        Scenario('memories.create', create_memory),
+        Scenario('memories.patch', patch_memory),
+        Scenario('memories.delete', delete_memory, before=stage_memory),
+        Scenario('memories.batch', batch),
+        Scenario('themes.create', create_theme),
+        Scenario('themes.patch', patch_theme),
+        Scenario('themes.delete', delete_theme, before=stage_theme),
+    ]
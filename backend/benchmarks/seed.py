@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from itertools import islice
+import random
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from src.models.memory import AnchorType, Memory
+from src.models.theme import Theme
+from src.repositories.histogram_repository import HistogramRepository
+from src.repositories.search_repository import SearchRepository
+from src.repositories.session_repository import SessionRepository
+from src.repositories.tag_repository import TagRepository
+from src.repositories.theme_spatial_index import rebuild_theme_rtree
+
+# Seeded rows spread over one year; stored datetimes are naive UTC like the app writes them.
+EPOCH = datetime(2026, 1, 1)
+SPAN = timedelta(days=365)
+INSERT_CHUNK = 10_000
+TAGS = ('family', 'work', 'travel', 'health', 'friends', 'music', 'school', 'home', 'sport', 'food')
+WORDS = (
+    'morning', 'trip', 'dinner', 'meeting', 'concert', 'hike', 'birthday', 'launch',
+    'garden', 'museum', 'review', 'lake', 'market', 'visit', 'project', 'weekend',
+)
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(UUID(int=rng.getrandbits(128), version=4))
+
+
+def _title(rng: random.Random) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(3)).capitalize()
+
+
+def _tags_json(rng: random.Random) -> str:
+    tags = rng.sample(TAGS, rng.randint(0, 3))
+    return '[' + ','.join(f'"{tag}"' for tag in tags) + ']'
+
+
+def memory_rows(session_id: str, count: int, version: int, rng: random.Random) -> Iterator[dict[str, Any]]:
+    """Half point and half range anchors; ranges last from an hour to two weeks."""
+    span = SPAN.total_seconds()
+    for index in range(count):
+        at = EPOCH + timedelta(seconds=rng.uniform(0, span))
+        row = {
+            'id': _uuid(rng),
+            'session_id': session_id,
+            'title': _title(rng),
+            'description': f'Seeded memory {index}' if index % 4 == 0 else None,
+            'tags_json': _tags_json(rng),
+            'vertical_ratio': round(rng.uniform(0.05, 0.95), 4),
+            'version': version,
+            'created_at': at,
+            'updated_at': at,
+        }
+        if index % 2 == 0:
+            row.update(anchor_type=AnchorType.POINT, timestamp=at, range_start=None, range_end=None)
+        else:
+            end = at + timedelta(hours=rng.uniform(1, 24 * 14))
+            row.update(anchor_type=AnchorType.RANGE, timestamp=None, range_start=at, range_end=end)
+        yield row
+
+
+def theme_rows(session_id: str, count: int, version: int, rng: random.Random) -> Iterator[dict[str, Any]]:
+    span = SPAN.total_seconds()
+    for index in range(count):
+        start = EPOCH + timedelta(seconds=rng.uniform(0, span))
+        top = float(rng.randrange(0, 480, 4))
+        bottom = top + rng.randrange(24, 200, 4)
+        yield {
+            'id': _uuid(rng),
+            'session_id': session_id,
+            'start_time': start,
+            'end_time': start + timedelta(days=rng.uniform(0.5, 30)),
+            'title': _title(rng),
+            'abbreviated_title': None,
+            'description': f'Seeded theme {index}' if index % 4 == 0 else None,
+            'tags_json': _tags_json(rng),
+            'color': '#3b82f6',
+            'opacity': 0.25,
+            'priority': rng.randrange(0, 1001, 10),
+            'height_px': bottom - top,
+            'top_px': top,
+            'bottom_px': bottom,
+            'version': version,
+            'created_at': start,
+            'updated_at': start,
+        }
+
+
+def _insert(session: Session, table: Any, rows: Iterator[dict[str, Any]]) -> None:
+    while chunk := list(islice(rows, INSERT_CHUNK)):
+        session.execute(table.insert(), chunk)
+
+
+def seed_session(engine: Engine, session_id: str, memories: int, themes: int, seed: int = 0) -> int:
+    """Bulk insert a deterministic session, then rebuild the derived indexes once.
+
+    Going through the repositories would sync the histogram, tag, search and R*Tree
+    indexes row by row, which takes hours at a million rows. Returns the session
+    version the rows were written at.
+    """
+    rng = random.Random(seed)
+    with Session(engine) as session:
+        version = SessionRepository(session).bump_version(session_id)
+        _insert(session, Memory.__table__, memory_rows(session_id, memories, version, rng))
+        _insert(session, Theme.__table__, theme_rows(session_id, themes, version, rng))
+        HistogramRepository(session).rebuild()
+        TagRepository(session).rebuild()
+        SearchRepository(session).rebuild()
+        rebuild_theme_rtree(session.connection())
+        session.commit()
+    return version
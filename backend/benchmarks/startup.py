@@ -0,0 +1,134 @@
+"""Time a cold worker boot: importing ``src.main``, the lifespan startup and the first request.
+
+Run with ``python -m benchmarks.startup``. Every sample is a fresh interpreter, so
+module import costs are paid each time just as when a new worker comes up.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Sequence
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+from typing import Any
+
+from benchmarks.stats import percentile
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+PROBE_PATH = '/api/v1/sessions/startup-probe/memories'
+PHASES = ('import_ms', 'startup_ms', 'first_request_ms', 'ready_ms')
+DEFAULT_RUNS = 5
+DEFAULT_IMPORT_BUDGET_MS = 2500.0
+DEFAULT_READY_BUDGET_MS = 3000.0
+
+
+def _probe() -> dict[str, float]:
+    """One boot, timed from inside the fresh interpreter."""
+    # The test client stands in for the ASGI server; it only needs Starlette and
+    # httpx, so loading it first keeps FastAPI's own import inside the timing.
+    from starlette.testclient import TestClient
+
+    started = perf_counter()
+    from src.main import app
+
+    imported = perf_counter()
+    with TestClient(app) as client:
+        ready = perf_counter()
+        response = client.get(PROBE_PATH)
+        answered = perf_counter()
+    response.raise_for_status()
+    return {
+        'import_ms': (imported - started) * 1000,
+        'startup_ms': (ready - imported) * 1000,
+        'first_request_ms': (answered - ready) * 1000,
+        'ready_ms': (answered - started) * 1000,
+    }
+
+
+def run_probe(db_path: Path) -> dict[str, float]:
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.startup', '--probe'],
+        cwd=BACKEND_ROOT,
+        env={**os.environ, 'TIMELINE_DB_PATH': str(db_path)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_startup(db_path: Path, runs: int, warmup: bool = True) -> dict[str, dict[str, float]]:
+    """p50 and max of each phase over ``runs`` boots against ``db_path``.
+
+    The warm-up boot creates and migrates the database and writes bytecode caches,
+    so the timed boots measure a worker joining an already running deployment.
+    """
+    if warmup:
+        run_probe(db_path)
+    samples = [run_probe(db_path) for _ in range(runs)]
+    report = {}
+    for phase in PHASES:
+        ordered = sorted(sample[phase] for sample in samples)
+        report[phase] = {'p50': round(percentile(ordered, 0.5), 1), 'max': round(ordered[-1], 1)}
+    return report
+
+
+def over_budget(report: dict[str, dict[str, float]], budgets: dict[str, float]) -> list[str]:
+    """Phases whose median exceeds their budget, as readable lines."""
+    return [
+        f'{phase} p50 {report[phase]["p50"]:.1f} ms exceeds the {budget:.0f} ms budget'
+        for phase, budget in budgets.items()
+        if report[phase]['p50'] > budget
+    ]
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.startup', description='Time backend import and time to first request.'
+    )
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help=f'timed boots (default: {DEFAULT_RUNS})')
+    parser.add_argument(
+        '--import-budget-ms',
+        type=float,
+        default=DEFAULT_IMPORT_BUDGET_MS,
+        help=f'fail when the median import of src.main takes longer (default: {DEFAULT_IMPORT_BUDGET_MS:.0f})',
+    )
+    parser.add_argument(
+        '--ready-budget-ms',
+        type=float,
+        default=DEFAULT_READY_BUDGET_MS,
+        help=f'fail when the median time to first response is longer (default: {DEFAULT_READY_BUDGET_MS:.0f})',
+    )
+    parser.add_argument('--out', type=Path, help='write the results JSON here')
+    parser.add_argument('--probe', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.runs < 1:
+        parser.error('--runs must be >= 1')
+    return args
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parse_args(argv)
+    if args.probe:
+        print(json.dumps(_probe()))
+        return 0
+    with tempfile.TemporaryDirectory(prefix='timeline-startup-') as scratch:
+        report: dict[str, Any] = measure_startup(Path(scratch) / 'startup.db', args.runs)
+    for phase in PHASES:
+        print(f'{phase:<18}  p50 {report[phase]["p50"]:>8.1f}  max {report[phase]["max"]:>8.1f}')
+    if args.out is not None:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2) + '\n')
+    failures = over_budget(report, {'import_ms': args.import_budget_ms, 'ready_ms': args.ready_budget_ms})
+    for failure in failures:
+        print(f'OVER BUDGET {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from dataclasses import asdict, dataclass
+import inspect
+import math
+import time
+from typing import Any
+
+# Tail percentiles are noisy on short runs, so regressions are judged on p50 and p95.
+COMPARED_METRICS = ('p50_ms', 'p95_ms')
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    samples: int
+    rows: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    rows_per_sec: float
+
+    def to_json(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class Regression:
+    scenario: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else math.inf
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(durations: Sequence[float], rows: int) -> BenchmarkResult:
+    ordered = sorted(durations)
+    total = sum(ordered)
+    return BenchmarkResult(
+        samples=len(ordered),
+        rows=rows,
+        p50_ms=round(percentile(ordered, 0.50) * 1000, 4),
+        p95_ms=round(percentile(ordered, 0.95) * 1000, 4),
+        p99_ms=round(percentile(ordered, 0.99) * 1000, 4),
+        mean_ms=round(total / len(ordered) * 1000, 4),
+        rows_per_sec=round(rows / total, 1) if total else 0.0,
+    )
+
+
+def measure(
+    run: Callable[[], int],
+    iterations: int,
+    warmup: int = 0,
+    before: Callable[[], None] | None = None,
+) -> BenchmarkResult:
+    """Time ``run()``, which returns the rows it touched; ``before`` runs untimed ahead of each call."""
+    for _ in range(warmup):
+        if before is not None:
+            before()
+        run()
+    durations = []
+    rows = 0
+    for _ in range(iterations):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        rows += run()
+        durations.append(time.perf_counter() - started)
+    return summarize(durations, rows)
+
+
+async def measure_async(
+    run: Callable[[], Awaitable[int]],
+    iterations: int,
+    warmup: int = 0,
+    before: Callable[[], Any] | None = None,
+) -> BenchmarkResult:
+    """Like ``measure``; ``before`` may be a plain function or a coroutine function."""
+
+    async def prepare() -> None:
+        if before is not None and inspect.isawaitable(prepared := before()):
+            await prepared
+
+    for _ in range(warmup):
+        await prepare()
+        await run()
+    durations = []
+    rows = 0
+    for _ in range(iterations):
+        await prepare()
+        started = time.perf_counter()
+        rows += await run()
+        durations.append(time.perf_counter() - started)
+    return summarize(durations, rows)
+
+
+def compare(
+    current: Mapping[str, Mapping[str, float]],
+    baseline: Mapping[str, Mapping[str, float]],
+    tolerance: float,
+) -> list[Regression]:
+    """Scenarios present in both runs whose latency grew by more than ``tolerance`` (0.2 = 20%)."""
+    regressions = []
+    for scenario, result in current.items():
+        previous = baseline.get(scenario)
+        if previous is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if result[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(Regression(scenario, metric, previous[metric], result[metric]))
+    return regressions
@@ -1,12 +1,28 @@
-from fastapi import APIRouter
-
+from src.api.changes import router as changes_router
+from src.api.events import router as events_router
 from src.api.health import router as health_router
+from src.api.histogram import router as histogram_router
 from src.api.memories import router as memories_router
+from src.api.metrics import router as metrics_router
+from src.api.search import router as search_router
+from src.api.snapshot import router as snapshot_router
+from src.api.tags import router as tags_router
 from src.api.themes import router as themes_router
 from src.api.timeline import router as timeline_router
 
-api_router = APIRouter()
-api_router.include_router(health_router)
-api_router.include_router(timeline_router)
-api_router.include_router(memories_router)
-api_router.include_router(themes_router)
+# Included into the app one by one: FastAPI rebuilds every route (and its response
+# model field) on each include_router, so nesting them under a parent router would
+# pay that cost twice at startup.
+routers = (
+    health_router,
+    metrics_router,
+    timeline_router,
+    memories_router,
+    themes_router,
+    histogram_router,
+    tags_router,
+    search_router,
+    snapshot_router,
+    events_router,
+    changes_router,
+)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from src.api.responses import EncodedJSONResponse
+from src.async_db import SessionRunner, get_session_runner
+from src.models.changes_schemas import SessionChangesResponse
+from src.services.changes_service import ChangesService
+
+router = APIRouter(prefix='/api/v1/sessions/{session_id}/changes', tags=['changes'])
+
+
+@router.get('', response_model=SessionChangesResponse)
+async def get_changes(
+    session_id: str,
+    since: str | None = None,
+    runner: SessionRunner = Depends(get_session_runner),
+) -> Response:
+    try:
+        body = await runner(lambda session: ChangesService(session).get_changes(session_id, since))
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error)) from error
+    return EncodedJSONResponse(body)
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from fastapi import Request, Response, status
+
+
+def session_etag(version: int, representation: str) -> str:
+    """Strong validator for a list representation at a given session version."""
+    return f'"v{version}-{representation}"'
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if header is None:
+        return False
+    if header.strip() == '*':
+        return True
+    # If-None-Match uses the weak comparison, so a W/ prefix still matches.
+    candidates = {candidate.strip().removeprefix('W/') for candidate in header.split(',')}
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag, 'Vary': 'Accept'})
+
+
+def set_validator(response: Response, etag: str) -> None:
+    response.headers['ETag'] = etag
+    response.headers['Vary'] = 'Accept'
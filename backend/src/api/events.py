@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+
+from src.async_db import SessionRunner, get_session_runner
+from src.services.change_feed import open_change_stream
+
+EVENT_STREAM_MEDIA_TYPE = 'text/event-stream'
+
+router = APIRouter(prefix='/api/v1/sessions/{session_id}/events', tags=['events'])
+
+
+@router.get('', response_class=StreamingResponse, responses={200: {'content': {EVENT_STREAM_MEDIA_TYPE: {}}}})
+async def stream_session_events(
+    session_id: str,
+    last_event_id: str | None = Header(default=None, alias='Last-Event-ID'),
+    runner: SessionRunner = Depends(get_session_runner),
+) -> StreamingResponse:
+    try:
+        body = await open_change_stream(runner, session_id, last_event_id)
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error)) from error
+    return StreamingResponse(
+        body,
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        # Stop proxies from buffering frames or caching the stream.
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 from fastapi import APIRouter
+from sqlmodel import Session
 
-from src.models.health import ServiceState, ServiceStatus
+from src.db import SQLITE_PROFILE, engine
+from src.models.health import PayloadCacheStatus, ServiceState, ServiceStatus, StorageStatus
 from src.models.timeline import utc_now
+from src.services.payload_cache import payload_cache
+from src.sqlite_profile import read_sqlite_pragmas
 
 router = APIRouter(prefix="/api/v1", tags=["health"])
 
@@ -11,3 +15,29 @@ router = APIRouter(prefix="/api/v1", tags=["health"])
 @router.get("/health", response_model=ServiceStatus)
 def get_health() -> ServiceStatus:
     return ServiceStatus(status=ServiceState.OK, message="timeline service healthy", checkedAt=utc_now())
+
+
+@router.get("/health/storage", response_model=StorageStatus)
+def get_storage_status() -> StorageStatus:
+    # Every shard gets the same profile on connect, so the first one is representative.
+    with Session(engine) as session:
+        dbapi_connection = session.connection().connection.driver_connection
+        return StorageStatus(
+            profile=SQLITE_PROFILE.name,
+            configured=dict(SQLITE_PROFILE.pragmas()),
+            active=read_sqlite_pragmas(dbapi_connection),
+        )
+
+
+@router.get("/health/cache", response_model=PayloadCacheStatus)
+def get_cache_status() -> PayloadCacheStatus:
+    stats = payload_cache.stats()
+    return PayloadCacheStatus(
+        maxBytes=stats.max_bytes,
+        bytes=stats.bytes,
+        entries=stats.entries,
+        hits=stats.hits,
+        misses=stats.misses,
+        evictions=stats.evictions,
+        invalidations=stats.invalidations,
+    )
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
+
+from src.db import get_session
+from src.models.histogram import HistogramGranularity
+from src.models.histogram_schemas import HistogramResponse
+from src.services.histogram_service import HistogramService
+
+router = APIRouter(prefix='/api/v1/sessions/{session_id}/histogram', tags=['histogram'])
+
+
+def get_histogram_service(session: Session = Depends(get_session)) -> HistogramService:
+    return HistogramService(session)
+
+
+@router.get('', response_model=HistogramResponse)
+def get_histogram(
+    session_id: str,
+    granularity: HistogramGranularity,
+    window_start: datetime | None = Query(default=None, alias='from'),
+    window_end: datetime | None = Query(default=None, alias='to'),
+    service: HistogramService = Depends(get_histogram_service),
+) -> HistogramResponse:
+    try:
+        return service.get_histogram(session_id, granularity, window_start, window_end)
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error)) from error
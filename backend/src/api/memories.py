@@ -1,59 +1,150 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlmodel import Session
+from datetime import datetime
 
-from src.db import get_session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from src.api.conditional import if_none_match, not_modified, session_etag, set_validator
+from src.api.responses import EncodedJSONResponse
+from src.api.streaming import NEXT_CURSOR_HEADER, ndjson_response, wants_ndjson
+from src.async_db import SessionRunner, get_session_runner
 from src.models.memory_schemas import (
+    MemoryBatchRequest,
+    MemoryBatchResponse,
     MemoryCreateRequest,
     MemoryListResponse,
     MemoryResponse,
     MemoryUpdateRequest,
 )
-from src.services.memory_service import MemoryNotFoundError, MemoryService
+from src.services.memory_service import (
+    AsyncMemoryService,
+    MemoryNotFoundError,
+    MemoryService,
+    MemoryUndoExpiredError,
+)
+from src.services.pagination import MAX_PAGE_SIZE
+
+DELETION_ID_HEADER = 'X-Deletion-Id'
+UNDO_EXPIRES_AT_HEADER = 'X-Undo-Expires-At'
 
 router = APIRouter(prefix='/api/v1/sessions/{session_id}/memories', tags=['memories'])
 
 
-def get_memory_service(session: Session = Depends(get_session)) -> MemoryService:
-    return MemoryService(session)
+async def get_memory_service(runner: SessionRunner = Depends(get_session_runner)) -> AsyncMemoryService:
+    return AsyncMemoryService(runner)
 
 
 @router.get('', response_model=MemoryListResponse)
-def list_memories(session_id: str, service: MemoryService = Depends(get_memory_service)) -> MemoryListResponse:
-    return service.list_memories(session_id)
+async def list_memories(
+    request: Request,
+    session_id: str,
+    window_start: datetime | None = Query(default=None, alias='from'),
+    window_end: datetime | None = Query(default=None, alias='to'),
+    after: str | None = None,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    density: int | None = Query(default=None, ge=0),
+    selected_id: str | None = Query(default=None, alias='selectedId'),
+    tags: list[str] = Query(default=[], alias='tag'),
+    service: AsyncMemoryService = Depends(get_memory_service),
+) -> MemoryListResponse | Response:
+    # Read the version before the rows: a concurrent write can only make the ETag older than the body.
+    ndjson = wants_ndjson(request)
+    version = await service.session_version(session_id)
+    etag = session_etag(version, 'ndjson' if ndjson else 'json')
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    try:
+        if ndjson:
+            if density is not None:
+                raise ValueError('density is not available for NDJSON streams')
+            stream = ndjson_response(
+                session_id,
+                lambda stream_session: MemoryService(stream_session).stream_memories(
+                    session_id, window_start, window_end, after=after, limit=limit, tags=tags
+                )
+            )
+            set_validator(stream, etag)
+            return stream
+        body, next_cursor = await service.list_memories_json(
+            session_id,
+            version,
+            window_start,
+            window_end,
+            after=after,
+            limit=limit,
+            density=density,
+            selected_id=selected_id,
+            tags=tags,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error)) from error
+    response = EncodedJSONResponse(body)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    set_validator(response, etag)
+    return response
 
 
 @router.post('', status_code=status.HTTP_201_CREATED, response_model=MemoryResponse)
-def create_memory(
+async def create_memory(
     session_id: str,
     payload: MemoryCreateRequest,
-    service: MemoryService = Depends(get_memory_service),
+    service: AsyncMemoryService = Depends(get_memory_service),
 ) -> MemoryResponse:
-    return service.create_memory(session_id, payload)
+    return await service.create_memory(session_id, payload)
+
+
+@router.post(':batch', response_model=MemoryBatchResponse)
+async def apply_memory_batch(
+    session_id: str,
+    payload: MemoryBatchRequest,
+    service: AsyncMemoryService = Depends(get_memory_service),
+) -> MemoryBatchResponse:
+    return await service.apply_batch(session_id, payload)
 
 
 @router.patch('/{memory_id}', response_model=MemoryResponse)
-def update_memory(
+async def update_memory(
     session_id: str,
     memory_id: str,
     payload: MemoryUpdateRequest,
-    service: MemoryService = Depends(get_memory_service),
+    service: AsyncMemoryService = Depends(get_memory_service),
 ) -> MemoryResponse:
     try:
-        return service.update_memory(session_id, memory_id, payload)
+        return await service.update_memory(session_id, memory_id, payload)
     except MemoryNotFoundError as error:
         raise HTTPException(status_code=404, detail=f'Memory not found: {error}') from error
 
 
 @router.delete('/{memory_id}', status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
-def delete_memory(
+async def delete_memory(
     session_id: str,
     memory_id: str,
-    service: MemoryService = Depends(get_memory_service),
+    service: AsyncMemoryService = Depends(get_memory_service),
 ) -> Response:
     try:
-        service.delete_memory(session_id, memory_id)
+        deletion = await service.delete_memory(session_id, memory_id)
     except MemoryNotFoundError as error:
         raise HTTPException(status_code=404, detail=f'Memory not found: {error}') from error
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+    # The body stays empty; the undo token travels in headers.
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={
+            DELETION_ID_HEADER: deletion.deletionId,
+            UNDO_EXPIRES_AT_HEADER: deletion.undoExpiresAt.isoformat(),
+        },
+    )
+
+
+@router.post('/deletions/{deletion_id}/undo', response_model=MemoryResponse)
+async def undo_memory_delete(
+    session_id: str,
+    deletion_id: str,
+    service: AsyncMemoryService = Depends(get_memory_service),
+) -> MemoryResponse:
+    try:
+        return await service.undo_delete(session_id, deletion_id)
+    except MemoryNotFoundError as error:
+        raise HTTPException(status_code=404, detail=f'Deletion not found: {error}') from error
+    except MemoryUndoExpiredError as error:
+        raise HTTPException(status_code=410, detail=f'Undo window expired: {error}') from error
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Response
+
+from src.metrics import CONTENT_TYPE, metrics
+
+router = APIRouter(prefix='/api/v1', tags=['metrics'])
+
+
+@router.get('/metrics', response_class=Response)
+def get_metrics() -> Response:
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from fastapi import Response
+
+
+class EncodedJSONResponse(Response):
+    """A JSON body the service layer has already encoded; sent without re-validation."""
+
+    media_type = 'application/json'
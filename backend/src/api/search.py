@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlmodel import Session
+
+from src.api.streaming import NEXT_CURSOR_HEADER
+from src.db import get_session
+from src.models.search_schemas import SearchResponse
+from src.models.tag import TaggedItemType
+from src.services.pagination import MAX_PAGE_SIZE
+from src.services.search_service import DEFAULT_SEARCH_LIMIT, SearchService
+
+router = APIRouter(prefix='/api/v1/sessions/{session_id}/search', tags=['search'])
+
+
+def get_search_service(session: Session = Depends(get_session)) -> SearchService:
+    return SearchService(session)
+
+
+@router.get('', response_model=SearchResponse)
+def search(
+    response: Response,
+    session_id: str,
+    q: str = Query(min_length=1, max_length=500),
+    item_type: TaggedItemType | None = Query(default=None, alias='type'),
+    window_start: datetime | None = Query(default=None, alias='from'),
+    window_end: datetime | None = Query(default=None, alias='to'),
+    after: str | None = None,
+    limit: int = Query(default=DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    service: SearchService = Depends(get_search_service),
+) -> SearchResponse:
+    try:
+        page, next_cursor = service.search(
+            session_id,
+            q,
+            item_type=item_type,
+            window_start=window_start,
+            window_end=window_end,
+            after=after,
+            limit=limit,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error)) from error
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return page
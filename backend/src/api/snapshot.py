@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import JSONResponse
+
+from src.api.responses import EncodedJSONResponse
+from src.async_db import SessionRunner, get_session_runner
+from src.models.snapshot_schemas import SessionSnapshotResponse
+from src.models.timeline import ErrorResponse
+from src.services.snapshot_service import SnapshotService
+from src.services.timeline_service import TimelineServiceUnavailableError
+
+router = APIRouter(prefix='/api/v1/sessions/{session_id}/snapshot', tags=['snapshot'])
+
+
+@router.get(
+    '',
+    response_model=SessionSnapshotResponse,
+    responses={503: {'model': ErrorResponse}},
+)
+async def get_snapshot(
+    session_id: str,
+    window_start: datetime | None = Query(default=None, alias='from'),
+    window_end: datetime | None = Query(default=None, alias='to'),
+    runner: SessionRunner = Depends(get_session_runner),
+) -> Response:
+    try:
+        body = await runner(
+            lambda session: SnapshotService(session).get_snapshot(session_id, window_start, window_end)
+        )
+    except TimelineServiceUnavailableError as error:
+        payload = ErrorResponse(code='SERVICE_UNAVAILABLE', message=str(error))
+        return JSONResponse(status_code=503, content=payload.model_dump())
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error)) from error
+    return EncodedJSONResponse(body)
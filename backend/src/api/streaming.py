@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+from src.db import engine_for
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get('accept', '')
+
+
+def ndjson_response(session_id: str, open_lines: Callable[[Session], Iterator[bytes]]) -> StreamingResponse:
+    """Stream the lines produced by ``open_lines`` from a session owned by the response.
+
+    Dependencies with ``yield`` are torn down before a response body is sent, so the
+    stream opens a dedicated session on ``session_id``'s shard and closes it once
+    the body is exhausted.
+    Errors raised by ``open_lines`` itself (validation) propagate before streaming.
+    """
+    session = Session(engine_for(session_id))
+    try:
+        lines = open_lines(session)
+    except Exception:
+        session.close()
+        raise
+
+    def body() -> Iterator[bytes]:
+        try:
+            yield from lines
+        finally:
+            session.close()
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+
+from src.db import get_session
+from src.models.tag_schemas import TagFacetResponse
+from src.services.tag_service import TagService
+
+router = APIRouter(prefix='/api/v1/sessions/{session_id}/tags', tags=['tags'])
+
+
+def get_tag_service(session: Session = Depends(get_session)) -> TagService:
+    return TagService(session)
+
+
+@router.get('', response_model=TagFacetResponse)
+def get_tag_facets(
+    session_id: str,
+    limit: int | None = Query(default=None, ge=1),
+    service: TagService = Depends(get_tag_service),
+) -> TagFacetResponse:
+    return service.get_facets(session_id, limit)
@@ -1,45 +1,134 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlmodel import Session
+from datetime import datetime
 
-from src.db import get_session
-from src.models.theme_schemas import ThemeCreateRequest, ThemeListResponse, ThemeResponse, ThemeUpdateRequest
-from src.services.theme_service import ThemeNotFoundError, ThemeService
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from src.api.conditional import if_none_match, not_modified, session_etag, set_validator
+from src.api.responses import EncodedJSONResponse
+from src.api.streaming import NEXT_CURSOR_HEADER, ndjson_response, wants_ndjson
+from src.async_db import SessionRunner, get_session_runner
+from src.models.theme_schemas import (
+    ThemeCreateRequest,
+    ThemeHitResponse,
+    ThemeLayoutResponse,
+    ThemeListResponse,
+    ThemeResponse,
+    ThemeUpdateRequest,
+)
+from src.services.pagination import MAX_PAGE_SIZE
+from src.services.theme_service import AsyncThemeService, ThemeNotFoundError, ThemeService
 
 router = APIRouter(prefix='/api/v1/sessions/{session_id}/themes', tags=['themes'])
 
 
-def get_theme_service(session: Session = Depends(get_session)) -> ThemeService:
-    return ThemeService(session)
+async def get_theme_service(runner: SessionRunner = Depends(get_session_runner)) -> AsyncThemeService:
+    return AsyncThemeService(runner)
 
 
 @router.get('', response_model=ThemeListResponse)
-def list_themes(session_id: str, service: ThemeService = Depends(get_theme_service)) -> ThemeListResponse:
-    return service.list_themes(session_id)
+async def list_themes(
+    request: Request,
+    session_id: str,
+    after: str | None = None,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    tags: list[str] = Query(default=[], alias='tag'),
+    service: AsyncThemeService = Depends(get_theme_service),
+) -> ThemeListResponse | Response:
+    ndjson = wants_ndjson(request)
+    version = await service.session_version(session_id)
+    etag = session_etag(version, 'ndjson' if ndjson else 'json')
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    try:
+        if ndjson:
+            stream = ndjson_response(
+                session_id,
+                lambda stream_session: ThemeService(stream_session).stream_themes(
+                    session_id, after=after, limit=limit, tags=tags
+                )
+            )
+            set_validator(stream, etag)
+            return stream
+        body, next_cursor = await service.list_themes_json(
+            session_id, version, after=after, limit=limit, tags=tags
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error)) from error
+    response = EncodedJSONResponse(body)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    set_validator(response, etag)
+    return response
+
+
+@router.get('/viewport', response_model=ThemeListResponse)
+async def list_themes_in_viewport(
+    session_id: str,
+    window_start: datetime = Query(alias='from'),
+    window_end: datetime = Query(alias='to'),
+    top_px: float | None = Query(default=None, alias='topPx'),
+    bottom_px: float | None = Query(default=None, alias='bottomPx'),
+    service: AsyncThemeService = Depends(get_theme_service),
+) -> ThemeListResponse:
+    try:
+        return await service.list_themes_in_viewport(session_id, window_start, window_end, top_px, bottom_px)
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error)) from error
+
+
+@router.get('/layout', response_model=ThemeLayoutResponse)
+async def get_theme_layout(
+    request: Request,
+    session_id: str,
+    window_start: datetime = Query(alias='from'),
+    window_end: datetime = Query(alias='to'),
+    service: AsyncThemeService = Depends(get_theme_service),
+) -> Response:
+    version = await service.session_version(session_id)
+    etag = session_etag(version, 'layout')
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    try:
+        body = await service.get_layout(session_id, version, window_start, window_end)
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error)) from error
+    response = EncodedJSONResponse(body)
+    set_validator(response, etag)
+    return response
+
+
+@router.get('/hit', response_model=ThemeHitResponse)
+async def find_topmost_theme(
+    session_id: str,
+    at: datetime,
+    px: float,
+    service: AsyncThemeService = Depends(get_theme_service),
+) -> ThemeHitResponse:
+    return await service.find_topmost_theme(session_id, at, px)
 
 
 @router.post('', status_code=status.HTTP_201_CREATED, response_model=ThemeResponse)
-def create_theme(
+async def create_theme(
     session_id: str,
     payload: ThemeCreateRequest,
-    service: ThemeService = Depends(get_theme_service),
+    service: AsyncThemeService = Depends(get_theme_service),
 ) -> ThemeResponse:
     try:
-        return service.create_theme(session_id, payload)
+        return await service.create_theme(session_id, payload)
     except ValueError as error:
         raise HTTPException(status_code=422, detail=str(error)) from error
 
 
 @router.patch('/{theme_id}', response_model=ThemeResponse)
-def update_theme(
+async def update_theme(
     session_id: str,
     theme_id: str,
     payload: ThemeUpdateRequest,
-    service: ThemeService = Depends(get_theme_service),
+    service: AsyncThemeService = Depends(get_theme_service),
 ) -> ThemeResponse:
     try:
-        return service.update_theme(session_id, theme_id, payload)
+        return await service.update_theme(session_id, theme_id, payload)
     except ThemeNotFoundError as error:
         raise HTTPException(status_code=404, detail=f'Theme not found: {error}') from error
     except ValueError as error:
@@ -47,13 +136,13 @@ def update_theme(
 
 
 @router.delete('/{theme_id}', status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
-def delete_theme(
+async def delete_theme(
     session_id: str,
     theme_id: str,
-    service: ThemeService = Depends(get_theme_service),
+    service: AsyncThemeService = Depends(get_theme_service),
 ) -> Response:
     try:
-        service.delete_theme(session_id, theme_id)
+        await service.delete_theme(session_id, theme_id)
     except ThemeNotFoundError as error:
         raise HTTPException(status_code=404, detail=f'Theme not found: {error}') from error
     return Response(status_code=status.HTTP_204_NO_CONTENT)
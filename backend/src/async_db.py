@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, Callable
+import os
+from pathlib import Path
+from typing import Protocol, TypeVar
+
+import anyio.to_thread
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db import DB_PATH, SHARD_COUNT, SQL_PROFILER, SQLITE_PROFILE, engine_for, shards
+from src.shards import ShardRegistry, shard_path
+from src.sql_profiler import install_sql_profiler
+from src.sqlite_profile import apply_sqlite_profile
+
+T = TypeVar('T')
+
+
+class SessionRunner(Protocol):
+    async def __call__(self, work: Callable[[Session], T]) -> T: ...
+
+
+class AsyncSessionRunner:
+    """Runs sync repository code on the aiosqlite engine.
+
+    ``run_sync`` drives the ORM through SQLAlchemy's greenlet bridge, so every
+    statement is awaited on the event loop and no worker thread is held while
+    SQLite waits on a lock or an fsync.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def __call__(self, work: Callable[[Session], T]) -> T:
+        return await self.session.run_sync(work)
+
+
+class ThreadSessionRunner:
+    """Fallback that runs the same work on the blocking engine in the threadpool."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    async def __call__(self, work: Callable[[Session], T]) -> T:
+        return await anyio.to_thread.run_sync(work, self.session)
+
+
+def _create_async_engine(path: Path) -> AsyncEngine:
+    created = create_async_engine(f'sqlite+aiosqlite:///{path}')
+
+    @event.listens_for(created.sync_engine, 'connect')
+    def _on_connect(dbapi_connection, _connection_record) -> None:
+        apply_sqlite_profile(dbapi_connection, SQLITE_PROFILE)
+
+    if SQL_PROFILER is not None:
+        install_sql_profiler(created.sync_engine, SQL_PROFILER)
+    return created
+
+
+def _create_async_shards() -> ShardRegistry[AsyncEngine] | None:
+    if os.getenv('TIMELINE_DB_ASYNC', '1').strip().lower() in {'0', 'false', 'off'}:
+        return None
+    try:
+        import aiosqlite  # noqa: F401
+    except ImportError:
+        return None
+    # Same ring as the blocking engines, so both resolve a session to the same file.
+    engines = [_create_async_engine(shard_path(DB_PATH, index)) for index in range(SHARD_COUNT)]
+    return ShardRegistry(shards.ring, engines)
+
+
+async_shards = _create_async_shards()
+
+
+async def get_session_runner(session_id: str) -> AsyncGenerator[SessionRunner, None]:
+    """Runner on the shard holding ``session_id``, which FastAPI reads from the route path."""
+    if async_shards is None:
+        session = Session(engine_for(session_id))
+        try:
+            yield ThreadSessionRunner(session)
+        finally:
+            await anyio.to_thread.run_sync(session.close)
+        return
+    async with AsyncSession(async_shards.for_session(session_id)) as session:
+        yield AsyncSessionRunner(session)
@@ -4,13 +4,23 @@ from collections.abc import Generator
 import os
 from pathlib import Path
 
-from sqlalchemy import text
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy import Engine, event
+from sqlmodel import Session, create_engine
+
+from src.migrations import migrate
 
 # Import models so SQLModel metadata includes required tables.
+from src.models.histogram import TimelineHistogramBucket  # noqa: F401
 from src.models.memory import Memory, TimelineSession  # noqa: F401
 from src.models.memory_deletion import MemoryDeletionRecord  # noqa: F401
+from src.models.schema_migration import SchemaMigration  # noqa: F401
+from src.models.search import CREATE_TIMELINE_SEARCH  # noqa: F401
+from src.models.tag import ItemTag  # noqa: F401
 from src.models.theme import Theme  # noqa: F401
+from src.models.tombstone import Tombstone  # noqa: F401
+from src.shards import ShardRegistry, ShardRing, check_layout, load_shard_count, shard_path
+from src.sql_profiler import install_sql_profiler, load_sql_profiler_settings
+from src.sqlite_profile import apply_sqlite_profile, load_sqlite_profile
 
 db_path_env = os.getenv('TIMELINE_DB_PATH')
 if db_path_env:
@@ -20,48 +30,43 @@ else:
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 DATABASE_URL = f'sqlite:///{DB_PATH}'
 
-engine = create_engine(DATABASE_URL, connect_args={'check_same_thread': False})
-
-
-def _ensure_memory_columns() -> None:
-    with engine.begin() as connection:
-        columns = connection.execute(text("PRAGMA table_info('memory')")).fetchall()
-        if not columns:
-            return
-        names = {str(row[1]) for row in columns}
-        if 'vertical_ratio' in names:
-            pass
-        else:
-            connection.execute(
-                text("ALTER TABLE memory ADD COLUMN vertical_ratio FLOAT NOT NULL DEFAULT 0.3")
-            )
-        if 'tags_json' in names:
-            return
-        connection.execute(
-            text("ALTER TABLE memory ADD COLUMN tags_json TEXT NOT NULL DEFAULT '[]'")
-        )
-
-
-def _ensure_theme_columns() -> None:
-    with engine.begin() as connection:
-        columns = connection.execute(text("PRAGMA table_info('theme')")).fetchall()
-        if not columns:
-            return
-        names = {str(row[1]) for row in columns}
-        if 'top_px' not in names:
-            connection.execute(text("ALTER TABLE theme ADD COLUMN top_px FLOAT NOT NULL DEFAULT 120"))
-        if 'bottom_px' not in names:
-            connection.execute(text("ALTER TABLE theme ADD COLUMN bottom_px FLOAT NOT NULL DEFAULT 216"))
-        if 'abbreviated_title' not in names:
-            connection.execute(text("ALTER TABLE theme ADD COLUMN abbreviated_title TEXT"))
+SQLITE_PROFILE = load_sqlite_profile()
+SQL_PROFILER = load_sql_profiler_settings()
+
+SHARD_COUNT = load_shard_count()
+
+
+def _on_connect(dbapi_connection, _connection_record) -> None:
+    apply_sqlite_profile(dbapi_connection, SQLITE_PROFILE)
+
+
+def create_shard_engine(path: Path) -> Engine:
+    created = create_engine(f'sqlite:///{path}', connect_args={'check_same_thread': False})
+    event.listen(created, 'connect', _on_connect)
+    if SQL_PROFILER is not None:
+        install_sql_profiler(created, SQL_PROFILER)
+    return created
+
+
+shards = ShardRegistry(
+    ShardRing(SHARD_COUNT), [create_shard_engine(shard_path(DB_PATH, index)) for index in range(SHARD_COUNT)]
+)
+# Shard 0 lives at DB_PATH: with the default single shard it is the whole database.
+# Anything scoped to a session must go through engine_for instead.
+engine = shards.engines[0]
+
+
+def engine_for(session_id: str) -> Engine:
+    return shards.for_session(session_id)
 
 
 def init_db() -> None:
-    SQLModel.metadata.create_all(engine)
-    _ensure_memory_columns()
-    _ensure_theme_columns()
+    for index, shard_engine in enumerate(shards.engines):
+        migrate(shard_engine)
+        check_layout(shard_engine, index, SHARD_COUNT)
 
 
-def get_session() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+def get_session(session_id: str) -> Generator[Session, None, None]:
+    """Session on the shard holding ``session_id``, which FastAPI reads from the route path."""
+    with Session(engine_for(session_id)) as session:
         yield session
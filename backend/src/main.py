@@ -1,10 +1,40 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from src.api import api_router
-from src.db import init_db
+from src.api import routers
+from src.async_db import async_shards
+from src.db import SQL_PROFILER, init_db, shards
+from src.metrics import MetricsMiddleware, instrument_engine, metrics_enabled
+from src.services.deletion_sweeper import deletion_sweeper
+from src.sql_profiler import SqlProfilerMiddleware
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # Migrating here rather than on import keeps tools and test collection that only
+    # need the app object off the database; an up-to-date schema is one query.
+    await anyio.to_thread.run_sync(init_db)
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(deletion_sweeper.run)
+        yield
+        task_group.cancel_scope.cancel()
+
+
+app = FastAPI(title="Timeline Foundation API", version="0.1.0", lifespan=lifespan)
 
-app = FastAPI(title="Timeline Foundation API", version="0.1.0")
+if metrics_enabled():
+    for engine in shards.engines:
+        instrument_engine(engine)
+    for async_engine in async_shards.engines if async_shards is not None else ():
+        instrument_engine(async_engine.sync_engine)
+    # Added before CORS so preflight requests answered by CORS are not timed.
+    app.add_middleware(MetricsMiddleware, router=app.router)
+if SQL_PROFILER is not None:
+    app.add_middleware(SqlProfilerMiddleware, settings=SQL_PROFILER)
 
 allowed_origins = [
     "http://localhost:5173",
@@ -18,10 +48,11 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["GET", "POST", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Deletion-Id", "X-Undo-Expires-At"],
 )
 
-app.include_router(api_router)
-init_db()
+for router in routers:
+    app.include_router(router)
 
 
 @app.get("/")
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass
+import os
+import re
+import threading
+from time import perf_counter
+
+from sqlalchemy import Engine, event
+from starlette.routing import Router
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNMATCHED_ROUTE = 'unmatched'
+_KNOWN_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+SQL_SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def metrics_enabled() -> bool:
+    return os.getenv('TIMELINE_METRICS', '1').strip().lower() not in {'0', 'false', 'off'}
+
+
+class Histogram:
+    """Per-bucket counts; made cumulative only when rendered."""
+
+    __slots__ = ('bounds', 'counts', 'total', 'count')
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # Prometheus buckets are inclusive upper bounds, which is what bisect_left finds.
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class RouteSeries:
+    __slots__ = ('latency', 'sql_statements', 'sql_seconds')
+
+    def __init__(self) -> None:
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.sql_statements = Histogram(SQL_STATEMENT_BUCKETS)
+        self.sql_seconds = Histogram(SQL_SECONDS_BUCKETS)
+
+
+@dataclass
+class RequestSql:
+    """SQL issued on behalf of one request, filled in by the engine listeners."""
+
+    statements: int = 0
+    seconds: float = 0.0
+
+
+# Worker threads and SQLAlchemy's async greenlets inherit this, so the object is shared.
+_request_sql: ContextVar[RequestSql | None] = ContextVar('timeline_request_sql', default=None)
+
+
+def _before_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany) -> None:
+    if _request_sql.get() is not None:
+        context._timeline_sql_started = perf_counter()
+
+
+def _after_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany) -> None:
+    sql = _request_sql.get()
+    started = getattr(context, '_timeline_sql_started', None)
+    if sql is None or started is None:
+        return
+    sql.statements += 1
+    sql.seconds += perf_counter() - started
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute every statement run on ``engine`` to the request that issued it."""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+_HISTOGRAMS = (
+    ('timeline_http_request_duration_seconds', 'latency', 'Time from request start until the response is sent.'),
+    ('timeline_http_request_sql_statements', 'sql_statements', 'SQL statements executed per request.'),
+    ('timeline_http_request_sql_seconds', 'sql_seconds', 'Time spent executing SQL per request.'),
+)
+
+
+class MetricsRegistry:
+    """Request counters, latency and SQL histograms keyed by method and route template."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._requests: dict[tuple[str, str, str], int] = {}
+        self._routes: dict[tuple[str, str], RouteSeries] = {}
+        self._in_flight: dict[tuple[str, str], int] = {}
+
+    def request_started(self, method: str, route: str) -> None:
+        key = (method, route)
+        with self._lock:
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+
+    def request_finished(self, method: str, route: str, status: int, seconds: float, sql: RequestSql) -> None:
+        key = (method, route)
+        with self._lock:
+            self._in_flight[key] -= 1
+            counter = (method, route, str(status))
+            self._requests[counter] = self._requests.get(counter, 0) + 1
+            series = self._routes.get(key)
+            if series is None:
+                series = self._routes[key] = RouteSeries()
+            series.latency.observe(seconds)
+            series.sql_statements.observe(sql.statements)
+            series.sql_seconds.observe(sql.seconds)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self._routes.clear()
+            # Requests still running will decrement their gauge, so keep their keys.
+            self._in_flight = {key: value for key, value in self._in_flight.items() if value}
+
+    def render(self) -> str:
+        """The registry in the Prometheus text exposition format."""
+        with self._lock:
+            requests = sorted(self._requests.items())
+            in_flight = sorted(self._in_flight.items())
+            routes = sorted(self._routes.items(), key=lambda item: item[0])
+            lines: list[str] = []
+            _header(lines, 'timeline_http_requests_total', 'counter', 'Requests handled, by route template and status.')
+            for (method, route, status), value in requests:
+                lines.append(f'timeline_http_requests_total{_labels(method, route, status=status)} {value}')
+            _header(lines, 'timeline_http_requests_in_flight', 'gauge', 'Requests currently being handled.')
+            for (method, route), value in in_flight:
+                lines.append(f'timeline_http_requests_in_flight{_labels(method, route)} {value}')
+            for name, attribute, help_text in _HISTOGRAMS:
+                _header(lines, name, 'histogram', help_text)
+                for (method, route), series in routes:
+                    _histogram(lines, name, method, route, getattr(series, attribute))
+        return '\n'.join(lines) + '\n'
+
+
+def _header(lines: list[str], name: str, kind: str, help_text: str) -> None:
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(method: str, route: str, **extra: str) -> str:
+    pairs = [('method', method), ('route', route), *extra.items()]
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
+
+
+def _histogram(lines: list[str], name: str, method: str, route: str, histogram: Histogram) -> None:
+    cumulative = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{_labels(method, route, le=_number(bound))} {cumulative}')
+    lines.append(f'{name}_bucket{_labels(method, route, le="+Inf")} {histogram.count}')
+    lines.append(f'{name}_sum{_labels(method, route)} {_number(histogram.total)}')
+    lines.append(f'{name}_count{_labels(method, route)} {histogram.count}')
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware, so instrumenting a request adds no extra task or body copy.
+
+    Requests are labelled with the route template (``/api/v1/sessions/{session_id}/memories``)
+    rather than the raw path, which keeps the number of series bounded. Streaming
+    responses are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app: ASGIApp, router: Router, registry: MetricsRegistry | None = None) -> None:
+        self.app = app
+        self.router = router
+        self.registry = registry or metrics
+        self._table: list[tuple[re.Pattern[str], set[str] | None, str]] = []
+        self._table_size = -1
+
+    def route_template(self, scope: Scope) -> str:
+        """Match the path against the routes' compiled patterns only.
+
+        ``Route.matches`` also converts path parameters and builds a child scope,
+        which costs far more than the rest of the bookkeeping.
+        """
+        routes = self.router.routes
+        if len(routes) != self._table_size:
+            # Routers can still gain routes after the middleware stack is built.
+            self._table = [
+                (route.path_regex, getattr(route, 'methods', None), route.path)
+                for route in routes
+                if hasattr(route, 'path_regex')
+            ]
+            self._table_size = len(routes)
+        path = scope['path']
+        method = scope['method']
+        partial = None
+        for pattern, methods, template in self._table:
+            if pattern.match(path):
+                if methods is None or method in methods:
+                    return template
+                partial = partial or template
+        return partial or UNMATCHED_ROUTE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        method = scope['method'] if scope['method'] in _KNOWN_METHODS else 'OTHER'
+        route = self.route_template(scope)
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        sql = RequestSql()
+        token = _request_sql.set(sql)
+        self.registry.request_started(method, route)
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.registry.request_finished(method, route, status, perf_counter() - started, sql)
+            _request_sql.reset(token)
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+import logging
+import os
+
+from sqlalchemy import Connection, Engine, text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel
+
+from src.models.memory import Memory
+from src.models.memory_deletion import MemoryDeletionRecord
+from src.models.schema_migration import SchemaMigration
+from src.models.search import CREATE_TIMELINE_SEARCH
+from src.models.tag import TaggedItemType
+from src.models.theme import CREATE_THEME_RTREE, Theme
+from src.repositories.histogram_repository import HistogramRepository
+from src.repositories.search_repository import SearchRepository
+from src.repositories.tag_repository import TagRepository
+from src.repositories.theme_spatial_index import index_themes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKFILL_CHUNK = 2000
+_ITEM_TABLES = (('memory', TaggedItemType.MEMORY), ('theme', TaggedItemType.THEME))
+
+# Returns the next cursor, or None once every row has been processed.
+Backfill = Callable[[Connection, str | None, int], str | None]
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A schema change plus an optional data backfill.
+
+    ``upgrade`` runs in one write transaction and returns whether ``backfill`` is
+    needed for this database. The backfill then runs one chunk per transaction, so
+    other writers get the lock between chunks and an interrupted run resumes from
+    the stored cursor.
+    """
+
+    version: int
+    name: str
+    upgrade: Callable[[Connection], bool]
+    backfill: Backfill | None = None
+
+
+def backfill_chunk_size() -> int:
+    value = os.getenv('TIMELINE_MIGRATION_CHUNK', str(DEFAULT_BACKFILL_CHUNK))
+    try:
+        size = int(value)
+    except ValueError as error:
+        raise ValueError(f'TIMELINE_MIGRATION_CHUNK must be an integer, got {value!r}') from error
+    if size < 1:
+        raise ValueError(f'TIMELINE_MIGRATION_CHUNK must be >= 1, got {value!r}')
+    return size
+
+
+@contextmanager
+def _write_transaction(engine: Engine) -> Iterator[Connection]:
+    # IMMEDIATE takes the write lock up front, so two processes starting together
+    # serialize here instead of failing halfway through a migration.
+    with engine.connect() as connection:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+        yield connection
+        connection.commit()
+
+
+def _table_exists(connection: Connection, name: str) -> bool:
+    return (
+        connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': name}
+        ).first()
+        is not None
+    )
+
+
+def _has_rows(connection: Connection, query: str) -> bool:
+    return connection.execute(text(query)).first() is not None
+
+
+def _column_names(connection: Connection, table: str) -> set[str]:
+    return {str(row[1]) for row in connection.execute(text(f"PRAGMA table_info('{table}')")).fetchall()}
+
+
+# --- Schema steps -------------------------------------------------------------
+
+
+def _create_tables(connection: Connection) -> bool:
+    SQLModel.metadata.create_all(connection)
+    return False
+
+
+def _add_item_columns(connection: Connection) -> bool:
+    # Databases from before these columns existed; fresh ones already have them.
+    added = {
+        'memory': (
+            ('vertical_ratio', 'FLOAT NOT NULL DEFAULT 0.3'),
+            ('tags_json', "TEXT NOT NULL DEFAULT '[]'"),
+            ('version', 'INTEGER NOT NULL DEFAULT 0'),
+        ),
+        'theme': (
+            ('top_px', 'FLOAT NOT NULL DEFAULT 120'),
+            ('bottom_px', 'FLOAT NOT NULL DEFAULT 216'),
+            ('abbreviated_title', 'TEXT'),
+            ('version', 'INTEGER NOT NULL DEFAULT 0'),
+        ),
+        'timelinesession': (('version', 'INTEGER NOT NULL DEFAULT 0'),),
+    }
+    for table, columns in added.items():
+        names = _column_names(connection, table)
+        for name, definition in columns:
+            if name not in names:
+                connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {name} {definition}'))
+    return False
+
+
+def _create_indexes(connection: Connection) -> bool:
+    # create_all only emits indexes together with a new table, so databases created
+    # before the window and paging indexes existed need them added explicitly.
+    for table in (Memory.__table__, Theme.__table__, MemoryDeletionRecord.__table__):
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+    return False
+
+
+def _page_memories_by_creation(connection: Connection) -> bool:
+    # Memory pages moved from id order to (created_at, id); the old keyset index is unused.
+    connection.execute(text('DROP INDEX IF EXISTS ix_memory_session_page'))
+    return _create_indexes(connection)
+
+
+def _create_theme_rtree(connection: Connection) -> bool:
+    if _table_exists(connection, 'theme_rtree'):
+        return False
+    connection.execute(CREATE_THEME_RTREE)
+    return _has_rows(connection, 'SELECT 1 FROM theme LIMIT 1')
+
+
+def _check_histogram(connection: Connection) -> bool:
+    # Databases that predate the rollup table start with it empty; fill it once.
+    return not _has_rows(connection, 'SELECT 1 FROM timelinehistogrambucket LIMIT 1') and _has_rows(
+        connection, 'SELECT 1 FROM memory UNION ALL SELECT 1 FROM theme LIMIT 1'
+    )
+
+
+def _check_tags(connection: Connection) -> bool:
+    # Tags written before the index existed only live in tags_json; index them once.
+    return not _has_rows(connection, 'SELECT 1 FROM itemtag LIMIT 1') and _has_rows(
+        connection,
+        "SELECT 1 FROM memory WHERE tags_json != '[]' UNION ALL SELECT 1 FROM theme WHERE tags_json != '[]' LIMIT 1",
+    )
+
+
+def _create_search_index(connection: Connection) -> bool:
+    if _table_exists(connection, 'timeline_search'):
+        return False
+    connection.execute(CREATE_TIMELINE_SEARCH)
+    return _has_rows(connection, 'SELECT 1 FROM memory UNION ALL SELECT 1 FROM theme LIMIT 1')
+
+
+# --- Backfills ----------------------------------------------------------------
+
+
+def _item_backfill(
+    tables: Sequence[tuple[str, TaggedItemType]],
+    apply: Callable[[Session, TaggedItemType, list[tuple[str, str]]], None],
+) -> Backfill:
+    """Walk ``tables`` in id order, ``chunk_size`` rows per call; cursors are ``table:last_id``."""
+    names = [table for table, _ in tables]
+    item_types = dict(tables)
+
+    def backfill(connection: Connection, cursor: str | None, chunk_size: int) -> str | None:
+        table, _, after_id = (cursor or f'{names[0]}:').partition(':')
+        rows = connection.execute(
+            text(f'SELECT id, session_id FROM {table} WHERE id > :after_id ORDER BY id LIMIT :limit'),
+            {'after_id': after_id, 'limit': chunk_size},
+        ).fetchall()
+        if not rows:
+            position = names.index(table) + 1
+            return f'{names[position]}:' if position < len(names) else None
+        with Session(bind=connection) as session:
+            apply(session, item_types[table], [(str(row[0]), str(row[1])) for row in rows])
+        return f'{table}:{rows[-1][0]}'
+
+    return backfill
+
+
+def _index_rtree_chunk(session: Session, _item_type: TaggedItemType, rows: list[tuple[str, str]]) -> None:
+    index_themes(session.connection(), rows)
+
+
+def _sync_tags_chunk(session: Session, item_type: TaggedItemType, rows: list[tuple[str, str]]) -> None:
+    TagRepository(session).sync(item_type, [item_id for item_id, _ in rows])
+
+
+def _sync_search_chunk(session: Session, item_type: TaggedItemType, rows: list[tuple[str, str]]) -> None:
+    by_session: dict[str, list[str]] = {}
+    for item_id, session_id in rows:
+        by_session.setdefault(session_id, []).append(item_id)
+    repository = SearchRepository(session)
+    for session_id, item_ids in by_session.items():
+        repository.sync(item_type, session_id, item_ids)
+
+
+def _backfill_histogram(connection: Connection, cursor: str | None, chunk_size: int) -> str | None:
+    # Chunked by session: recounting a whole session is idempotent, so writes that
+    # land between chunks can never be counted twice.
+    rows = connection.execute(
+        text(
+            'SELECT session_id FROM (SELECT session_id FROM memory UNION SELECT session_id FROM theme) '
+            'WHERE session_id > :after ORDER BY session_id LIMIT :limit'
+        ),
+        {'after': cursor or '', 'limit': max(chunk_size // 100, 1)},
+    ).fetchall()
+    if not rows:
+        return None
+    session_ids = [str(row[0]) for row in rows]
+    with Session(bind=connection) as session:
+        HistogramRepository(session).rebuild_sessions(session_ids)
+    return session_ids[-1]
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, 'create_tables', _create_tables),
+    Migration(2, 'item_columns', _add_item_columns),
+    Migration(3, 'item_indexes', _create_indexes),
+    Migration(4, 'theme_rtree', _create_theme_rtree, _item_backfill(_ITEM_TABLES[1:], _index_rtree_chunk)),
+    Migration(5, 'histogram_rollup', _check_histogram, _backfill_histogram),
+    Migration(6, 'tag_index', _check_tags, _item_backfill(_ITEM_TABLES, _sync_tags_chunk)),
+    Migration(7, 'search_index', _create_search_index, _item_backfill(_ITEM_TABLES, _sync_search_chunk)),
+    Migration(8, 'memory_creation_order', _page_memories_by_creation),
+)
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(engine: Engine) -> int:
+    """Highest fully applied migration, or 0 for a database that has never been migrated."""
+    with engine.connect() as connection:
+        try:
+            version = connection.execute(
+                text('SELECT max(version) FROM schemamigration WHERE completed_at IS NOT NULL')
+            ).scalar()
+        except OperationalError:
+            return 0
+    return version or 0
+
+
+def _state(connection: Connection, version: int) -> SchemaMigration | None:
+    row = connection.execute(
+        text('SELECT name, backfill_cursor, completed_at FROM schemamigration WHERE version = :version'),
+        {'version': version},
+    ).first()
+    if row is None:
+        return None
+    return SchemaMigration(version=version, name=row[0], backfill_cursor=row[1], completed_at=row[2])
+
+
+def _apply(engine: Engine, migration: Migration, chunk_size: int) -> None:
+    with _write_transaction(engine) as connection:
+        state = _state(connection, migration.version)
+        if state is None:
+            needs_backfill = migration.upgrade(connection) and migration.backfill is not None
+            now = datetime.now(UTC)
+            connection.execute(
+                SchemaMigration.__table__.insert().values(
+                    version=migration.version,
+                    name=migration.name,
+                    backfill_cursor='' if needs_backfill else None,
+                    applied_at=now,
+                    completed_at=None if needs_backfill else now,
+                )
+            )
+            logger.info('applied migration %d %s', migration.version, migration.name)
+            if not needs_backfill:
+                return
+        elif state.completed_at is not None:
+            # Another process finished it while this one waited for the lock.
+            return
+    assert migration.backfill is not None
+    chunks = 0
+    while True:
+        with _write_transaction(engine) as connection:
+            state = _state(connection, migration.version)
+            if state is None or state.completed_at is not None:
+                return
+            cursor = migration.backfill(connection, state.backfill_cursor or None, chunk_size)
+            connection.execute(
+                SchemaMigration.__table__.update()
+                .where(SchemaMigration.__table__.c.version == migration.version)
+                .values(
+                    backfill_cursor=cursor,
+                    completed_at=datetime.now(UTC) if cursor is None else None,
+                )
+            )
+        chunks += 1
+        if cursor is None:
+            logger.info('backfilled migration %d %s in %d chunks', migration.version, migration.name, chunks)
+            return
+
+
+def migrate(engine: Engine, chunk_size: int | None = None) -> list[str]:
+    """Bring ``engine``'s database up to ``LATEST_VERSION``; returns the migrations it ran.
+
+    An up-to-date database costs a single query.
+    """
+    if schema_version(engine) >= LATEST_VERSION:
+        return []
+    chunk_size = chunk_size or backfill_chunk_size()
+    with _write_transaction(engine) as connection:
+        SchemaMigration.__table__.create(connection, checkfirst=True)
+    applied = []
+    for migration in MIGRATIONS:
+        with engine.connect() as connection:
+            state = _state(connection, migration.version)
+        if state is not None and state.completed_at is not None:
+            continue
+        _apply(engine, migration, chunk_size)
+        applied.append(migration.name)
+    return applied
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from src.models.memory_schemas import MemoryResponse
+from src.models.tag import TaggedItemType
+from src.models.theme_schemas import ThemeResponse
+
+
+class TombstoneResponse(BaseModel):
+    type: TaggedItemType
+    id: str
+    version: int
+    deletedAt: datetime
+
+
+class SessionChangesResponse(BaseModel):
+    sessionId: str
+    version: int
+    # Opaque; pass it back as ``since`` to fetch the next delta.
+    cursor: str
+    memories: list[MemoryResponse]
+    themes: list[ThemeResponse]
+    deleted: list[TombstoneResponse]
@@ -17,3 +17,23 @@ class ServiceStatus(BaseModel):
     status: ServiceState
     message: str
     checkedAt: datetime
+
+
+class StorageStatus(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    profile: str
+    configured: dict[str, str | int]
+    active: dict[str, str | int]
+
+
+class PayloadCacheStatus(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    maxBytes: int
+    bytes: int
+    entries: int
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
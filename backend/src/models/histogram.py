@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from datetime import datetime
+from enum import StrEnum
+
+from sqlmodel import Field, SQLModel
+
+
+class HistogramGranularity(StrEnum):
+    YEAR = 'year'
+    MONTH = 'month'
+    DAY = 'day'
+    HOUR = 'hour'
+
+
+class TimelineHistogramBucket(SQLModel, table=True):
+    """Per-session item counts, rolled up by the anchor time of each item.
+
+    Memories count towards the bucket of their point timestamp or range start;
+    themes towards the bucket of their start time.
+    """
+
+    session_id: str = Field(primary_key=True)
+    # Stored as the plain enum value because buckets are maintained with raw SQL.
+    granularity: str = Field(primary_key=True)
+    bucket_start: datetime = Field(primary_key=True)
+    memory_count: int = Field(default=0, nullable=False)
+    theme_count: int = Field(default=0, nullable=False)
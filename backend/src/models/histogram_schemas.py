@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from src.models.histogram import HistogramGranularity
+
+
+class HistogramBucket(BaseModel):
+    start: datetime
+    memories: int
+    themes: int
+
+
+class HistogramResponse(BaseModel):
+    sessionId: str
+    granularity: HistogramGranularity
+    buckets: list[HistogramBucket]
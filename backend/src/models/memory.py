@@ -5,6 +5,7 @@ from enum import StrEnum
 from typing import Optional
 from uuid import uuid4
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
@@ -16,11 +17,20 @@ class AnchorType(StrEnum):
 class TimelineSession(SQLModel, table=True):
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
     name: Optional[str] = None
+    # Bumped by every memory/theme write; list endpoints expose it as their ETag.
+    version: int = Field(default=0, nullable=False)
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
     updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
 
 
 class Memory(SQLModel, table=True):
+    __table_args__ = (
+        Index('ix_memory_session_timestamp', 'session_id', 'timestamp'),
+        Index('ix_memory_session_range', 'session_id', 'range_start', 'range_end'),
+        Index('ix_memory_session_created', 'session_id', 'created_at', 'id'),
+        Index('ix_memory_session_version', 'session_id', 'version'),
+    )
+
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
     session_id: str = Field(index=True)
     anchor_type: AnchorType
@@ -31,6 +41,8 @@ class Memory(SQLModel, table=True):
     description: Optional[str] = None
     tags_json: str = Field(default='[]', nullable=False)
     vertical_ratio: float = Field(default=0.3, nullable=False)
+    # Session version of the last write to this row; the delta endpoint filters on it.
+    version: int = Field(default=0, nullable=False)
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
     updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
 
@@ -11,5 +11,6 @@ class MemoryDeletionRecord(SQLModel, table=True):
     memory_id: str = Field(index=True)
     session_id: str = Field(index=True)
     snapshot_json: str
-    expires_at: datetime
+    # Indexed so the sweeper finds expired records without scanning the table.
+    expires_at: datetime = Field(index=True)
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
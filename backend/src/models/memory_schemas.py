@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Literal, Optional
+from typing import Annotated, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+MAX_BATCH_OPERATIONS = 5000
 
 
 class PointAnchor(BaseModel):
@@ -94,3 +96,47 @@ class MemoryResponse(BaseModel):
 
 class MemoryListResponse(BaseModel):
     memories: list[MemoryResponse]
+
+
+class MemoryBatchCreate(BaseModel):
+    op: Literal['create']
+    memory: MemoryCreateRequest
+
+
+class MemoryBatchPatch(BaseModel):
+    op: Literal['patch']
+    id: str
+    memory: MemoryUpdateRequest
+
+
+class MemoryBatchDelete(BaseModel):
+    op: Literal['delete']
+    id: str
+
+
+MemoryBatchOperation = Annotated[
+    MemoryBatchCreate | MemoryBatchPatch | MemoryBatchDelete,
+    Field(discriminator='op'),
+]
+
+
+class MemoryBatchRequest(BaseModel):
+    operations: list[MemoryBatchOperation] = Field(min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+
+class MemoryBatchResult(BaseModel):
+    index: int
+    op: Literal['create', 'patch', 'delete']
+    status: int
+    id: Optional[str] = None
+    memory: Optional[MemoryResponse] = None
+    error: Optional[str] = None
+
+
+class MemoryBatchResponse(BaseModel):
+    results: list[MemoryBatchResult]
+
+
+class MemoryDeletionResponse(BaseModel):
+    deletionId: str
+    undoExpiresAt: datetime
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class SchemaMigration(SQLModel, table=True):
+    """One row per applied migration; startup compares the highest completed version.
+
+    A migration whose data backfill is still running has ``completed_at`` unset and
+    ``backfill_cursor`` pointing after the last committed chunk.
+    """
+
+    version: int = Field(primary_key=True)
+    name: str
+    backfill_cursor: Optional[str] = None
+    applied_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
+    completed_at: Optional[datetime] = None
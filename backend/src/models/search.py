@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from sqlalchemy import DDL, event
+
+from src.models.memory import Memory
+
+# One FTS5 row per memory or theme. session_token is an indexed per-session hash,
+# so the session filter is resolved inside the full-text index; the UNINDEXED
+# columns carry what results and window filters need without a join.
+CREATE_TIMELINE_SEARCH = DDL(
+    'CREATE VIRTUAL TABLE IF NOT EXISTS timeline_search USING fts5('
+    'session_token, title, abbreviated_title, description, '
+    'session_id UNINDEXED, item_type UNINDEXED, item_id UNINDEXED, start_at UNINDEXED, end_at UNINDEXED, '
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+event.listen(Memory.__table__, 'after_create', CREATE_TIMELINE_SEARCH)
+event.listen(Memory.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS timeline_search'))
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+from src.models.tag import TaggedItemType
+
+
+class SearchHitResponse(BaseModel):
+    itemType: TaggedItemType
+    id: str
+    title: str
+    # HTML: the item text is escaped and matched words are wrapped in <mark>…</mark>.
+    titleHighlight: str
+    snippet: str | None = None
+    score: float
+
+
+class SearchResponse(BaseModel):
+    sessionId: str
+    results: list[SearchHitResponse]
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+from src.models.memory_schemas import MemoryResponse
+from src.models.theme_schemas import ThemeResponse
+from src.models.timeline import TimelineResponse
+
+
+class SessionSnapshotResponse(BaseModel):
+    sessionId: str
+    # Same counter the list endpoints expose through their ETag.
+    version: int
+    timeline: TimelineResponse
+    memories: list[MemoryResponse]
+    themes: list[ThemeResponse]
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from enum import StrEnum
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+class TaggedItemType(StrEnum):
+    MEMORY = 'memory'
+    THEME = 'theme'
+
+
+class ItemTag(SQLModel, table=True):
+    """One row per (item, tag), mirroring the ``tags_json`` column of memories and themes.
+
+    The primary key leads with ``(session_id, tag)`` so tag filters and facet counts
+    are answered from the index alone.
+    """
+
+    __table_args__ = (Index('ix_itemtag_item', 'item_id'),)
+
+    session_id: str = Field(primary_key=True)
+    tag: str = Field(primary_key=True)
+    # Stored as the plain enum value because rows are maintained with raw SQL.
+    item_type: str = Field(primary_key=True)
+    item_id: str = Field(primary_key=True)
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class TagFacet(BaseModel):
+    tag: str
+    memories: int
+    themes: int
+
+
+class TagFacetResponse(BaseModel):
+    sessionId: str
+    tags: list[TagFacet]
@@ -3,10 +3,16 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from uuid import uuid4
 
+from sqlalchemy import DDL, Column, Float, Index, Integer, MetaData, String, Table, event
 from sqlmodel import Field, SQLModel
 
 
 class Theme(SQLModel, table=True):
+    __table_args__ = (
+        Index('ix_theme_session_order', 'session_id', 'priority', 'created_at', 'id'),
+        Index('ix_theme_session_version', 'session_id', 'version'),
+    )
+
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
     session_id: str = Field(index=True)
     start_time: datetime
@@ -22,6 +28,8 @@ class Theme(SQLModel, table=True):
     height_px: float = Field(default=96)
     top_px: float = Field(default=120)
     bottom_px: float = Field(default=216)
+    # Session version of the last write to this row; the delta endpoint filters on it.
+    version: int = Field(default=0, nullable=False)
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
     updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
 
@@ -40,3 +48,28 @@ class Theme(SQLModel, table=True):
         if derived_height < 24 or derived_height > 600:
             raise ValueError('height must be in [24, 600]')
         self.height_px = derived_height
+
+
+# R*Tree over (session key, time, px) so viewport and hit-test queries are index
+# searches. The virtual table is not part of SQLModel metadata; it follows the
+# lifecycle of the theme table through the DDL hooks below.
+theme_rtree = Table(
+    'theme_rtree',
+    MetaData(),
+    Column('id', Integer, primary_key=True),
+    Column('min_session', Float),
+    Column('max_session', Float),
+    Column('min_time', Float),
+    Column('max_time', Float),
+    Column('min_px', Float),
+    Column('max_px', Float),
+    Column('theme_id', String),
+)
+
+CREATE_THEME_RTREE = DDL(
+    'CREATE VIRTUAL TABLE IF NOT EXISTS theme_rtree USING rtree('
+    'id, min_session, max_session, min_time, max_time, min_px, max_px, +theme_id)'
+)
+
+event.listen(Theme.__table__, 'after_create', CREATE_THEME_RTREE)
+event.listen(Theme.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS theme_rtree'))
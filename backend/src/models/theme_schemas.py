@@ -75,3 +75,29 @@ class ThemeResponse(BaseModel):
 class ThemeListResponse(BaseModel):
     sessionId: str
     themes: list[ThemeResponse]
+
+
+class ThemeLayoutSegment(BaseModel):
+    start: datetime
+    end: datetime
+    # Vertically overlapping themes drawn below and above this one, bottom first.
+    occludes: list[str]
+    occludedBy: list[str]
+
+
+class ThemeLayoutEntry(BaseModel):
+    id: str
+    # Draw order, matching the frontend's 1-based z-index.
+    zIndex: int
+    segments: list[ThemeLayoutSegment]
+
+
+class ThemeLayoutResponse(BaseModel):
+    sessionId: str
+    version: int
+    themes: list[ThemeLayoutEntry]
+
+
+class ThemeHitResponse(BaseModel):
+    sessionId: str
+    theme: ThemeResponse | None
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+class Tombstone(SQLModel, table=True):
+    """Marks a deleted memory or theme so delta sync can tell clients to drop it.
+
+    ``version`` is the session version of the deleting commit; the index on
+    ``(session_id, version)`` answers "deleted since" without touching the items.
+    """
+
+    __table_args__ = (Index('ix_tombstone_session_version', 'session_id', 'version'),)
+
+    session_id: str = Field(primary_key=True)
+    # Plain ``TaggedItemType`` value, as in ``ItemTag``.
+    item_type: str = Field(primary_key=True)
+    item_id: str = Field(primary_key=True)
+    version: int = Field(nullable=False)
+    deleted_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
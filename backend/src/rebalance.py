@@ -0,0 +1,186 @@
+"""Move sessions between shard files after changing ``TIMELINE_DB_SHARDS``.
+
+Run with the backend stopped::
+
+    python -m src.rebalance --shards 4
+
+Only sessions whose shard changes are moved, one at a time: the copy is committed
+on the target before the session is deleted from its source, so an interrupted
+run leaves at most a duplicate that rerunning the same command replaces. The new
+layout is stamped only once every session is in place.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+import logging
+from pathlib import Path
+
+from sqlalchemy import Connection, Engine, text
+from sqlmodel import Session
+
+from src.migrations import migrate
+from src.models.tag import TaggedItemType
+from src.repositories.histogram_repository import HistogramRepository
+from src.repositories.search_repository import SearchRepository
+from src.repositories.theme_spatial_index import index_themes, remove_themes
+from src.shards import ShardRing, holds_sessions, read_layout, shard_path, stamp_layout
+
+logger = logging.getLogger(__name__)
+
+# Tables keyed by session, with the column holding the session id. The histogram
+# and tag rows are plain copies; the FTS and R*Tree entries are re-derived on the
+# target because their keys are only meaningful inside one file.
+SESSION_TABLES = (
+    ('timelinesession', 'id'),
+    ('memory', 'session_id'),
+    ('theme', 'session_id'),
+    ('itemtag', 'session_id'),
+    ('tombstone', 'session_id'),
+    ('memorydeletionrecord', 'session_id'),
+    ('timelinehistogrambucket', 'session_id'),
+)
+_SESSIONS = text(
+    'SELECT id FROM timelinesession UNION SELECT session_id FROM memory UNION SELECT session_id FROM theme '
+    'UNION SELECT session_id FROM tombstone UNION SELECT session_id FROM memorydeletionrecord'
+)
+
+
+@dataclass
+class RebalanceReport:
+    shard_count: int
+    previous_shard_count: int
+    moved: list[tuple[str, int, int]] = field(default_factory=list)
+    # Files past the new shard count; empty once the run completes and safe to delete.
+    retired: list[Path] = field(default_factory=list)
+
+
+def _columns(connection: Connection, schema: str, table: str) -> list[str]:
+    return [str(row[1]) for row in connection.execute(text(f"PRAGMA {schema}.table_info('{table}')"))]
+
+
+def _item_ids(connection: Connection, table: str, session_id: str) -> list[str]:
+    rows = connection.execute(text(f'SELECT id FROM {table} WHERE session_id = :session_id'), {'session_id': session_id})
+    return [str(row[0]) for row in rows]
+
+
+def _delete_session(connection: Connection, session_id: str) -> None:
+    """Remove every trace of ``session_id`` from the connection's main database."""
+    memory_ids = _item_ids(connection, 'memory', session_id)
+    theme_ids = _item_ids(connection, 'theme', session_id)
+    with Session(bind=connection) as session:
+        SearchRepository(session).remove(memory_ids + theme_ids)
+    remove_themes(connection, theme_ids)
+    for table, column in SESSION_TABLES:
+        connection.execute(text(f'DELETE FROM {table} WHERE {column} = :session_id'), {'session_id': session_id})
+
+
+def move_session(session_id: str, source: Engine, target: Engine) -> None:
+    with target.connect() as connection:
+        # ATTACH is not allowed inside a transaction, so it precedes BEGIN.
+        connection.exec_driver_sql('ATTACH DATABASE ? AS source', (source.url.database,))
+        connection.commit()
+        try:
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+            _delete_session(connection, session_id)
+            for table, column in SESSION_TABLES:
+                # Older files may have columns in a different order, so copy by name.
+                source_columns = set(_columns(connection, 'source', table))
+                columns = ', '.join(name for name in _columns(connection, 'main', table) if name in source_columns)
+                connection.execute(
+                    text(
+                        f'INSERT INTO main.{table} ({columns}) SELECT {columns} FROM source.{table} '
+                        f'WHERE {column} = :session_id'
+                    ),
+                    {'session_id': session_id},
+                )
+            theme_ids = _item_ids(connection, 'theme', session_id)
+            with Session(bind=connection) as session:
+                search = SearchRepository(session)
+                search.sync(TaggedItemType.MEMORY, session_id, _item_ids(connection, 'memory', session_id))
+                search.sync(TaggedItemType.THEME, session_id, theme_ids)
+                if not _has_buckets(connection, session_id):
+                    HistogramRepository(session).rebuild_sessions([session_id])
+            index_themes(connection, [(theme_id, session_id) for theme_id in theme_ids])
+            connection.commit()
+        finally:
+            connection.rollback()
+            connection.exec_driver_sql('DETACH DATABASE source')
+    with source.connect() as connection:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+        _delete_session(connection, session_id)
+        connection.commit()
+
+
+def _has_buckets(connection: Connection, session_id: str) -> bool:
+    # A source that predates the histogram rollup has no buckets to copy.
+    return (
+        connection.execute(
+            text('SELECT 1 FROM timelinehistogrambucket WHERE session_id = :session_id LIMIT 1'),
+            {'session_id': session_id},
+        ).first()
+        is not None
+    )
+
+
+def rebalance(base_path: Path, shard_count: int, create_engine: Callable[[Path], Engine]) -> RebalanceReport:
+    """Lay the shard files next to ``base_path`` out for ``shard_count`` shards."""
+    base = create_engine(base_path)
+    previous = read_layout(base) or 1
+    existing = 1
+    while shard_path(base_path, existing).exists():
+        existing += 1
+    # Files left over from an interrupted run with a different count may hold sessions too.
+    total = max(previous, shard_count, existing)
+    engines = [base, *(create_engine(shard_path(base_path, index)) for index in range(1, total))]
+    for engine in engines:
+        migrate(engine)
+    ring = ShardRing(shard_count)
+    report = RebalanceReport(shard_count, previous)
+    for index, engine in enumerate(engines):
+        with engine.connect() as connection:
+            session_ids = sorted(str(row[0]) for row in connection.execute(_SESSIONS))
+        for session_id in session_ids:
+            target = ring.shard_for(session_id)
+            if target != index:
+                move_session(session_id, engine, engines[target])
+                report.moved.append((session_id, index, target))
+                logger.info('moved session %s from shard %d to %d', session_id, index, target)
+    for index, engine in enumerate(engines):
+        if index < shard_count:
+            stamp_layout(engine, shard_count)
+        else:
+            stamp_layout(engine, 0)
+            if not holds_sessions(engine):
+                report.retired.append(shard_path(base_path, index))
+    for engine in engines:
+        engine.dispose()
+    return report
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m src.rebalance', description=__doc__.splitlines()[0])
+    parser.add_argument('--shards', type=int, required=True, help='shard count to lay the database out for')
+    args = parser.parse_args(argv)
+    if args.shards < 1:
+        parser.error('--shards must be >= 1')
+    return args
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parse_args(argv)
+    from src.db import DB_PATH, create_shard_engine
+
+    report = rebalance(DB_PATH, args.shards, create_shard_engine)
+    print(f'{report.previous_shard_count} -> {report.shard_count} shards: moved {len(report.moved)} sessions')
+    for path in report.retired:
+        print(f'{path} no longer holds sessions and can be deleted')
+    print(f'start the backend with TIMELINE_DB_SHARDS={report.shard_count}')
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlalchemy import bindparam, text
+from sqlmodel import Session, or_, select
+
+from src.models.histogram import HistogramGranularity, TimelineHistogramBucket
+from src.timestamps import utc_window
+
+# strftime patterns that truncate a stored timestamp to the start of its bucket.
+# The fractional suffix keeps bucket keys byte-compatible with SQLAlchemy's
+# SQLite DateTime storage format, so bound datetimes compare correctly.
+BUCKET_PATTERNS: dict[HistogramGranularity, str] = {
+    HistogramGranularity.YEAR: '%Y-01-01 00:00:00.000000',
+    HistogramGranularity.MONTH: '%Y-%m-01 00:00:00.000000',
+    HistogramGranularity.DAY: '%Y-%m-%d 00:00:00.000000',
+    HistogramGranularity.HOUR: '%Y-%m-%d %H:00:00.000000',
+}
+
+_GRANULARITIES_CTE = 'WITH granularity(name, pattern) AS (VALUES {values})'.format(
+    values=', '.join(f"('{name.value}', '{pattern}')" for name, pattern in BUCKET_PATTERNS.items())
+)
+
+
+_COUNTED = 'count(*) * :delta'
+
+
+def _delta_statement(source: str, anchor: str, memory_count: str, theme_count: str, where: str):
+    return text(
+        f'''
+        {_GRANULARITIES_CTE}
+        INSERT INTO timelinehistogrambucket (session_id, granularity, bucket_start, memory_count, theme_count)
+        SELECT
+            item.session_id,
+            granularity.name,
+            strftime(granularity.pattern, {anchor}) AS bucket,
+            {memory_count},
+            {theme_count}
+        FROM {source} AS item CROSS JOIN granularity
+        WHERE {where}
+        GROUP BY item.session_id, granularity.name, bucket
+        ON CONFLICT (session_id, granularity, bucket_start) DO UPDATE SET
+            memory_count = memory_count + excluded.memory_count,
+            theme_count = theme_count + excluded.theme_count
+        '''
+    )
+
+
+_MEMORY_ANCHOR = 'coalesce(item.timestamp, item.range_start)'
+_THEME_ANCHOR = 'item.start_time'
+
+_MEMORY_DELTA = _delta_statement('memory', _MEMORY_ANCHOR, _COUNTED, '0', 'item.id IN :ids').bindparams(
+    bindparam('ids', expanding=True)
+)
+_THEME_DELTA = _delta_statement('theme', _THEME_ANCHOR, '0', _COUNTED, 'item.id IN :ids').bindparams(
+    bindparam('ids', expanding=True)
+)
+_MEMORY_REBUILD = _delta_statement('memory', _MEMORY_ANCHOR, _COUNTED, '0', 'true')
+_THEME_REBUILD = _delta_statement('theme', _THEME_ANCHOR, '0', _COUNTED, 'true')
+_MEMORY_SESSIONS_REBUILD = _delta_statement(
+    'memory', _MEMORY_ANCHOR, _COUNTED, '0', 'item.session_id IN :session_ids'
+).bindparams(bindparam('session_ids', expanding=True))
+_THEME_SESSIONS_REBUILD = _delta_statement(
+    'theme', _THEME_ANCHOR, '0', _COUNTED, 'item.session_id IN :session_ids'
+).bindparams(bindparam('session_ids', expanding=True))
+
+
+class HistogramRepository:
+    """Maintains per-bucket counts inside the caller's transaction.
+
+    Writers call ``record_*`` with ``delta=-1`` before a row changes or disappears
+    and with ``delta=1`` once the new row is flushed; the bucket is derived in SQL
+    from the stored row, so callers never need the previous anchor values.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def record_memories(self, memory_ids: Sequence[str], delta: int) -> None:
+        if memory_ids:
+            self.session.execute(_MEMORY_DELTA, {'ids': list(memory_ids), 'delta': delta})
+
+    def record_themes(self, theme_ids: Sequence[str], delta: int) -> None:
+        if theme_ids:
+            self.session.execute(_THEME_DELTA, {'ids': list(theme_ids), 'delta': delta})
+
+    def rebuild(self) -> None:
+        self.session.execute(TimelineHistogramBucket.__table__.delete())
+        self.session.execute(_MEMORY_REBUILD, {'delta': 1})
+        self.session.execute(_THEME_REBUILD, {'delta': 1})
+
+    def rebuild_sessions(self, session_ids: Sequence[str]) -> None:
+        """Recount the buckets of ``session_ids`` only; safe to repeat for the same sessions."""
+        if not session_ids:
+            return
+        params = {'session_ids': list(session_ids), 'delta': 1}
+        self.session.execute(
+            TimelineHistogramBucket.__table__.delete().where(
+                TimelineHistogramBucket.session_id.in_(list(session_ids))
+            )
+        )
+        self.session.execute(_MEMORY_SESSIONS_REBUILD, params)
+        self.session.execute(_THEME_SESSIONS_REBUILD, params)
+
+    def list_buckets(
+        self,
+        session_id: str,
+        granularity: HistogramGranularity,
+        window_start: datetime | None = None,
+        window_end: datetime | None = None,
+    ) -> list[TimelineHistogramBucket]:
+        window_start, window_end = utc_window(window_start, window_end)
+        statement = select(TimelineHistogramBucket).where(
+            TimelineHistogramBucket.session_id == session_id,
+            TimelineHistogramBucket.granularity == granularity.value,
+            # Buckets emptied by deletes or moves are kept at zero rather than pruned.
+            or_(TimelineHistogramBucket.memory_count > 0, TimelineHistogramBucket.theme_count > 0),
+        )
+        if window_start is not None:
+            statement = statement.where(TimelineHistogramBucket.bucket_start >= window_start)
+        if window_end is not None:
+            statement = statement.where(TimelineHistogramBucket.bucket_start <= window_end)
+        return list(self.session.exec(statement.order_by(TimelineHistogramBucket.bucket_start.asc())))
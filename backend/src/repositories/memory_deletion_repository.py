@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, insert
+from sqlmodel import Session, select
+
+from src.models.memory import Memory
+from src.models.memory_deletion import MemoryDeletionRecord
+
+
+class MemoryDeletionRepository:
+    """Snapshots of deleted memories kept for the undo window."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def record(self, memory: Memory, undo_window: timedelta) -> MemoryDeletionRecord:
+        """Snapshot ``memory`` inside the caller's transaction; the returned record is detached."""
+        record = MemoryDeletionRecord(
+            memory_id=memory.id,
+            session_id=memory.session_id,
+            snapshot_json=memory.model_dump_json(),
+            expires_at=datetime.now(UTC) + undo_window,
+        )
+        self.session.execute(insert(MemoryDeletionRecord).values(**record.model_dump()))
+        return record
+
+    def get(self, session_id: str, deletion_id: str) -> MemoryDeletionRecord | None:
+        record = self.session.get(MemoryDeletionRecord, deletion_id)
+        if record is None or record.session_id != session_id:
+            return None
+        return record
+
+    def remove(self, deletion_id: str) -> None:
+        self.session.execute(delete(MemoryDeletionRecord).where(MemoryDeletionRecord.deletion_id == deletion_id))
+
+    def purge_expired(self, now: datetime, limit: int) -> int:
+        """Delete up to ``limit`` expired records, oldest first, and return how many went."""
+        expired = (
+            select(MemoryDeletionRecord.deletion_id)
+            .where(MemoryDeletionRecord.expires_at <= now)
+            .order_by(MemoryDeletionRecord.expires_at.asc())
+            .limit(limit)
+        )
+        result = self.session.execute(
+            delete(MemoryDeletionRecord).where(MemoryDeletionRecord.deletion_id.in_(expired.scalar_subquery()))
+        )
+        return result.rowcount
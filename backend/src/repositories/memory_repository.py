@@ -1,35 +1,328 @@
 from __future__ import annotations
 
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
 import json
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
+from typing import Any, Literal
 
-from sqlmodel import Session, select
+from sqlalchemy import delete, func, insert, inspect, tuple_, update
+from sqlmodel import Session, and_, or_, select
 
-from src.models.memory import AnchorType, Memory, TimelineSession
-from src.models.memory_schemas import MemoryCreateRequest, MemoryUpdateRequest
+from src.models.memory import AnchorType, Memory
+from src.models.memory_deletion import MemoryDeletionRecord
+from src.models.tag import TaggedItemType
+from src.models.memory_schemas import (
+    MemoryBatchCreate,
+    MemoryBatchDelete,
+    MemoryBatchOperation,
+    MemoryCreateRequest,
+    MemoryUpdateRequest,
+)
+from src.repositories.histogram_repository import HistogramRepository
+from src.repositories.memory_deletion_repository import MemoryDeletionRepository
+from src.repositories.search_repository import SearchRepository
+from src.repositories.session_repository import SessionRepository
+from src.repositories.tag_repository import TagRepository
+from src.repositories.tombstone_repository import TombstoneRepository
+from src.timestamps import naive_utc
+
+
+@dataclass
+class MemoryBatchOutcome:
+    kind: Literal['created', 'updated', 'deleted', 'not_found', 'invalid']
+    memory_id: str | None = None
+    memory: Memory | None = None
+    error: str | None = None
 
 
 class MemoryRepository:
     def __init__(self, session: Session) -> None:
         self.session = session
+        self.sessions = SessionRepository(session)
+        self.histogram = HistogramRepository(session)
+        self.tags = TagRepository(session)
+        self.search = SearchRepository(session)
+        self.tombstones = TombstoneRepository(session)
+        self.deletions = MemoryDeletionRepository(session)
 
-    def ensure_session(self, session_id: str) -> TimelineSession:
-        existing = self.session.get(TimelineSession, session_id)
-        if existing:
-            return existing
-        created = TimelineSession(id=session_id)
-        self.session.add(created)
-        self.session.commit()
-        self.session.refresh(created)
-        return created
+    def list_memories(
+        self,
+        session_id: str,
+        window_start: datetime | None = None,
+        window_end: datetime | None = None,
+        *,
+        after: tuple[datetime, str] | None = None,
+        limit: int | None = None,
+        tags: Sequence[str] = (),
+        columns: Sequence[Any] = (),
+    ) -> list[Any]:
+        """Return ORM rows, or plain tuples of ``columns`` when they are given."""
+        statement = self._list_statement(session_id, window_start, window_end, after, limit, tags)
+        return self._fetch(statement, columns)
+
+    def list_memories_decimated(
+        self,
+        session_id: str,
+        stride: int,
+        selected_id: str | None = None,
+        window_start: datetime | None = None,
+        window_end: datetime | None = None,
+        tags: Sequence[str] = (),
+        columns: Sequence[Any] = (),
+    ) -> list[Any]:
+        """Return every ``stride``-th memory of the session in anchor order, plus ``selected_id``.
 
-    def list_memories(self, session_id: str) -> list[Memory]:
-        statement = select(Memory).where(Memory.session_id == session_id)
+        Positions are ranked over the whole session before the window is applied, so
+        the kept subset does not shift while the viewport pans.
+        """
+        anchor_time = func.coalesce(Memory.timestamp, Memory.range_start)
+        ranked = (
+            select(
+                Memory.id.label('memory_id'),
+                (func.row_number().over(order_by=(anchor_time.asc(), Memory.id.asc())) - 1).label('position'),
+            )
+            .where(Memory.session_id == session_id, *self._tag_clauses(session_id, tags))
+            .subquery()
+        )
+        keep = ranked.c.position % stride == 0
+        if selected_id is not None:
+            keep = or_(keep, Memory.id == selected_id)
+        statement = select(Memory).join(ranked, ranked.c.memory_id == Memory.id).where(keep)
+        if window_start is not None or window_end is not None:
+            statement = statement.where(self._window_clause(session_id, window_start, window_end))
+        return self._fetch(statement.order_by(ranked.c.position), columns)
+
+    def iter_memories(
+        self,
+        session_id: str,
+        window_start: datetime | None = None,
+        window_end: datetime | None = None,
+        *,
+        after: tuple[datetime, str] | None = None,
+        limit: int | None = None,
+        tags: Sequence[str] = (),
+        batch_size: int,
+    ) -> Iterator[Memory]:
+        statement = self._list_statement(session_id, window_start, window_end, after, limit, tags)
+        yield from self.session.exec(statement.execution_options(yield_per=batch_size))
+
+    def list_changed(self, session_id: str, after_version: int, columns: Sequence[Any] = ()) -> list[Any]:
+        """Memories written by commits after ``after_version``, in id order."""
+        statement = (
+            select(Memory)
+            .where(Memory.session_id == session_id, Memory.version > after_version)
+            .order_by(Memory.id.asc())
+        )
+        return self._fetch(statement, columns)
+
+    def _fetch(self, statement, columns: Sequence[Any]) -> list[Any]:
+        if columns:
+            return list(self.session.execute(statement.with_only_columns(*columns)))
         return list(self.session.exec(statement))
 
+    def _list_statement(
+        self,
+        session_id: str,
+        window_start: datetime | None,
+        window_end: datetime | None,
+        after: tuple[datetime, str] | None,
+        limit: int | None,
+        tags: Sequence[str] = (),
+    ):
+        if window_start is None and window_end is None:
+            statement = select(Memory).where(Memory.session_id == session_id)
+        else:
+            statement = select(Memory).where(self._window_clause(session_id, window_start, window_end))
+        if tags:
+            statement = statement.where(*self._tag_clauses(session_id, tags))
+        # Creation order, as lists have always been returned; the id breaks ties so
+        # (created_at, id) is a unique keyset for stable paging.
+        if after is not None:
+            statement = statement.where(tuple_(Memory.created_at, Memory.id) > tuple_(*after))
+        statement = statement.order_by(Memory.created_at.asc(), Memory.id.asc())
+        if limit is not None:
+            statement = statement.limit(limit)
+        return statement
+
+    @staticmethod
+    def _tag_clauses(session_id: str, tags: Sequence[str]) -> list:
+        return TagRepository.tagged_with(TaggedItemType.MEMORY, Memory.id, session_id, tags)
+
+    @staticmethod
+    def _window_clause(session_id: str, window_start: datetime | None, window_end: datetime | None):
+        # Each branch repeats the session filter so SQLite can answer the OR with one
+        # seek per composite index instead of scanning the whole session.
+        point_terms = [Memory.session_id == session_id]
+        range_terms = [Memory.session_id == session_id]
+        if window_start is not None:
+            window_start = naive_utc(window_start)
+            point_terms.append(Memory.timestamp >= window_start)
+            range_terms.append(Memory.range_end >= window_start)
+        if window_end is not None:
+            window_end = naive_utc(window_end)
+            point_terms.append(Memory.timestamp <= window_end)
+            range_terms.append(Memory.range_start <= window_end)
+        return or_(and_(*point_terms), and_(*range_terms))
+
     def create_memory(self, session_id: str, payload: MemoryCreateRequest) -> Memory:
-        self.ensure_session(session_id)
+        memory = self._build_memory(session_id, payload)
+        # The version upsert also creates the session row, so a first write needs no lookup.
+        memory.version = self.sessions.bump_version(session_id)
+        memory = self.session.scalars(insert(Memory).returning(Memory), [memory.model_dump()]).one()
+        self.histogram.record_memories([memory.id], 1)
+        if payload.tags:
+            self.tags.sync(TaggedItemType.MEMORY, [memory.id])
+        self.search.sync(TaggedItemType.MEMORY, session_id, [memory.id])
+        # Detach so commit does not expire the row and force a reload.
+        self.session.expunge(memory)
+        self.session.commit()
+        return memory
+
+    def update_memory(self, session_id: str, memory_id: str, payload: MemoryUpdateRequest) -> Memory | None:
+        memory = self.session.get(Memory, memory_id)
+        if not memory or memory.session_id != session_id:
+            return None
+
+        version = self.sessions.bump_version(session_id)
+        if payload.anchor is not None:
+            self.histogram.record_memories([memory_id], -1)
+        self._apply_update(memory, payload)
+        memory.version = version
+
+        # UPDATE ... RETURNING hands back the row as stored, so PATCH answers with the
+        # same values GET does (naive UTC, offsets dropped) without a second read.
+        changes = {attr.key: attr.value for attr in inspect(memory).attrs if attr.history.added}
+        self.session.expunge(memory)
+        statement = update(Memory).where(Memory.id == memory_id).values(changes).returning(Memory)
+        memory = self.session.scalars(statement).one()
+        if payload.anchor is not None:
+            self.histogram.record_memories([memory_id], 1)
+        if payload.tags is not None:
+            self.tags.sync(TaggedItemType.MEMORY, [memory_id])
+        self.search.sync(TaggedItemType.MEMORY, session_id, [memory_id])
+        self.session.expunge(memory)
+        self.session.commit()
+        return memory
+
+    def delete_memory(self, session_id: str, memory_id: str, undo_window: timedelta) -> MemoryDeletionRecord | None:
+        """Delete the memory and return the snapshot that can restore it until it expires."""
+        memory = self.session.get(Memory, memory_id)
+        if not memory or memory.session_id != session_id:
+            return None
+        record = self.deletions.record(memory, undo_window)
+        self.histogram.record_memories([memory_id], -1)
+        self.tags.remove([memory_id])
+        self.search.remove([memory_id])
+        self.session.delete(memory)
+        version = self.sessions.bump_version(session_id)
+        self.tombstones.record(TaggedItemType.MEMORY, session_id, [memory_id], version)
+        self.session.commit()
+        return record
+
+    def restore_memory(self, record: MemoryDeletionRecord) -> Memory:
+        """Re-insert a deleted memory from its snapshot, keeping its id, and consume the record."""
+        memory = Memory.model_validate(json.loads(record.snapshot_json))
+        memory.version = self.sessions.bump_version(record.session_id)
+        memory = self.session.scalars(insert(Memory).returning(Memory), [memory.model_dump()]).one()
+        self.histogram.record_memories([memory.id], 1)
+        self.tags.sync(TaggedItemType.MEMORY, [memory.id])
+        self.search.sync(TaggedItemType.MEMORY, record.session_id, [memory.id])
+        self.tombstones.clear(TaggedItemType.MEMORY, record.session_id, [memory.id])
+        self.deletions.remove(record.deletion_id)
+        self.session.expunge(memory)
+        self.session.commit()
+        return memory
+
+    def apply_batch(self, session_id: str, operations: Sequence[MemoryBatchOperation]) -> list[MemoryBatchOutcome]:
+        """Apply create/patch/delete operations with one statement per kind and one commit.
+
+        Operations are resolved in order against an in-memory view of the rows, so a
+        patch after a delete of the same id reports not found. Failed operations are
+        reported and skipped; the remaining ones commit together.
+        """
+        referenced_ids = {operation.id for operation in operations if not isinstance(operation, MemoryBatchCreate)}
+        current: dict[str, Memory] = {}
+        if referenced_ids:
+            statement = select(Memory).where(Memory.session_id == session_id, Memory.id.in_(referenced_ids))
+            for row in self.session.exec(statement):
+                # Detach so edits are written by the bulk UPDATE below, not by autoflush.
+                self.session.expunge(row)
+                current[row.id] = row
+
+        outcomes: list[MemoryBatchOutcome] = []
+        created: list[Memory] = []
+        updated: dict[str, Memory] = {}
+        deleted: list[str] = []
+        for operation in operations:
+            if isinstance(operation, MemoryBatchCreate):
+                try:
+                    memory = self._build_memory(session_id, operation.memory)
+                except ValueError as error:
+                    outcomes.append(MemoryBatchOutcome('invalid', error=str(error)))
+                    continue
+                created.append(memory)
+                outcomes.append(MemoryBatchOutcome('created', memory.id, memory))
+                continue
+
+            existing = current.get(operation.id)
+            if existing is None:
+                outcomes.append(MemoryBatchOutcome('not_found', operation.id))
+                continue
+
+            if isinstance(operation, MemoryBatchDelete):
+                del current[operation.id]
+                updated.pop(operation.id, None)
+                deleted.append(operation.id)
+                outcomes.append(MemoryBatchOutcome('deleted', operation.id))
+                continue
+
+            candidate = Memory(**existing.model_dump())
+            try:
+                self._apply_update(candidate, operation.memory)
+            except ValueError as error:
+                outcomes.append(MemoryBatchOutcome('invalid', operation.id, error=str(error)))
+                continue
+            current[operation.id] = candidate
+            updated[operation.id] = candidate
+            outcomes.append(MemoryBatchOutcome('updated', operation.id, candidate))
+
+        if created or updated or deleted:
+            version = self.sessions.bump_version(session_id)
+            for memory in [*created, *updated.values()]:
+                memory.version = version
+            self.tombstones.record(TaggedItemType.MEMORY, session_id, deleted, version)
+        self.histogram.record_memories([*updated, *deleted], -1)
+        stored: dict[str, Memory] = {}
+        if created:
+            statement = insert(Memory).returning(Memory, sort_by_parameter_order=True)
+            for row in self.session.scalars(statement, [memory.model_dump() for memory in created]):
+                stored[row.id] = row
+        if updated:
+            self.session.execute(update(Memory), [memory.model_dump() for memory in updated.values()])
+            statement = select(Memory).where(Memory.id.in_(updated.keys()))
+            for row in self.session.exec(statement.execution_options(populate_existing=True)):
+                stored[row.id] = row
+        self.histogram.record_memories([memory.id for memory in created] + list(updated), 1)
+        self.tags.sync(TaggedItemType.MEMORY, [memory.id for memory in created] + list(updated))
+        self.search.sync(TaggedItemType.MEMORY, session_id, [memory.id for memory in created] + list(updated))
+        if deleted:
+            self.tags.remove(deleted)
+            self.search.remove(deleted)
+            self.session.execute(delete(Memory).where(Memory.session_id == session_id, Memory.id.in_(deleted)))
+        # Detach before commit so the reported rows are not expired and reloaded one by one.
+        for row in stored.values():
+            self.session.expunge(row)
+        self.session.commit()
+
+        # Report the persisted rows so batch results match the single-item endpoints.
+        for outcome in outcomes:
+            if outcome.memory is not None and outcome.memory_id in stored:
+                outcome.memory = stored[outcome.memory_id]
+        return outcomes
 
+    @staticmethod
+    def _build_memory(session_id: str, payload: MemoryCreateRequest) -> Memory:
         memory = Memory(
             session_id=session_id,
             anchor_type=AnchorType(payload.anchor.type),
@@ -42,16 +335,10 @@ class MemoryRepository:
             vertical_ratio=payload.verticalRatio,
         )
         memory.ensure_valid_anchor()
-        self.session.add(memory)
-        self.session.commit()
-        self.session.refresh(memory)
         return memory
 
-    def update_memory(self, session_id: str, memory_id: str, payload: MemoryUpdateRequest) -> Memory | None:
-        memory = self.session.get(Memory, memory_id)
-        if not memory or memory.session_id != session_id:
-            return None
-
+    @staticmethod
+    def _apply_update(memory: Memory, payload: MemoryUpdateRequest) -> None:
         if payload.anchor is not None:
             memory.anchor_type = AnchorType(payload.anchor.type)
             memory.timestamp = getattr(payload.anchor, 'timestamp', None)
@@ -69,16 +356,3 @@ class MemoryRepository:
 
         memory.updated_at = datetime.now(UTC)
         memory.ensure_valid_anchor()
-
-        self.session.add(memory)
-        self.session.commit()
-        self.session.refresh(memory)
-        return memory
-
-    def delete_memory(self, session_id: str, memory_id: str) -> bool:
-        memory = self.session.get(Memory, memory_id)
-        if not memory or memory.session_id != session_id:
-            return False
-        self.session.delete(memory)
-        self.session.commit()
-        return True
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from hashlib import blake2b
+import html
+
+from sqlalchemy import DateTime, bindparam, text
+from sqlmodel import Session
+
+from src.models.tag import TaggedItemType
+from src.timestamps import utc_window
+
+HIGHLIGHT_OPEN = '<mark>'
+HIGHLIGHT_CLOSE = '</mark>'
+# FTS5 inserts its markers into the raw text, so it marks matches with control
+# characters that are swapped for <mark> only after the text has been escaped.
+_MATCH_OPEN = '\x02'
+_MATCH_CLOSE = '\x03'
+SNIPPET_TOKENS = 16
+# bm25 weights per column: session_token, title, abbreviated_title, description.
+_BM25 = 'bm25(timeline_search, 0.0, 10.0, 5.0, 1.0)'
+
+_SYNC = {
+    TaggedItemType.MEMORY: text(
+        '''
+        INSERT OR REPLACE INTO timeline_search
+            (rowid, session_token, title, abbreviated_title, description,
+             session_id, item_type, item_id, start_at, end_at)
+        SELECT :key, :session_token, title, NULL, description,
+               session_id, 'memory', id, coalesce(timestamp, range_start), coalesce(timestamp, range_end)
+        FROM memory
+        WHERE id = :item_id
+        '''
+    ),
+    TaggedItemType.THEME: text(
+        '''
+        INSERT OR REPLACE INTO timeline_search
+            (rowid, session_token, title, abbreviated_title, description,
+             session_id, item_type, item_id, start_at, end_at)
+        SELECT :key, :session_token, title, abbreviated_title, description,
+               session_id, 'theme', id, start_time, end_time
+        FROM theme
+        WHERE id = :item_id
+        '''
+    ),
+}
+_REMOVE = text('DELETE FROM timeline_search WHERE rowid = :key')
+
+
+def session_token(session_id: str) -> str:
+    return 's' + blake2b(session_id.encode(), digest_size=8).hexdigest()
+
+
+def item_key(item_id: str) -> int:
+    # Same scheme as the theme R*Tree: a stable signed 64-bit hash of the text id.
+    return int.from_bytes(blake2b(item_id.encode(), digest_size=8).digest(), 'big', signed=True)
+
+
+def render_highlight(marked: str) -> str:
+    """HTML-escape FTS5 ``highlight``/``snippet`` output and wrap the matches in ``<mark>``."""
+    return html.escape(marked).replace(_MATCH_OPEN, HIGHLIGHT_OPEN).replace(_MATCH_CLOSE, HIGHLIGHT_CLOSE)
+
+
+def match_expression(session_id: str, query: str) -> str | None:
+    """Build an FTS5 query from free text; every word must match, the last one as a prefix.
+
+    Words are quoted so user input is never parsed as FTS5 syntax. Returns ``None``
+    when ``query`` has no searchable characters.
+    """
+    words = [word for word in query.split() if any(char.isalnum() for char in word)]
+    if not words:
+        return None
+    phrases = ['"' + word.replace('"', '""') + '"' for word in words]
+    phrases[-1] += '*'
+    return f'session_token : {session_token(session_id)} AND {{title abbreviated_title description}} : ({" ".join(phrases)})'
+
+
+@dataclass
+class SearchHit:
+    item_type: TaggedItemType
+    item_id: str
+    title: str
+    title_highlight: str
+    snippet: str | None
+    score: float
+    key: int
+
+
+class SearchRepository:
+    """Keeps the FTS5 index in step with item writes, inside the caller's transaction.
+
+    Writers call ``sync`` once the new row is flushed and ``remove`` when it is
+    deleted; indexed text is read back from the stored rows.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def sync(self, item_type: TaggedItemType, session_id: str, item_ids: Sequence[str]) -> None:
+        if item_ids:
+            token = session_token(session_id)
+            self.session.execute(
+                _SYNC[item_type],
+                [{'key': item_key(item_id), 'session_token': token, 'item_id': item_id} for item_id in item_ids],
+            )
+
+    def remove(self, item_ids: Sequence[str]) -> None:
+        if item_ids:
+            self.session.execute(_REMOVE, [{'key': item_key(item_id)} for item_id in item_ids])
+
+    def rebuild(self) -> None:
+        self.session.execute(text('DELETE FROM timeline_search'))
+        for item_type, table in ((TaggedItemType.MEMORY, 'memory'), (TaggedItemType.THEME, 'theme')):
+            rows = self.session.execute(text(f'SELECT session_id, id FROM {table}')).fetchall()
+            by_session: dict[str, list[str]] = {}
+            for session_id, item_id in rows:
+                by_session.setdefault(session_id, []).append(item_id)
+            for session_id, item_ids in by_session.items():
+                self.sync(item_type, session_id, item_ids)
+
+    def search(
+        self,
+        session_id: str,
+        match: str,
+        *,
+        item_type: TaggedItemType | None = None,
+        window_start: datetime | None = None,
+        window_end: datetime | None = None,
+        after: tuple[float, int] | None = None,
+        limit: int,
+    ) -> list[SearchHit]:
+        """Rank matches by bm25 (lower is better), paging on ``(score, rowid)``.
+
+        bm25 depends on statistics over the whole index, so a write between two
+        pages shifts the scores: the next page can then repeat or skip a hit. Each
+        page is consistent on its own, and with no writes in between the pages
+        partition the results exactly.
+        """
+        window_start, window_end = utc_window(window_start, window_end)
+        clauses = ['timeline_search MATCH :match', 'session_id = :session_id']
+        params: dict[str, object] = {
+            'match': match,
+            'session_id': session_id,
+            'open': _MATCH_OPEN,
+            'close': _MATCH_CLOSE,
+            'limit': limit,
+        }
+        binds = []
+        if item_type is not None:
+            clauses.append('item_type = :item_type')
+            params['item_type'] = item_type.value
+        if window_start is not None:
+            clauses.append('end_at >= :window_start')
+            params['window_start'] = window_start
+            binds.append(bindparam('window_start', type_=DateTime))
+        if window_end is not None:
+            clauses.append('start_at <= :window_end')
+            params['window_end'] = window_end
+            binds.append(bindparam('window_end', type_=DateTime))
+        if after is not None:
+            clauses.append('(score > :after_score OR (score = :after_score AND rowid > :after_key))')
+            params['after_score'], params['after_key'] = after
+        statement = text(
+            f'''
+            SELECT item_type, item_id, title,
+                   highlight(timeline_search, 1, :open, :close),
+                   snippet(timeline_search, 3, :open, :close, '…', {SNIPPET_TOKENS}),
+                   {_BM25} AS score,
+                   rowid
+            FROM timeline_search
+            WHERE {' AND '.join(clauses)}
+            ORDER BY score, rowid
+            LIMIT :limit
+            '''
+        )
+        if binds:
+            # Bind datetimes through DateTime so they compare like the stored text.
+            statement = statement.bindparams(*binds)
+        return [
+            SearchHit(
+                item_type=TaggedItemType(row[0]),
+                item_id=row[1],
+                title=row[2],
+                title_highlight=render_highlight(row[3]),
+                snippet=render_highlight(row[4]) if row[4] else None,
+                score=row[5],
+                key=row[6],
+            )
+            for row in self.session.execute(statement, params)
+        ]
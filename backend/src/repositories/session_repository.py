@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, col, select
+
+from src.models.memory import TimelineSession
+
+
+class SessionRepository:
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        # Version written by the latest bump, for the services to announce after commit.
+        self.last_version: int | None = None
+
+    def begin_read(self) -> None:
+        """Start the transaction now so every following SELECT reads one snapshot.
+
+        pysqlite only emits BEGIN ahead of writes; without this each SELECT runs in
+        its own implicit transaction and may observe a different commit.
+        """
+        self.session.connection().exec_driver_sql('BEGIN')
+
+    def get_version(self, session_id: str) -> int:
+        version = self.session.exec(select(TimelineSession.version).where(TimelineSession.id == session_id)).first()
+        return version or 0
+
+    def get_versions(self, session_ids: list[str]) -> dict[str, int]:
+        """Versions of the given sessions in one query; sessions never written are left out."""
+        rows = self.session.exec(
+            select(TimelineSession.id, TimelineSession.version).where(col(TimelineSession.id).in_(session_ids))
+        )
+        return dict(rows.all())
+
+    def bump_version(self, session_id: str) -> int:
+        """Advance the session's change counter inside the caller's transaction."""
+        now = datetime.now(UTC)
+        statement = (
+            insert(TimelineSession)
+            .values(id=session_id, version=1, created_at=now, updated_at=now)
+            .on_conflict_do_update(
+                index_elements=[TimelineSession.id],
+                set_={'version': TimelineSession.version + 1, 'updated_at': now},
+            )
+            .returning(TimelineSession.version)
+        )
+        version = self.session.execute(statement).scalar_one()
+        self.last_version = version
+        return version
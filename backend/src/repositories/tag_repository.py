@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from sqlalchemy import bindparam, case, delete, func, text
+from sqlmodel import Session, select
+
+from src.models.tag import ItemTag, TaggedItemType
+
+
+def _sync_statement(source: str, item_type: TaggedItemType, where: str):
+    # json_each expands the stored tag list in SQL, so the index always matches tags_json.
+    return text(
+        f'''
+        INSERT OR IGNORE INTO itemtag (session_id, tag, item_type, item_id)
+        SELECT item.session_id, tag.value, '{item_type.value}', item.id
+        FROM {source} AS item, json_each(item.tags_json) AS tag
+        WHERE {where} AND tag.type = 'text'
+        '''
+    )
+
+
+_SYNC = {
+    item_type: _sync_statement(source, item_type, 'item.id IN :ids').bindparams(bindparam('ids', expanding=True))
+    for source, item_type in (('memory', TaggedItemType.MEMORY), ('theme', TaggedItemType.THEME))
+}
+_REBUILD = [
+    _sync_statement('memory', TaggedItemType.MEMORY, 'true'),
+    _sync_statement('theme', TaggedItemType.THEME, 'true'),
+]
+
+
+class TagRepository:
+    """Keeps the normalized tag index in step with item writes, inside the caller's transaction.
+
+    Writers call ``sync`` once the new row is flushed and ``remove`` before a row is
+    deleted; like the histogram, tags are read back from the stored rows.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def sync(self, item_type: TaggedItemType, item_ids: Sequence[str]) -> None:
+        if item_ids:
+            self.remove(item_ids)
+            self.session.execute(_SYNC[item_type], {'ids': list(item_ids)})
+
+    def remove(self, item_ids: Sequence[str]) -> None:
+        if item_ids:
+            self.session.execute(delete(ItemTag).where(ItemTag.item_id.in_(item_ids)))
+
+    def rebuild(self) -> None:
+        self.session.execute(delete(ItemTag))
+        for statement in _REBUILD:
+            self.session.execute(statement)
+
+    @staticmethod
+    def tagged_with(item_type: TaggedItemType, item_id_column, session_id: str, tags: Sequence[str]) -> list:
+        """Clauses restricting ``item_id_column`` to items carrying every tag in ``tags``."""
+        return [
+            item_id_column.in_(
+                select(ItemTag.item_id).where(
+                    ItemTag.session_id == session_id,
+                    ItemTag.tag == tag,
+                    ItemTag.item_type == item_type.value,
+                )
+            )
+            for tag in dict.fromkeys(tags)
+        ]
+
+    def facets(self, session_id: str, limit: int | None = None) -> list[tuple[str, int, int]]:
+        """Return ``(tag, memory_count, theme_count)`` ordered by total use, then tag."""
+        memories = func.count(case((ItemTag.item_type == TaggedItemType.MEMORY.value, 1)))
+        themes = func.count(case((ItemTag.item_type == TaggedItemType.THEME.value, 1)))
+        statement = (
+            select(ItemTag.tag, memories, themes)
+            .where(ItemTag.session_id == session_id)
+            .group_by(ItemTag.tag)
+            .order_by(func.count().desc(), ItemTag.tag.asc())
+        )
+        if limit is not None:
+            statement = statement.limit(limit)
+        return [(tag, memory_count, theme_count) for tag, memory_count, theme_count in self.session.exec(statement)]
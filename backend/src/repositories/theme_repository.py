@@ -1,39 +1,153 @@
 from __future__ import annotations
 
+from collections.abc import Iterator, Sequence
 import json
 from datetime import UTC, datetime
+from typing import Any
 
+from sqlalchemy import insert, inspect, tuple_, update
 from sqlmodel import Session, select
 
-from src.models.memory import TimelineSession
-from src.models.theme import Theme
+from src.models.tag import TaggedItemType
+from src.models.theme import Theme, theme_rtree
 from src.models.theme_schemas import ThemeCreateRequest, ThemeUpdateRequest
+from src.repositories.histogram_repository import HistogramRepository
+from src.repositories.search_repository import SearchRepository
+from src.repositories.session_repository import SessionRepository
+from src.repositories.tag_repository import TagRepository
+from src.repositories.theme_spatial_index import epoch_seconds, index_themes, remove_themes, session_key
+from src.repositories.tombstone_repository import TombstoneRepository
+from src.timestamps import naive_utc, utc_window
 
 
 class ThemeRepository:
     def __init__(self, session: Session) -> None:
         self.session = session
+        self.sessions = SessionRepository(session)
+        self.histogram = HistogramRepository(session)
+        self.tags = TagRepository(session)
+        self.search = SearchRepository(session)
+        self.tombstones = TombstoneRepository(session)
 
-    def ensure_session(self, session_id: str) -> TimelineSession:
-        existing = self.session.get(TimelineSession, session_id)
-        if existing:
-            return existing
-        created = TimelineSession(id=session_id)
-        self.session.add(created)
-        self.session.commit()
-        self.session.refresh(created)
-        return created
+    def list_themes(
+        self,
+        session_id: str,
+        *,
+        after_key: tuple[int, datetime, str] | None = None,
+        limit: int | None = None,
+        tags: Sequence[str] = (),
+        columns: Sequence[Any] = (),
+    ) -> list[Any]:
+        """Return ORM rows, or plain tuples of ``columns`` when they are given."""
+        return self._fetch(self._list_statement(session_id, after_key, limit, tags), columns)
 
-    def list_themes(self, session_id: str) -> list[Theme]:
+    def list_changed(self, session_id: str, after_version: int, columns: Sequence[Any] = ()) -> list[Any]:
+        """Themes written by commits after ``after_version``, in render order."""
         statement = (
             select(Theme)
-            .where(Theme.session_id == session_id)
+            .where(Theme.session_id == session_id, Theme.version > after_version)
             .order_by(Theme.priority.asc(), Theme.created_at.asc(), Theme.id.asc())
         )
+        return self._fetch(statement, columns)
+
+    def _fetch(self, statement, columns: Sequence[Any]) -> list[Any]:
+        if columns:
+            return list(self.session.execute(statement.with_only_columns(*columns)))
         return list(self.session.exec(statement))
 
+    def iter_themes(
+        self,
+        session_id: str,
+        *,
+        after_key: tuple[int, datetime, str] | None = None,
+        limit: int | None = None,
+        tags: Sequence[str] = (),
+        batch_size: int,
+    ) -> Iterator[Theme]:
+        statement = self._list_statement(session_id, after_key, limit, tags)
+        yield from self.session.exec(statement.execution_options(yield_per=batch_size))
+
+    def _list_statement(
+        self,
+        session_id: str,
+        after_key: tuple[int, datetime, str] | None,
+        limit: int | None,
+        tags: Sequence[str] = (),
+    ):
+        statement = (
+            select(Theme)
+            .where(Theme.session_id == session_id, *self._tag_clauses(session_id, tags))
+            .order_by(Theme.priority.asc(), Theme.created_at.asc(), Theme.id.asc())
+        )
+        if after_key is not None:
+            statement = statement.where(tuple_(Theme.priority, Theme.created_at, Theme.id) > tuple_(*after_key))
+        if limit is not None:
+            statement = statement.limit(limit)
+        return statement
+
+    @staticmethod
+    def _tag_clauses(session_id: str, tags: Sequence[str]) -> list:
+        return TagRepository.tagged_with(TaggedItemType.THEME, Theme.id, session_id, tags)
+
+    def list_themes_in_viewport(
+        self,
+        session_id: str,
+        window_start: datetime,
+        window_end: datetime,
+        top_px: float | None = None,
+        bottom_px: float | None = None,
+        columns: Sequence[Any] = (),
+    ) -> list[Any]:
+        window_start, window_end = utc_window(window_start, window_end)
+        key = session_key(session_id)
+        statement = (
+            select(Theme)
+            .join(theme_rtree, theme_rtree.c.theme_id == Theme.id)
+            .where(
+                theme_rtree.c.min_session <= key,
+                theme_rtree.c.max_session >= key,
+                theme_rtree.c.min_time <= epoch_seconds(window_end),
+                theme_rtree.c.max_time >= epoch_seconds(window_start),
+                # The R*Tree stores rounded float32 boxes, so re-check exact bounds.
+                Theme.session_id == session_id,
+                Theme.start_time <= window_end,
+                Theme.end_time >= window_start,
+            )
+            .order_by(Theme.priority.asc(), Theme.created_at.asc(), Theme.id.asc())
+        )
+        if bottom_px is not None:
+            statement = statement.where(theme_rtree.c.min_px <= bottom_px, Theme.top_px <= bottom_px)
+        if top_px is not None:
+            statement = statement.where(theme_rtree.c.max_px >= top_px, Theme.bottom_px >= top_px)
+        return self._fetch(statement, columns)
+
+    def find_topmost_theme(self, session_id: str, at: datetime, px: float) -> Theme | None:
+        at = naive_utc(at)
+        key = session_key(session_id)
+        point = epoch_seconds(at)
+        statement = (
+            select(Theme)
+            .join(theme_rtree, theme_rtree.c.theme_id == Theme.id)
+            .where(
+                theme_rtree.c.min_session <= key,
+                theme_rtree.c.max_session >= key,
+                theme_rtree.c.min_time <= point,
+                theme_rtree.c.max_time >= point,
+                theme_rtree.c.min_px <= px,
+                theme_rtree.c.max_px >= px,
+                Theme.session_id == session_id,
+                Theme.start_time <= at,
+                Theme.end_time >= at,
+                Theme.top_px <= px,
+                Theme.bottom_px >= px,
+            )
+            # Reverse of render order: the last theme drawn is the one on top.
+            .order_by(Theme.priority.desc(), Theme.created_at.desc(), Theme.id.desc())
+            .limit(1)
+        )
+        return self.session.exec(statement).first()
+
     def create_theme(self, session_id: str, payload: ThemeCreateRequest) -> Theme:
-        self.ensure_session(session_id)
         if payload.topPx is not None and payload.bottomPx is not None:
             top_px = payload.topPx
             bottom_px = payload.bottomPx
@@ -57,16 +171,27 @@ class ThemeRepository:
             bottom_px=bottom_px,
         )
         theme.ensure_valid()
-        self.session.add(theme)
+        # The version upsert also creates the session row, so a first write needs no lookup.
+        theme.version = self.sessions.bump_version(session_id)
+        theme = self.session.scalars(insert(Theme).returning(Theme), [theme.model_dump()]).one()
+        index_themes(self.session.connection(), [(theme.id, session_id)])
+        self.histogram.record_themes([theme.id], 1)
+        if payload.tags:
+            self.tags.sync(TaggedItemType.THEME, [theme.id])
+        self.search.sync(TaggedItemType.THEME, session_id, [theme.id])
+        # Detach so commit does not expire the row and force a reload.
+        self.session.expunge(theme)
         self.session.commit()
-        self.session.refresh(theme)
         return theme
 
     def update_theme(self, session_id: str, theme_id: str, payload: ThemeUpdateRequest) -> Theme | None:
         theme = self.session.get(Theme, theme_id)
         if not theme or theme.session_id != session_id:
             return None
+        version = self.sessions.bump_version(session_id)
         if payload.startTime is not None:
+            # Retire the old bucket while the stored row still has the previous start.
+            self.histogram.record_themes([theme_id], -1)
             theme.start_time = payload.startTime
         if payload.endTime is not None:
             theme.end_time = payload.endTime
@@ -92,16 +217,32 @@ class ThemeRepository:
             theme.bottom_px = theme.top_px + payload.heightPx
         theme.height_px = theme.bottom_px - theme.top_px
         theme.updated_at = datetime.now(UTC)
+        theme.version = version
         theme.ensure_valid()
-        self.session.add(theme)
+        # Written with RETURNING so the response is the stored row, exactly as GET lists it.
+        changes = {attr.key: attr.value for attr in inspect(theme).attrs if attr.history.added}
+        self.session.expunge(theme)
+        theme = self.session.scalars(update(Theme).where(Theme.id == theme_id).values(changes).returning(Theme)).one()
+        index_themes(self.session.connection(), [(theme.id, session_id)])
+        if payload.startTime is not None:
+            self.histogram.record_themes([theme_id], 1)
+        if payload.tags is not None:
+            self.tags.sync(TaggedItemType.THEME, [theme_id])
+        self.search.sync(TaggedItemType.THEME, session_id, [theme_id])
+        self.session.expunge(theme)
         self.session.commit()
-        self.session.refresh(theme)
         return theme
 
     def delete_theme(self, session_id: str, theme_id: str) -> bool:
         theme = self.session.get(Theme, theme_id)
         if not theme or theme.session_id != session_id:
             return False
+        remove_themes(self.session.connection(), [theme.id])
+        self.histogram.record_themes([theme_id], -1)
+        self.tags.remove([theme_id])
+        self.search.remove([theme_id])
         self.session.delete(theme)
+        version = self.sessions.bump_version(session_id)
+        self.tombstones.record(TaggedItemType.THEME, session_id, [theme_id], version)
         self.session.commit()
         return True
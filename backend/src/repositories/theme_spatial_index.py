@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime
+from hashlib import blake2b
+
+from sqlalchemy import Connection, DateTime, func, literal, text
+
+from src.models.theme import theme_rtree
+from src.timestamps import naive_utc
+
+# R*Tree coordinates are 32-bit floats, which represent integers up to 2**24 exactly,
+# so the session dimension uses a 24-bit key. Collisions are filtered by the join
+# back to theme.session_id.
+_SESSION_KEY_BYTES = 3
+_UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+_INDEX_THEME = text(
+    '''
+    INSERT OR REPLACE INTO theme_rtree
+        (id, min_session, max_session, min_time, max_time, min_px, max_px, theme_id)
+    SELECT
+        :key,
+        :session_key,
+        :session_key,
+        (julianday(start_time) - 2440587.5) * 86400.0,
+        (julianday(end_time) - 2440587.5) * 86400.0,
+        top_px,
+        bottom_px,
+        id
+    FROM theme
+    WHERE id = :theme_id
+    '''
+)
+_REMOVE_THEME = text('DELETE FROM theme_rtree WHERE id = :key')
+
+
+def session_key(session_id: str) -> int:
+    return int.from_bytes(blake2b(session_id.encode(), digest_size=_SESSION_KEY_BYTES).digest(), 'big')
+
+
+def theme_key(theme_id: str) -> int:
+    # Theme ids are text, and the implicit rowid of the theme table may change on
+    # VACUUM, so the R*Tree id is a stable signed 64-bit hash of the theme id.
+    return int.from_bytes(blake2b(theme_id.encode(), digest_size=8).digest(), 'big', signed=True)
+
+
+def epoch_seconds(value: datetime):
+    # Bind through DateTime so the bound value is formatted exactly like stored rows.
+    return (func.julianday(literal(naive_utc(value), DateTime)) - _UNIX_EPOCH_JULIAN_DAY) * 86400.0
+
+
+def index_themes(connection: Connection, themes: Sequence[tuple[str, str]]) -> None:
+    """Insert or refresh R*Tree entries for ``(theme_id, session_id)`` pairs."""
+    if not themes:
+        return
+    connection.execute(
+        _INDEX_THEME,
+        [
+            {'key': theme_key(theme_id), 'session_key': session_key(session_id), 'theme_id': theme_id}
+            for theme_id, session_id in themes
+        ],
+    )
+
+
+def remove_themes(connection: Connection, theme_ids: Sequence[str]) -> None:
+    if not theme_ids:
+        return
+    connection.execute(_REMOVE_THEME, [{'key': theme_key(theme_id)} for theme_id in theme_ids])
+
+
+def rebuild_theme_rtree(connection: Connection) -> None:
+    connection.execute(theme_rtree.delete())
+    rows = connection.execute(text('SELECT id, session_id FROM theme')).fetchall()
+    index_themes(connection, [(str(row[0]), str(row[1])) for row in rows])
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, select
+
+from src.models.tag import TaggedItemType
+from src.models.tombstone import Tombstone
+
+
+class TombstoneRepository:
+    """Records deletions inside the caller's transaction for ``/changes``."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def record(self, item_type: TaggedItemType, session_id: str, item_ids: Sequence[str], version: int) -> None:
+        if not item_ids:
+            return
+        now = datetime.now(UTC)
+        statement = insert(Tombstone)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Tombstone.session_id, Tombstone.item_type, Tombstone.item_id],
+            set_={'version': statement.excluded.version, 'deleted_at': statement.excluded.deleted_at},
+        )
+        self.session.execute(
+            statement,
+            [
+                {'session_id': session_id, 'item_type': item_type.value, 'item_id': item_id, 'version': version, 'deleted_at': now}
+                for item_id in item_ids
+            ],
+        )
+
+    def clear(self, item_type: TaggedItemType, session_id: str, item_ids: Sequence[str]) -> None:
+        """Forget tombstones for ids that exist again."""
+        if item_ids:
+            self.session.execute(
+                delete(Tombstone).where(
+                    Tombstone.session_id == session_id,
+                    Tombstone.item_type == item_type.value,
+                    Tombstone.item_id.in_(item_ids),
+                )
+            )
+
+    def list_since(self, session_id: str, after_version: int, columns: Sequence[Any] = ()) -> list[Any]:
+        """Return ORM rows, or plain tuples of ``columns`` when they are given."""
+        statement = (
+            select(Tombstone)
+            .where(Tombstone.session_id == session_id, Tombstone.version > after_version)
+            .order_by(Tombstone.version.asc(), Tombstone.item_type.asc(), Tombstone.item_id.asc())
+        )
+        if columns:
+            return list(self.session.execute(statement.with_only_columns(*columns)))
+        return list(self.session.exec(statement))
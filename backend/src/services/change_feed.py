@@ -0,0 +1,423 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from dataclasses import dataclass
+import json
+import logging
+import threading
+from typing import TYPE_CHECKING, Any
+import weakref
+
+import anyio.to_thread
+from sqlalchemy import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session
+
+from src import async_db, db
+from src.repositories.session_repository import SessionRepository
+
+if TYPE_CHECKING:
+    from src.async_db import SessionRunner
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_SIZE = 512
+DEFAULT_HISTORY_SESSIONS = 1024
+DEFAULT_BUFFER_SIZE = 256
+KEEPALIVE_SECONDS = 15.0
+VERSION_POLL_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    version: int
+    name: str
+    data: str
+
+    def encode(self) -> bytes:
+        return f'id: {self.version}\nevent: {self.name}\ndata: {self.data}\n\n'.encode()
+
+
+def change_event(version: int, item_type: str, op: str, item_id: str, item: dict[str, Any] | None = None) -> ChangeEvent:
+    """Build a ``memory.created``-style event; ``item`` is the JSON-mode response body."""
+    data: dict[str, Any] = {'type': item_type, 'op': op, 'id': item_id, 'version': version}
+    if item is not None:
+        data['item'] = item
+    return ChangeEvent(version, f'{item_type}.{op}', json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+
+
+def reset_event(version: int) -> ChangeEvent:
+    """Tell the client its view is stale and it must refetch; resuming from ``version`` is then safe."""
+    return ChangeEvent(version, 'reset', json.dumps({'version': version}))
+
+
+class ChangeSubscriber:
+    """One stream's mailbox, filled from any thread and drained on its event loop.
+
+    A consumer that falls ``buffer_size`` events behind loses its backlog and is
+    sent a single ``reset`` instead, so a slow client never grows server memory.
+    """
+
+    def __init__(self, session_id: str, buffer_size: int) -> None:
+        self.session_id = session_id
+        self.buffer_size = buffer_size
+        self.loop = asyncio.get_running_loop()
+        self.pending: deque[ChangeEvent] = deque()
+        self.overflow_version: int | None = None
+        self.wakeup = asyncio.Event()
+
+    def deliver(self, events: Sequence[ChangeEvent]) -> None:
+        if self.overflow_version is not None or len(self.pending) + len(events) > self.buffer_size:
+            dropped = [*self.pending, *events]
+            self.pending.clear()
+            self.overflow_version = max(event.version for event in dropped)
+        else:
+            self.pending.extend(events)
+        self.wakeup.set()
+
+
+class _Followed:
+    """Delivery state of a session that has streams open in this process."""
+
+    def __init__(self) -> None:
+        # Weak, so a stream whose body never started cannot pin its subscriber.
+        self.subscribers: weakref.WeakSet[ChangeSubscriber] = weakref.WeakSet()
+        # Highest version handed to the subscribers; None until a stream first reads one.
+        self.delivered: int | None = None
+        # Commits that finished ahead of an earlier one still being published.
+        self.held: dict[int, tuple[ChangeEvent, ...]] = {}
+        # A committed version that had not been delivered at the previous poll.
+        self.lagging: int | None = None
+
+    def admit(self, group: tuple[ChangeEvent, ...]) -> list[tuple[ChangeEvent, ...]]:
+        """The groups ``group`` releases, in version order; it is held while one before it is missing."""
+        version = group[0].version
+        if self.delivered is not None:
+            if version <= self.delivered:
+                # Already covered by a reset.
+                return []
+            if version > self.delivered + 1:
+                self.held[version] = group
+                return []
+        self.delivered = version
+        return [group, *self.release()]
+
+    def release(self) -> list[tuple[ChangeEvent, ...]]:
+        ready = []
+        while (group := self.held.pop(self.delivered + 1, None)) is not None:
+            ready.append(group)
+            self.delivered += 1
+        return ready
+
+
+class ChangeFeed:
+    """Per-session fan-out of committed changes with a short replay history.
+
+    History is kept as one group per committed version, so a resume never starts in
+    the middle of a batch. Only the ``history_sessions`` most recently written
+    sessions keep one; resuming any other session gets a ``reset``.
+
+    Commits publish after they land, so two that finish close together can publish
+    out of order; a followed session's groups are held back until the versions
+    before them have been delivered. The feed only sees commits made by this
+    process: ``watcher`` reports the versions in the database, and one this feed
+    still has not delivered a poll later is sent as a ``reset``.
+    """
+
+    def __init__(
+        self,
+        history_size: int = DEFAULT_HISTORY_SIZE,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        history_sessions: int = DEFAULT_HISTORY_SESSIONS,
+        watcher: VersionWatcher | None = None,
+    ) -> None:
+        self.history_size = history_size
+        self.buffer_size = buffer_size
+        self.history_sessions = history_sessions
+        self.watcher = watcher
+        self._history: OrderedDict[str, deque[tuple[ChangeEvent, ...]]] = OrderedDict()
+        self._followed: dict[str, _Followed] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, session_id: str, events: Sequence[ChangeEvent]) -> None:
+        """Record and fan out the events of one commit. Safe to call from any thread."""
+        if not events:
+            return
+        group = tuple(events)
+        with self._lock:
+            history = self._history.get(session_id)
+            if history is None:
+                history = self._history[session_id] = deque(maxlen=self.history_size)
+                if len(self._history) > self.history_sessions:
+                    self._history.popitem(last=False)
+            else:
+                self._history.move_to_end(session_id)
+            history.append(group)
+            followed = self._followed.get(session_id)
+            closed = [] if followed is None else self._fan_out(followed, followed.admit(group))
+        for subscriber in closed:
+            self.unsubscribe(subscriber)
+
+    def observe(self, session_id: str, version: int) -> bool:
+        """Compare a version read from the database with what was delivered.
+
+        Returns True while a newer version is waiting for the next poll to decide
+        whether this process is still publishing it or another worker committed it.
+        """
+        with self._lock:
+            followed = self._followed.get(session_id)
+            if followed is None or followed.delivered is None or version <= followed.delivered:
+                if followed is not None:
+                    followed.lagging = None
+                return False
+            if followed.lagging is None or followed.delivered >= followed.lagging:
+                followed.lagging = version
+                return True
+            # Still undelivered a poll later: another worker committed it.
+            followed.held = {held: group for held, group in followed.held.items() if held > version}
+            followed.delivered = version
+            followed.lagging = None
+            closed = self._fan_out(followed, [(reset_event(version),), *followed.release()])
+        for subscriber in closed:
+            self.unsubscribe(subscriber)
+        return False
+
+    def _fan_out(self, followed: _Followed, groups: list[tuple[ChangeEvent, ...]]) -> list[ChangeSubscriber]:
+        """Queue ``groups`` on every subscriber; called under the lock so they arrive in order."""
+        if not groups:
+            return []
+        events = [event for group in groups for event in group]
+        closed = []
+        for subscriber in followed.subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.deliver, events)
+            except RuntimeError:
+                # The subscriber's loop has shut down; its stream is already gone.
+                closed.append(subscriber)
+        return closed
+
+    def subscribe(self, session_id: str) -> ChangeSubscriber:
+        subscriber = ChangeSubscriber(session_id, self.buffer_size)
+        with self._lock:
+            followed = self._followed.get(session_id)
+            if followed is None:
+                followed = self._followed[session_id] = _Followed()
+                if self.watcher is not None:
+                    self.watcher.watch(self, session_id)
+            followed.subscribers.add(subscriber)
+        return subscriber
+
+    def start_at(self, session_id: str, version: int) -> None:
+        """Deliver in order from the version a stream read, unless one is already known."""
+        with self._lock:
+            followed = self._followed.get(session_id)
+            if followed is not None and followed.delivered is None:
+                followed.delivered = version
+
+    def unsubscribe(self, subscriber: ChangeSubscriber) -> None:
+        with self._lock:
+            followed = self._followed.get(subscriber.session_id)
+            if followed is None:
+                return
+            followed.subscribers.discard(subscriber)
+            if not followed.subscribers:
+                del self._followed[subscriber.session_id]
+                if self.watcher is not None:
+                    self.watcher.unwatch(subscriber.session_id)
+
+    def replay(self, session_id: str, after_version: int, current_version: int) -> list[ChangeEvent] | None:
+        """Events newer than ``after_version``, or None when the history no longer covers the gap.
+
+        Every version up to ``current_version`` must be in the history: one missing
+        in the middle was committed by another worker and cannot be replayed here.
+        """
+        if after_version >= current_version:
+            return []
+        with self._lock:
+            groups = [group for group in self._history.get(session_id, ()) if group[0].version > after_version]
+        # History is in publish order, which may trail commit order by a group.
+        groups.sort(key=lambda group: group[0].version)
+        versions = [group[0].version for group in groups if group[0].version <= current_version]
+        if versions != list(range(after_version + 1, current_version + 1)):
+            return None
+        return [event for group in groups for event in group]
+
+    def subscriber_count(self, session_id: str) -> int:
+        with self._lock:
+            followed = self._followed.get(session_id)
+            return 0 if followed is None else len(followed.subscribers)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._history.clear()
+
+
+class VersionWatcher:
+    """Reads the committed versions of followed sessions, one task per database file.
+
+    Each task keeps a connection open and runs ``PRAGMA data_version`` every
+    ``poll`` seconds. That value only changes after another connection commits to
+    the file, and only then are the versions of the file's followed sessions read,
+    in one query. Open streams thus cost one pragma per file per poll however many
+    there are, and hold no worker thread when the aiosqlite engine is available.
+    """
+
+    def __init__(self, poll: float = VERSION_POLL_SECONDS) -> None:
+        self.poll = poll
+        self._engines: dict[str, Any] = {}
+        self._sessions: dict[Any, set[str]] = {}
+        self._tasks: dict[Any, asyncio.Task[None]] = {}
+        self._lock = threading.Lock()
+
+    def watch(self, feed: ChangeFeed, session_id: str) -> None:
+        """Start reporting ``session_id`` to ``feed``; called on the subscribing stream's loop."""
+        engine = _engine_for(session_id)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._engines[session_id] = engine
+            self._sessions.setdefault(engine, set()).add(session_id)
+            task = self._tasks.get(engine)
+            if task is None or task.done() or task.get_loop() is not loop:
+                self._tasks[engine] = loop.create_task(self._run(feed, engine))
+
+    def unwatch(self, session_id: str) -> None:
+        # The file's task notices on its next poll and ends once nothing is left.
+        with self._lock:
+            engine = self._engines.pop(session_id, None)
+            if engine is not None:
+                self._sessions[engine].discard(session_id)
+
+    def _watched(self, engine: Any) -> list[str]:
+        with self._lock:
+            session_ids = sorted(self._sessions.get(engine, ()))
+            if not session_ids and self._tasks.get(engine) is asyncio.current_task():
+                del self._tasks[engine]
+                del self._sessions[engine]
+            return session_ids
+
+    async def _run(self, feed: ChangeFeed, engine: Any) -> None:
+        await asyncio.sleep(self.poll)
+        if not self._watched(engine):
+            return
+        while True:
+            try:
+                if isinstance(engine, AsyncEngine):
+                    async with engine.connect() as connection:
+                        await self._poll(feed, engine, lambda *args: connection.run_sync(_read_versions, *args))
+                else:
+                    with engine.connect() as connection:
+                        await self._poll(
+                            feed, engine, lambda *args: anyio.to_thread.run_sync(_read_versions, connection, *args)
+                        )
+                return
+            except Exception:
+                # A failed read (e.g. a busy database) reconnects on the next poll.
+                logger.exception('session version poll failed')
+                await asyncio.sleep(self.poll)
+
+    async def _poll(
+        self,
+        feed: ChangeFeed,
+        engine: Any,
+        read: Callable[[list[str], int | None], Awaitable[tuple[int, dict[str, int] | None]]],
+    ) -> None:
+        data_version: int | None = None
+        while session_ids := self._watched(engine):
+            data_version, versions = await read(session_ids, data_version)
+            if versions is not None:
+                lagging = [feed.observe(session_id, versions.get(session_id, 0)) for session_id in session_ids]
+                if any(lagging):
+                    # Read again next poll even if nothing else commits meanwhile.
+                    data_version = None
+            await asyncio.sleep(self.poll)
+
+
+def _engine_for(session_id: str) -> Any:
+    # Resolved per call, so the registries can be swapped after import.
+    if async_db.async_shards is not None:
+        return async_db.async_shards.for_session(session_id)
+    return db.engine_for(session_id)
+
+
+def _read_versions(
+    connection: Connection, session_ids: list[str], data_version: int | None
+) -> tuple[int, dict[str, int] | None]:
+    """The file's data version, and the sessions' versions unless it still equals ``data_version``."""
+    current = connection.exec_driver_sql('PRAGMA data_version').scalar_one()
+    versions = None
+    if current != data_version:
+        with Session(bind=connection) as session:
+            versions = SessionRepository(session).get_versions(session_ids)
+    # Leave no transaction open on the connection between polls.
+    connection.rollback()
+    return current, versions
+
+
+async def open_change_stream(
+    runner: SessionRunner, session_id: str, last_event_id: str | None
+) -> AsyncIterator[bytes]:
+    """Subscribe, read the session version, and return the SSE body for one client."""
+    resume_from = None
+    if last_event_id is not None:
+        try:
+            resume_from = int(last_event_id)
+        except ValueError as error:
+            raise ValueError('Last-Event-ID must be an integer version') from error
+    subscriber = change_feed.subscribe(session_id)
+    try:
+        version = await runner(lambda session: SessionRepository(session).get_version(session_id))
+    except Exception:
+        change_feed.unsubscribe(subscriber)
+        raise
+    return stream_changes(change_feed, subscriber, version, resume_from)
+
+
+async def stream_changes(
+    feed: ChangeFeed,
+    subscriber: ChangeSubscriber,
+    current_version: int,
+    last_event_id: int | None,
+    keepalive: float = KEEPALIVE_SECONDS,
+) -> AsyncIterator[bytes]:
+    """Yield SSE frames for ``subscriber`` until the client goes away.
+
+    The caller subscribes before reading ``current_version`` so no commit falls
+    between the two. A fresh stream opens with a ``ready`` frame carrying the
+    version; a resumed one replays what it missed, or sends ``reset``.
+    """
+    feed.start_at(subscriber.session_id, current_version)
+    try:
+        replayed_up_to = 0
+        if last_event_id is None:
+            yield ChangeEvent(current_version, 'ready', json.dumps({'version': current_version})).encode()
+        else:
+            missed = feed.replay(subscriber.session_id, last_event_id, current_version)
+            if missed is None:
+                yield reset_event(current_version).encode()
+                replayed_up_to = current_version
+            else:
+                replayed_up_to = last_event_id
+                for event in missed:
+                    yield event.encode()
+                    replayed_up_to = event.version
+        while True:
+            if subscriber.overflow_version is not None:
+                overflow_version, subscriber.overflow_version = subscriber.overflow_version, None
+                yield reset_event(overflow_version).encode()
+            frames = [event.encode() for event in subscriber.pending if event.version > replayed_up_to]
+            subscriber.pending.clear()
+            if frames:
+                yield b''.join(frames)
+            subscriber.wakeup.clear()
+            try:
+                await asyncio.wait_for(subscriber.wakeup.wait(), keepalive)
+            except TimeoutError:
+                # A comment frame keeps proxies from closing an idle stream.
+                yield b': keepalive\n\n'
+    finally:
+        feed.unsubscribe(subscriber)
+
+
+change_feed = ChangeFeed(watcher=VersionWatcher())
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from json.encoder import encode_basestring
+
+from sqlmodel import Session
+
+from src.repositories.memory_repository import MemoryRepository
+from src.repositories.theme_repository import ThemeRepository
+from src.repositories.tombstone_repository import TombstoneRepository
+from src.services.fast_json import (
+    MEMORY_COLUMNS,
+    THEME_COLUMNS,
+    TOMBSTONE_COLUMNS,
+    memory_array,
+    theme_array,
+    tombstone_array,
+)
+from src.services.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+class ChangesService:
+    """Delta sync: items written and deleted after a cursor, read from one transaction."""
+
+    def __init__(self, session: Session) -> None:
+        self.memories = MemoryRepository(session)
+        self.themes = ThemeRepository(session)
+        self.tombstones = TombstoneRepository(session)
+
+    def get_changes(self, session_id: str, since: str | None = None) -> bytes:
+        """Return an encoded ``SessionChangesResponse``.
+
+        Without ``since`` every live item is returned and there are no tombstones.
+        Rows are selected by the session version that last wrote them, which is
+        assigned under SQLite's write lock and so follows commit order.
+        """
+        after_version = self._decode_since(since)
+        self.memories.sessions.begin_read()
+        version = self.memories.sessions.get_version(session_id)
+        if after_version > version:
+            raise ValueError('since is ahead of the session; fetch a snapshot instead')
+        if since is None:
+            memory_rows = self.memories.list_memories(session_id, columns=MEMORY_COLUMNS)
+            theme_rows = self.themes.list_themes(session_id, columns=THEME_COLUMNS)
+            tombstone_rows = []
+        else:
+            memory_rows = self.memories.list_changed(session_id, after_version, columns=MEMORY_COLUMNS)
+            theme_rows = self.themes.list_changed(session_id, after_version, columns=THEME_COLUMNS)
+            tombstone_rows = self.tombstones.list_since(session_id, after_version, columns=TOMBSTONE_COLUMNS)
+
+        return (
+            '{"sessionId":%s,"version":%d,"cursor":%s,"memories":%s,"themes":%s,"deleted":%s}'
+            % (
+                encode_basestring(session_id),
+                version,
+                encode_basestring(encode_cursor([version])),
+                memory_array(memory_rows),
+                theme_array(theme_rows),
+                tombstone_array(tombstone_rows),
+            )
+        ).encode()
+
+    @staticmethod
+    def _decode_since(since: str | None) -> int:
+        if since is None:
+            return 0
+        (version,) = decode_cursor(since, 1)
+        if not isinstance(version, int) or isinstance(version, bool) or version < 0:
+            raise InvalidCursorError('invalid cursor')
+        return version
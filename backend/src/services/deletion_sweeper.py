@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+import logging
+import os
+
+import anyio
+import anyio.to_thread
+from sqlmodel import Session
+
+from src.db import shards
+from src.repositories.memory_deletion_repository import MemoryDeletionRepository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SWEEP_INTERVAL_SECONDS = 60.0
+DEFAULT_SWEEP_BATCH_SIZE = 500
+
+
+class DeletionSweeper:
+    """Purges expired undo snapshots off the request path.
+
+    Each batch is its own short transaction, so the write lock is released between
+    batches and a large backlog never blocks writers for long.
+    """
+
+    def __init__(self, interval: float, batch_size: int) -> None:
+        self.interval = interval
+        self.batch_size = batch_size
+
+    def sweep_once(self, now: datetime | None = None) -> int:
+        """Purge every record expired at ``now`` and return how many were removed."""
+        now = now or datetime.now(UTC)
+        purged = 0
+        for engine in shards.engines:
+            with Session(engine) as session:
+                repository = MemoryDeletionRepository(session)
+                while True:
+                    removed = repository.purge_expired(now, self.batch_size)
+                    session.commit()
+                    purged += removed
+                    if removed < self.batch_size:
+                        break
+        return purged
+
+    async def run(self) -> None:
+        """Sweep every ``interval`` seconds until cancelled; a non-positive interval disables it."""
+        if self.interval <= 0:
+            return
+        while True:
+            try:
+                await anyio.to_thread.run_sync(self.sweep_once)
+            except Exception:
+                # A failed sweep (e.g. a busy database) is retried on the next tick.
+                logger.exception('memory deletion sweep failed')
+            await anyio.sleep(self.interval)
+
+
+def _sweeper_from_env() -> DeletionSweeper:
+    interval = os.getenv('TIMELINE_SWEEP_INTERVAL_SECONDS', str(DEFAULT_SWEEP_INTERVAL_SECONDS))
+    batch_size = os.getenv('TIMELINE_SWEEP_BATCH_SIZE', str(DEFAULT_SWEEP_BATCH_SIZE))
+    try:
+        return DeletionSweeper(float(interval), max(int(batch_size), 1))
+    except ValueError as error:
+        raise ValueError('TIMELINE_SWEEP_INTERVAL_SECONDS and TIMELINE_SWEEP_BATCH_SIZE must be numbers') from error
+
+
+deletion_sweeper = _sweeper_from_env()
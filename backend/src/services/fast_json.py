@@ -0,0 +1,208 @@
+"""Encode list rows straight to JSON bytes, skipping per-row Pydantic models.
+
+The output is byte-identical to FastAPI rendering the matching response model
+with ``JSONResponse``: the same compact separators, the same string escaping
+(``json.encoder.encode_basestring``), ``float.__repr__`` for floats and
+Pydantic's ISO 8601 datetimes. Field order follows the response models.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime
+import json
+from json.encoder import encode_basestring
+from typing import Any
+
+from pydantic import BaseModel
+
+from src.models.memory import AnchorType, Memory
+from src.models.theme import Theme
+from src.models.tombstone import Tombstone
+from src.services.theme_layout import LayoutEntry
+
+MEMORY_COLUMNS = (
+    Memory.id,
+    Memory.session_id,
+    Memory.anchor_type,
+    Memory.timestamp,
+    Memory.range_start,
+    Memory.range_end,
+    Memory.title,
+    Memory.description,
+    Memory.tags_json,
+    Memory.vertical_ratio,
+    Memory.created_at,
+    Memory.updated_at,
+)
+
+THEME_COLUMNS = (
+    Theme.id,
+    Theme.session_id,
+    Theme.start_time,
+    Theme.end_time,
+    Theme.title,
+    Theme.abbreviated_title,
+    Theme.description,
+    Theme.tags_json,
+    Theme.color,
+    Theme.opacity,
+    Theme.priority,
+    Theme.top_px,
+    Theme.bottom_px,
+    Theme.created_at,
+    Theme.updated_at,
+)
+
+TOMBSTONE_COLUMNS = (
+    Tombstone.item_type,
+    Tombstone.item_id,
+    Tombstone.version,
+    Tombstone.deleted_at,
+)
+
+
+def _string(value: str | None) -> str:
+    return 'null' if value is None else encode_basestring(value)
+
+
+def _datetime(value: datetime) -> str:
+    text = value.isoformat()
+    # Pydantic writes UTC as "Z"; stored rows are naive and take the first branch.
+    if value.tzinfo is not None and text.endswith('+00:00'):
+        text = text[:-6] + 'Z'
+    return '"' + text + '"'
+
+
+class _TagCache(dict[str, str]):
+    """Re-encodes stored ``tags_json`` compactly, once per distinct value."""
+
+    def __missing__(self, tags_json: str) -> str:
+        encoded = json.dumps(
+            [str(tag) for tag in json.loads(tags_json or '[]')],
+            ensure_ascii=False,
+            separators=(',', ':'),
+        )
+        self[tags_json] = encoded
+        return encoded
+
+
+def _memory(row: Sequence[Any], tags: _TagCache) -> str:
+    (memory_id, session_id, anchor_type, timestamp, range_start, range_end,
+     title, description, tags_json, vertical_ratio, created_at, updated_at) = row
+    # Mirrors MemoryService._to_response, including its fallback for incomplete anchors.
+    if anchor_type == AnchorType.POINT:
+        anchor = '{"type":"point","timestamp":%s}' % _datetime(timestamp or datetime.now(UTC))
+    else:
+        anchor = '{"type":"range","start":%s,"end":%s}' % (
+            _datetime(range_start or datetime.now(UTC)),
+            _datetime(range_end or datetime.now(UTC)),
+        )
+    return (
+        '{"id":%s,"sessionId":%s,"anchor":%s,"title":%s,"description":%s,"tags":%s,'
+        '"verticalRatio":%r,"createdAt":%s,"updatedAt":%s}'
+    ) % (
+        encode_basestring(memory_id),
+        encode_basestring(session_id),
+        anchor,
+        encode_basestring(title),
+        _string(description),
+        tags[tags_json],
+        float(vertical_ratio),
+        _datetime(created_at),
+        _datetime(updated_at),
+    )
+
+
+def _theme(row: Sequence[Any], tags: _TagCache) -> str:
+    (theme_id, session_id, start_time, end_time, title, abbreviated_title, description,
+     tags_json, color, opacity, priority, top_px, bottom_px, created_at, updated_at) = row
+    return (
+        '{"id":%s,"sessionId":%s,"startTime":%s,"endTime":%s,"title":%s,"abbreviatedTitle":%s,'
+        '"description":%s,"tags":%s,"color":%s,"opacity":%r,"priority":%d,"topPx":%r,"bottomPx":%r,'
+        '"heightPx":%r,"createdAt":%s,"updatedAt":%s}'
+    ) % (
+        encode_basestring(theme_id),
+        encode_basestring(session_id),
+        _datetime(start_time),
+        _datetime(end_time),
+        encode_basestring(title),
+        _string(abbreviated_title),
+        _string(description),
+        tags[tags_json],
+        encode_basestring(color),
+        float(opacity),
+        priority,
+        float(top_px),
+        float(bottom_px),
+        float(bottom_px - top_px),
+        _datetime(created_at),
+        _datetime(updated_at),
+    )
+
+
+def memory_array(rows: Iterable[Sequence[Any]]) -> str:
+    """Encode ``MEMORY_COLUMNS`` rows as a JSON array of ``MemoryResponse`` objects."""
+    tags = _TagCache()
+    return '[' + ','.join(_memory(row, tags) for row in rows) + ']'
+
+
+def theme_array(rows: Iterable[Sequence[Any]]) -> str:
+    """Encode ``THEME_COLUMNS`` rows as a JSON array of ``ThemeResponse`` objects."""
+    tags = _TagCache()
+    return '[' + ','.join(_theme(row, tags) for row in rows) + ']'
+
+
+def tombstone_array(rows: Iterable[Sequence[Any]]) -> str:
+    """Encode ``TOMBSTONE_COLUMNS`` rows as a JSON array of ``TombstoneResponse`` objects."""
+    return '[' + ','.join(
+        '{"type":%s,"id":%s,"version":%d,"deletedAt":%s}'
+        % (encode_basestring(item_type), encode_basestring(item_id), version, _datetime(deleted_at))
+        for item_type, item_id, version, deleted_at in rows
+    ) + ']'
+
+
+def encode_memory_list(rows: Iterable[Sequence[Any]]) -> bytes:
+    """Encode ``MEMORY_COLUMNS`` rows as a ``MemoryListResponse`` body."""
+    return ('{"memories":%s}' % memory_array(rows)).encode()
+
+
+def encode_theme_list(session_id: str, rows: Iterable[Sequence[Any]]) -> bytes:
+    """Encode ``THEME_COLUMNS`` rows as a ``ThemeListResponse`` body."""
+    return ('{"sessionId":%s,"themes":%s}' % (encode_basestring(session_id), theme_array(rows))).encode()
+
+
+def encode_theme_layout(session_id: str, version: int, entries: Sequence[LayoutEntry]) -> bytes:
+    """Encode ``compute_layout`` output as a ``ThemeLayoutResponse`` body."""
+    # Segments repeat the same ids and boundaries many times; encode each once.
+    names = {entry.theme_id: encode_basestring(entry.theme_id) for entry in entries}
+    times: dict[datetime, str] = {}
+
+    def time(value: datetime) -> str:
+        encoded = times.get(value)
+        if encoded is None:
+            encoded = times[value] = _datetime(value)
+        return encoded
+
+    def id_list(theme_ids: tuple[str, ...]) -> str:
+        return '[' + ','.join(names[theme_id] for theme_id in theme_ids) + ']'
+
+    themes = ','.join(
+        '{"id":%s,"zIndex":%d,"segments":[%s]}'
+        % (
+            names[entry.theme_id],
+            entry.z_index,
+            ','.join(
+                '{"start":%s,"end":%s,"occludes":%s,"occludedBy":%s}'
+                % (time(segment.start), time(segment.end), id_list(segment.occludes), id_list(segment.occluded_by))
+                for segment in entry.segments
+            ),
+        )
+        for entry in entries
+    )
+    return ('{"sessionId":%s,"version":%d,"themes":[%s]}' % (encode_basestring(session_id), version, themes)).encode()
+
+
+def encode_model(model: BaseModel) -> str:
+    """Render a Pydantic model exactly as ``JSONResponse`` would."""
+    return json.dumps(model.model_dump(mode='json'), ensure_ascii=False, allow_nan=False, separators=(',', ':'))
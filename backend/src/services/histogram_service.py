@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlmodel import Session
+
+from src.models.histogram import HistogramGranularity
+from src.models.histogram_schemas import HistogramBucket, HistogramResponse
+from src.repositories.histogram_repository import HistogramRepository
+from src.timestamps import utc_window
+
+
+class HistogramService:
+    def __init__(self, session: Session) -> None:
+        self.repo = HistogramRepository(session)
+
+    def get_histogram(
+        self,
+        session_id: str,
+        granularity: HistogramGranularity,
+        window_start: datetime | None = None,
+        window_end: datetime | None = None,
+    ) -> HistogramResponse:
+        # Buckets are UTC; truncating a bound by its wall clock would shift it by the offset.
+        window_start, window_end = utc_window(window_start, window_end)
+        if window_start is not None and window_end is not None and window_end < window_start:
+            raise ValueError('to must be >= from')
+        if window_start is not None:
+            # Include the bucket that contains the window start.
+            window_start = self.truncate(window_start, granularity)
+        rows = self.repo.list_buckets(session_id, granularity, window_start, window_end)
+        return HistogramResponse(
+            sessionId=session_id,
+            granularity=granularity,
+            buckets=[
+                HistogramBucket(start=row.bucket_start, memories=row.memory_count, themes=row.theme_count)
+                for row in rows
+            ],
+        )
+
+    @staticmethod
+    def truncate(value: datetime, granularity: HistogramGranularity) -> datetime:
+        value = value.replace(minute=0, second=0, microsecond=0)
+        if granularity == HistogramGranularity.HOUR:
+            return value
+        value = value.replace(hour=0)
+        if granularity == HistogramGranularity.DAY:
+            return value
+        value = value.replace(day=1)
+        if granularity == HistogramGranularity.MONTH:
+            return value
+        return value.replace(month=1)
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
-from datetime import UTC, datetime
+from collections.abc import Callable, Iterator, Sequence
+from datetime import UTC, datetime, timedelta
 import json
+import os
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from sqlmodel import Session
 
 from src.models.memory import AnchorType, Memory
 from src.models.memory_schemas import (
+    MemoryBatchRequest,
+    MemoryBatchResponse,
+    MemoryBatchResult,
     MemoryCreateRequest,
+    MemoryDeletionResponse,
     MemoryListResponse,
     MemoryResponse,
     MemoryUpdateRequest,
@@ -15,34 +22,227 @@ from src.models.memory_schemas import (
     RangeAnchor,
 )
 from src.repositories.memory_repository import MemoryRepository
+from src.services.change_feed import change_event, change_feed
+from src.services.fast_json import MEMORY_COLUMNS, encode_memory_list
+from src.services.pagination import STREAM_BATCH_SIZE, InvalidCursorError, decode_cursor, encode_cursor
+from src.services.payload_cache import CachedPayload, payload_cache, payload_key
+from src.timestamps import utc_window
+
+if TYPE_CHECKING:
+    from src.async_db import SessionRunner
+
+T = TypeVar('T')
+
+DEFAULT_UNDO_WINDOW_SECONDS = 10.0
 
 
 class MemoryNotFoundError(Exception):
     pass
 
 
+class MemoryUndoExpiredError(Exception):
+    pass
+
+
+def _undo_window() -> timedelta:
+    value = os.getenv('TIMELINE_UNDO_WINDOW_SECONDS', str(DEFAULT_UNDO_WINDOW_SECONDS))
+    try:
+        return timedelta(seconds=max(float(value), 0.0))
+    except ValueError as error:
+        raise ValueError(f'TIMELINE_UNDO_WINDOW_SECONDS must be a number, got {value!r}') from error
+
+
+UNDO_WINDOW = _undo_window()
+
+
 class MemoryService:
+    BATCH_STATUS = {'created': 201, 'updated': 200, 'deleted': 204, 'not_found': 404, 'invalid': 422}
+
     def __init__(self, session: Session) -> None:
         self.repo = MemoryRepository(session)
 
-    def list_memories(self, session_id: str) -> MemoryListResponse:
-        rows = self.repo.list_memories(session_id)
+    def session_version(self, session_id: str) -> int:
+        return self.repo.sessions.get_version(session_id)
+
+    def list_memories(self, session_id: str, *args: Any, **kwargs: Any) -> MemoryListResponse:
+        rows = self._list_rows(session_id, *args, **kwargs)
         return MemoryListResponse(memories=[self._to_response(row) for row in rows])
 
+    def list_memories_json(self, session_id: str, *args: Any, **kwargs: Any) -> tuple[bytes, str | None]:
+        """Same page as ``list_memories``, encoded straight from row tuples, plus its next cursor."""
+        rows = self._list_rows(session_id, *args, columns=MEMORY_COLUMNS, **kwargs)
+        limit = kwargs.get('limit')
+        next_cursor = self._cursor(rows[-1].created_at, rows[-1].id) if limit is not None and len(rows) == limit else None
+        return encode_memory_list(rows), next_cursor
+
+    def _list_rows(
+        self,
+        session_id: str,
+        window_start: datetime | None = None,
+        window_end: datetime | None = None,
+        *,
+        after: str | None = None,
+        limit: int | None = None,
+        density: int | None = None,
+        selected_id: str | None = None,
+        tags: Sequence[str] = (),
+        columns: Sequence[Any] = (),
+    ) -> list[Any]:
+        self._validate_window(window_start, window_end)
+        if density is not None:
+            if after is not None or limit is not None:
+                raise ValueError('density cannot be combined with after/limit')
+            return self.repo.list_memories_decimated(
+                session_id,
+                self.density_stride(density),
+                selected_id,
+                window_start,
+                window_end,
+                tags,
+                columns,
+            )
+        return self.repo.list_memories(
+            session_id,
+            window_start,
+            window_end,
+            after=self._decode_after(after),
+            limit=limit,
+            tags=tags,
+            columns=columns,
+        )
+
+    def stream_memories(
+        self,
+        session_id: str,
+        window_start: datetime | None = None,
+        window_end: datetime | None = None,
+        *,
+        after: str | None = None,
+        limit: int | None = None,
+        tags: Sequence[str] = (),
+    ) -> Iterator[bytes]:
+        """Validate eagerly, then yield one NDJSON line per memory as rows are fetched."""
+        self._validate_window(window_start, window_end)
+        rows = self.repo.iter_memories(
+            session_id,
+            window_start,
+            window_end,
+            after=self._decode_after(after),
+            limit=limit,
+            tags=tags,
+            batch_size=STREAM_BATCH_SIZE,
+        )
+        return (self._to_response(row).model_dump_json().encode() + b'\n' for row in rows)
+
+    @staticmethod
+    def density_stride(density: int) -> int:
+        # Same thresholds as applyDeterministicDensity in the frontend's memory-density.ts.
+        if density >= 80:
+            return 3
+        if density >= 40:
+            return 2
+        return 1
+
+    @staticmethod
+    def next_cursor(page: MemoryListResponse, limit: int | None) -> str | None:
+        if limit is None or len(page.memories) < limit:
+            return None
+        last = page.memories[-1]
+        return MemoryService._cursor(last.createdAt, last.id)
+
+    @staticmethod
+    def _cursor(created_at: datetime, memory_id: str) -> str:
+        return encode_cursor([created_at.replace(tzinfo=None).isoformat(), memory_id])
+
+    @staticmethod
+    def _decode_after(after: str | None) -> tuple[datetime, str] | None:
+        if after is None:
+            return None
+        created_at, memory_id = decode_cursor(after, 2)
+        if not isinstance(created_at, str) or not isinstance(memory_id, str):
+            raise InvalidCursorError('invalid cursor')
+        try:
+            return datetime.fromisoformat(created_at), memory_id
+        except ValueError as error:
+            raise InvalidCursorError('invalid cursor') from error
+
+    @staticmethod
+    def _validate_window(window_start: datetime | None, window_end: datetime | None) -> None:
+        window_start, window_end = utc_window(window_start, window_end)
+        if window_start is not None and window_end is not None and window_end < window_start:
+            raise ValueError('to must be >= from')
+
     def create_memory(self, session_id: str, payload: MemoryCreateRequest) -> MemoryResponse:
         row = self.repo.create_memory(session_id, payload)
-        return self._to_response(row)
+        response = self._to_response(row)
+        self._publish(session_id, [('created', response.id, response)])
+        return response
 
     def update_memory(self, session_id: str, memory_id: str, payload: MemoryUpdateRequest) -> MemoryResponse:
         row = self.repo.update_memory(session_id, memory_id, payload)
         if row is None:
             raise MemoryNotFoundError(memory_id)
-        return self._to_response(row)
+        response = self._to_response(row)
+        self._publish(session_id, [('updated', memory_id, response)])
+        return response
 
-    def delete_memory(self, session_id: str, memory_id: str) -> None:
-        deleted = self.repo.delete_memory(session_id, memory_id)
-        if not deleted:
+    def delete_memory(self, session_id: str, memory_id: str) -> MemoryDeletionResponse:
+        record = self.repo.delete_memory(session_id, memory_id, UNDO_WINDOW)
+        if record is None:
             raise MemoryNotFoundError(memory_id)
+        self._publish(session_id, [('deleted', memory_id, None)])
+        return MemoryDeletionResponse(deletionId=record.deletion_id, undoExpiresAt=record.expires_at)
+
+    def undo_delete(self, session_id: str, deletion_id: str) -> MemoryResponse:
+        record = self.repo.deletions.get(session_id, deletion_id)
+        if record is None:
+            raise MemoryNotFoundError(deletion_id)
+        # Stored datetimes come back naive; they were written as UTC.
+        expires_at = record.expires_at.replace(tzinfo=record.expires_at.tzinfo or UTC)
+        if expires_at <= datetime.now(UTC):
+            raise MemoryUndoExpiredError(deletion_id)
+        row = self.repo.restore_memory(record)
+        response = self._to_response(row)
+        self._publish(session_id, [('created', response.id, response)])
+        return response
+
+    def apply_batch(self, session_id: str, payload: MemoryBatchRequest) -> MemoryBatchResponse:
+        outcomes = self.repo.apply_batch(session_id, payload.operations)
+        results = [
+            MemoryBatchResult(
+                index=index,
+                op=operation.op,
+                status=self.BATCH_STATUS[outcome.kind],
+                id=outcome.memory_id,
+                memory=self._to_response(outcome.memory) if outcome.memory is not None else None,
+                error=outcome.error,
+            )
+            for index, (operation, outcome) in enumerate(zip(payload.operations, outcomes))
+        ]
+        self._publish(
+            session_id,
+            [
+                (outcome.kind, outcome.memory_id, result.memory)
+                for outcome, result in zip(outcomes, results)
+                if outcome.kind in ('created', 'updated', 'deleted') and outcome.memory_id is not None
+            ],
+        )
+        return MemoryBatchResponse(results=results)
+
+    def _publish(self, session_id: str, changes: Sequence[tuple[str, str, MemoryResponse | None]]) -> None:
+        """Announce committed changes: drop the session's cached lists and push them on the change feed."""
+        version = self.repo.sessions.last_version
+        if version is None:
+            return
+        # Cached bodies are keyed by version and can no longer hit; free them once the write is durable.
+        payload_cache.invalidate_session(session_id)
+        change_feed.publish(
+            session_id,
+            [
+                change_event(version, 'memory', op, memory_id, memory.model_dump(mode='json') if memory else None)
+                for op, memory_id, memory in changes
+            ],
+        )
 
     def _to_response(self, row: Memory) -> MemoryResponse:
         if row.anchor_type == AnchorType.POINT:
@@ -61,3 +261,48 @@ class MemoryService:
             createdAt=row.created_at,
             updatedAt=row.updated_at,
         )
+
+
+class AsyncMemoryService:
+    """Awaitable counterpart of ``MemoryService`` for ``async def`` routes."""
+
+    def __init__(self, runner: SessionRunner) -> None:
+        self.runner = runner
+
+    async def _run(self, call: Callable[[MemoryService], T]) -> T:
+        return await self.runner(lambda session: call(MemoryService(session)))
+
+    async def session_version(self, session_id: str) -> int:
+        return await self._run(lambda service: service.session_version(session_id))
+
+    async def list_memories(self, session_id: str, *args: Any, **kwargs: Any) -> MemoryListResponse:
+        return await self._run(lambda service: service.list_memories(session_id, *args, **kwargs))
+
+    async def list_memories_json(
+        self, session_id: str, version: int, *args: Any, **kwargs: Any
+    ) -> tuple[bytes, str | None]:
+        """Serve from the payload cache when ``version`` still matches, else query and fill it."""
+        key = payload_key(session_id, version, 'memories', *args, **kwargs)
+        cached = payload_cache.get(key)
+        if cached is None:
+            body, next_cursor = await self._run(
+                lambda service: service.list_memories_json(session_id, *args, **kwargs)
+            )
+            cached = CachedPayload(body, next_cursor)
+            payload_cache.put(key, cached)
+        return cached.body, cached.next_cursor
+
+    async def create_memory(self, session_id: str, payload: MemoryCreateRequest) -> MemoryResponse:
+        return await self._run(lambda service: service.create_memory(session_id, payload))
+
+    async def update_memory(self, session_id: str, memory_id: str, payload: MemoryUpdateRequest) -> MemoryResponse:
+        return await self._run(lambda service: service.update_memory(session_id, memory_id, payload))
+
+    async def delete_memory(self, session_id: str, memory_id: str) -> MemoryDeletionResponse:
+        return await self._run(lambda service: service.delete_memory(session_id, memory_id))
+
+    async def undo_delete(self, session_id: str, deletion_id: str) -> MemoryResponse:
+        return await self._run(lambda service: service.undo_delete(session_id, deletion_id))
+
+    async def apply_batch(self, session_id: str, payload: MemoryBatchRequest) -> MemoryBatchResponse:
+        return await self._run(lambda service: service.apply_batch(session_id, payload))
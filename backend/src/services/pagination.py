@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(key: list[Any]) -> str:
+    """Encode a sort key into an opaque, URL-safe page cursor."""
+    raw = json.dumps(key, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise InvalidCursorError('invalid cursor') from error
+    if not isinstance(key, list) or len(key) != size:
+        raise InvalidCursorError('invalid cursor')
+    return key
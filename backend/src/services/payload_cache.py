@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+import os
+import threading
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+@dataclass
+class CachedPayload:
+    body: bytes
+    next_cursor: str | None
+
+
+@dataclass
+class PayloadCacheStats:
+    max_bytes: int
+    bytes: int
+    entries: int
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+
+class PayloadCache:
+    """Size-bounded LRU of encoded list bodies.
+
+    Keys start with ``(session_id, version)``. A write bumps the session version, so
+    a stale body can never be served. Writers also call ``invalidate_session`` so
+    superseded bodies free their memory without waiting to be evicted.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[Hashable, ...], CachedPayload] = OrderedDict()
+        self._keys_by_session: dict[Hashable, set[tuple[Hashable, ...]]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key: tuple[Hashable, ...]) -> CachedPayload | None:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return payload
+
+    def put(self, key: tuple[Hashable, ...], payload: CachedPayload) -> None:
+        size = len(payload.body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = payload
+            self._keys_by_session.setdefault(key[0], set()).add(key)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate_session(self, session_id: str) -> None:
+        with self._lock:
+            stale = self._keys_by_session.get(session_id, ())
+            self._invalidations += len(stale)
+            for key in list(stale):
+                self._discard(key)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_session.clear()
+            self._bytes = 0
+            self._hits = self._misses = self._evictions = self._invalidations = 0
+
+    def _discard(self, key: tuple[Hashable, ...]) -> None:
+        payload = self._entries.pop(key, None)
+        if payload is None:
+            return
+        self._bytes -= len(payload.body)
+        session_keys = self._keys_by_session[key[0]]
+        session_keys.discard(key)
+        if not session_keys:
+            del self._keys_by_session[key[0]]
+
+    def stats(self) -> PayloadCacheStats:
+        with self._lock:
+            return PayloadCacheStats(
+                max_bytes=self.max_bytes,
+                bytes=self._bytes,
+                entries=len(self._entries),
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                invalidations=self._invalidations,
+            )
+
+
+def payload_key(session_id: str, version: int, kind: str, *args: object, **kwargs: object) -> tuple[Hashable, ...]:
+    """Cache key for one list request; list arguments (tag filters) become tuples."""
+    def frozen(value: object) -> Hashable:
+        return tuple(value) if isinstance(value, (list, tuple)) else value  # type: ignore[return-value]
+
+    return (
+        session_id,
+        version,
+        kind,
+        tuple(frozen(value) for value in args),
+        tuple(sorted((name, frozen(value)) for name, value in kwargs.items())),
+    )
+
+
+def _max_bytes() -> int:
+    value = os.getenv('TIMELINE_PAYLOAD_CACHE_BYTES', str(DEFAULT_MAX_BYTES))
+    try:
+        return max(int(value), 0)
+    except ValueError as error:
+        raise ValueError(f'TIMELINE_PAYLOAD_CACHE_BYTES must be an integer, got {value!r}') from error
+
+
+payload_cache = PayloadCache(_max_bytes())
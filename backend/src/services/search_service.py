@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlmodel import Session
+
+from src.models.search_schemas import SearchHitResponse, SearchResponse
+from src.models.tag import TaggedItemType
+from src.repositories.search_repository import SearchRepository, match_expression
+from src.services.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from src.timestamps import utc_window
+
+DEFAULT_SEARCH_LIMIT = 50
+
+
+class SearchService:
+    def __init__(self, session: Session) -> None:
+        self.repo = SearchRepository(session)
+
+    def search(
+        self,
+        session_id: str,
+        query: str,
+        *,
+        item_type: TaggedItemType | None = None,
+        window_start: datetime | None = None,
+        window_end: datetime | None = None,
+        after: str | None = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> tuple[SearchResponse, str | None]:
+        window_start, window_end = utc_window(window_start, window_end)
+        if window_start is not None and window_end is not None and window_end < window_start:
+            raise ValueError('to must be >= from')
+        match = match_expression(session_id, query)
+        if match is None:
+            raise ValueError('q must contain at least one letter or digit')
+        hits = self.repo.search(
+            session_id,
+            match,
+            item_type=item_type,
+            window_start=window_start,
+            window_end=window_end,
+            after=self._decode_after(after),
+            limit=limit,
+        )
+        page = SearchResponse(
+            sessionId=session_id,
+            results=[
+                SearchHitResponse(
+                    itemType=hit.item_type,
+                    id=hit.item_id,
+                    title=hit.title,
+                    titleHighlight=hit.title_highlight,
+                    snippet=hit.snippet or None,
+                    score=hit.score,
+                )
+                for hit in hits
+            ],
+        )
+        next_cursor = encode_cursor([hits[-1].score, hits[-1].key]) if len(hits) == limit else None
+        return page, next_cursor
+
+    @staticmethod
+    def _decode_after(after: str | None) -> tuple[float, int] | None:
+        if after is None:
+            return None
+        score, key = decode_cursor(after, 2)
+        if not isinstance(score, (int, float)) or not isinstance(key, int):
+            raise InvalidCursorError('invalid cursor')
+        return float(score), key
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime
+from json.encoder import encode_basestring
+
+from sqlmodel import Session
+
+from src.repositories.memory_repository import MemoryRepository
+from src.repositories.theme_repository import ThemeRepository
+from src.services.fast_json import MEMORY_COLUMNS, THEME_COLUMNS, encode_model, memory_array, theme_array
+from src.services.timeline_service import TimelineService
+from src.timestamps import utc_window
+
+
+class SnapshotService:
+    """Initial-load payload: timeline config, memories and themes from one read transaction."""
+
+    def __init__(self, session: Session) -> None:
+        self.memories = MemoryRepository(session)
+        self.themes = ThemeRepository(session)
+        self.timeline = TimelineService()
+
+    def get_snapshot(
+        self,
+        session_id: str,
+        window_start: datetime | None = None,
+        window_end: datetime | None = None,
+    ) -> bytes:
+        """Return an encoded ``SessionSnapshotResponse``.
+
+        With a window, memories and themes are limited to items overlapping it, using
+        the same queries as the list and viewport endpoints.
+        """
+        if (window_start is None) != (window_end is None):
+            raise ValueError('from and to must be given together')
+        window_start, window_end = utc_window(window_start, window_end)
+        if window_start is not None and window_end is not None and window_end < window_start:
+            raise ValueError('to must be >= from')
+        timeline = encode_model(self.timeline.get_timeline())
+
+        self.memories.sessions.begin_read()
+        version = self.memories.sessions.get_version(session_id)
+        memory_rows = self.memories.list_memories(session_id, window_start, window_end, columns=MEMORY_COLUMNS)
+        if window_start is not None and window_end is not None:
+            theme_rows = self.themes.list_themes_in_viewport(session_id, window_start, window_end, columns=THEME_COLUMNS)
+        else:
+            theme_rows = self.themes.list_themes(session_id, columns=THEME_COLUMNS)
+
+        return (
+            '{"sessionId":%s,"version":%d,"timeline":%s,"memories":%s,"themes":%s}'
+            % (encode_basestring(session_id), version, timeline, memory_array(memory_rows), theme_array(theme_rows))
+        ).encode()
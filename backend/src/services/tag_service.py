@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from sqlmodel import Session
+
+from src.models.tag_schemas import TagFacet, TagFacetResponse
+from src.repositories.tag_repository import TagRepository
+
+
+class TagService:
+    def __init__(self, session: Session) -> None:
+        self.repo = TagRepository(session)
+
+    def get_facets(self, session_id: str, limit: int | None = None) -> TagFacetResponse:
+        return TagFacetResponse(
+            sessionId=session_id,
+            tags=[
+                TagFacet(tag=tag, memories=memories, themes=themes)
+                for tag, memories, themes in self.repo.facets(session_id, limit)
+            ],
+        )
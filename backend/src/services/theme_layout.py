@@ -0,0 +1,208 @@
+"""Sweep-line stacking layout for the themes visible in a time window."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterator, Sequence
+from datetime import UTC, datetime
+from itertools import groupby
+from typing import Any, NamedTuple
+
+from src.models.theme import Theme
+
+LAYOUT_COLUMNS = (Theme.id, Theme.start_time, Theme.end_time, Theme.top_px, Theme.bottom_px)
+
+
+class LayoutSegment(NamedTuple):
+    start: datetime
+    end: datetime
+    # Ids of vertically overlapping themes drawn below and above, bottom first.
+    occludes: tuple[str, ...]
+    occluded_by: tuple[str, ...]
+
+
+class LayoutEntry(NamedTuple):
+    theme_id: str
+    z_index: int
+    segments: list[LayoutSegment]
+
+
+def _utc(value: datetime) -> datetime:
+    # Stored rows are naive UTC; query parameters may carry any offset.
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value.astimezone(UTC)
+
+
+class _Band:
+    __slots__ = ('rank', 'top_px', 'bottom_px', 'below', 'above', 'opened_at', 'segments')
+
+    def __init__(self, rank: int, top_px: float, bottom_px: float) -> None:
+        self.rank = rank
+        self.top_px = top_px
+        self.bottom_px = bottom_px
+        # Ranks of the active, vertically overlapping themes on either side.
+        self.below: set[int] = set()
+        self.above: set[int] = set()
+        self.opened_at: datetime | None = None
+        self.segments: list[LayoutSegment] = []
+
+    def close(self, at: datetime, ids: Sequence[str]) -> None:
+        """End the open segment at ``at`` with the current neighbours."""
+        if self.opened_at is None or self.opened_at >= at:
+            return
+        occludes = tuple(ids[rank] for rank in sorted(self.below))
+        occluded_by = tuple(ids[rank] for rank in sorted(self.above))
+        previous = self.segments[-1] if self.segments else None
+        if previous and previous.end == self.opened_at and previous[2:] == (occludes, occluded_by):
+            # A neighbour left and another with the same role arrived: nothing changed.
+            self.segments[-1] = previous._replace(end=at)
+        else:
+            self.segments.append(LayoutSegment(self.opened_at, at, occludes, occluded_by))
+
+
+class _VerticalIndex:
+    """The active bands, searchable by vertical extent.
+
+    A segment tree over the distinct top/bottom edges of all bands. Each node keeps
+    the active bands covering its whole span, used to find the bands that contain a
+    band's top edge, and a count of active bands whose top edge lies in its span,
+    used to descend only into branches holding such bands. Insert, remove and
+    ``overlapping`` are O(log n), plus O(log n) per band reported.
+    """
+
+    def __init__(self, bands: Sequence[_Band]) -> None:
+        self._edges = sorted({band.top_px for band in bands} | {band.bottom_px for band in bands})
+        size = 4 * max(len(self._edges), 1)
+        self._covering: list[set[_Band]] = [set() for _ in range(size)]
+        self._top_counts = [0] * size
+        self._tops: dict[int, set[_Band]] = {}
+
+    def _leaf(self, value: float) -> int:
+        return bisect_left(self._edges, value)
+
+    def add(self, band: _Band) -> None:
+        self._update(band, True)
+
+    def remove(self, band: _Band) -> None:
+        self._update(band, False)
+
+    def _update(self, band: _Band, adding: bool) -> None:
+        top, bottom = self._leaf(band.top_px), self._leaf(band.bottom_px)
+        self._cover(1, 0, len(self._edges), top, bottom, band, adding)
+        node, low, high = 1, 0, len(self._edges)
+        while True:
+            self._top_counts[node] += 1 if adding else -1
+            if high - low == 1:
+                break
+            middle = (low + high) // 2
+            node, low, high = (2 * node, low, middle) if top < middle else (2 * node + 1, middle, high)
+        tops = self._tops.setdefault(top, set())
+        if adding:
+            tops.add(band)
+        else:
+            tops.discard(band)
+
+    def _cover(self, node: int, low: int, high: int, start: int, end: int, band: _Band, adding: bool) -> None:
+        # Leaf i stands for the span between edges i and i + 1.
+        if end <= low or high <= start:
+            return
+        if start <= low and high <= end:
+            if adding:
+                self._covering[node].add(band)
+            else:
+                self._covering[node].discard(band)
+            return
+        middle = (low + high) // 2
+        self._cover(2 * node, low, middle, start, end, band, adding)
+        self._cover(2 * node + 1, middle, high, start, end, band, adding)
+
+    def overlapping(self, band: _Band) -> Iterator[_Band]:
+        """Active bands sharing vertical space with ``band``; touching edges do not count."""
+        top, bottom = self._leaf(band.top_px), self._leaf(band.bottom_px)
+        # Bands that start at or above this top and reach past it...
+        node, low, high = 1, 0, len(self._edges)
+        while True:
+            yield from self._covering[node]
+            if high - low == 1:
+                break
+            middle = (low + high) // 2
+            node, low, high = (2 * node, low, middle) if top < middle else (2 * node + 1, middle, high)
+        # ...and bands that start strictly inside it.
+        yield from self._tops_between(1, 0, len(self._edges), top + 1, bottom)
+
+    def _tops_between(self, node: int, low: int, high: int, start: int, end: int) -> Iterator[_Band]:
+        if end <= low or high <= start or not self._top_counts[node]:
+            return
+        if high - low == 1:
+            yield from self._tops.get(low, ())
+            return
+        middle = (low + high) // 2
+        yield from self._tops_between(2 * node, low, middle, start, end)
+        yield from self._tops_between(2 * node + 1, middle, high, start, end)
+
+
+def compute_layout(rows: Sequence[Any], window_start: datetime, window_end: datetime) -> list[LayoutEntry]:
+    """Return draw order and per-interval occlusion for ``LAYOUT_COLUMNS`` rows.
+
+    ``rows`` must be in render order (priority, created_at, id). Each theme is
+    clipped to the window and split wherever the set of vertically overlapping
+    themes around it changes. Sorting the 2n start/end events costs O(n log n). A
+    starting theme finds its vertical neighbours through ``_VerticalIndex``, and a
+    leaving one already knows them, so the sweep costs O(log n) per event plus
+    O(log n) per overlap reported.
+    """
+    window_start, window_end = _utc(window_start), _utc(window_end)
+    ids = [row[0] for row in rows]
+    bands: list[_Band] = []
+    events: list[tuple[datetime, bool, _Band]] = []
+    for rank, (_, start_time, end_time, top_px, bottom_px) in enumerate(rows):
+        band = _Band(rank, top_px, bottom_px)
+        bands.append(band)
+        start, end = max(_utc(start_time), window_start), min(_utc(end_time), window_end)
+        if start < end:
+            events.append((start, True, band))
+            events.append((end, False, band))
+    events.sort(key=lambda event: event[0])
+
+    active: set[_Band] = set()
+    index = _VerticalIndex(bands)
+    for at, group in groupby(events, key=lambda event: event[0]):
+        leaving: list[_Band] = []
+        entering: list[_Band] = []
+        for _, starts, band in group:
+            (entering if starts else leaving).append(band)
+
+        # Close every segment whose neighbours change here before touching any sets.
+        touched = set(leaving)
+        for band in leaving:
+            touched.update(bands[rank] for rank in band.below | band.above)
+        # Ends apply before starts at the same instant, so themes that only touch do not overlap.
+        present = active.difference(leaving)
+        for band in leaving:
+            index.remove(band)
+        links: list[tuple[_Band, _Band]] = []
+        for band in entering:
+            for other in index.overlapping(band):
+                links.append((band, other))
+                touched.add(other)
+            present.add(band)
+            index.add(band)
+        for band in touched:
+            band.close(at, ids)
+
+        for band in leaving:
+            for rank in band.below | band.above:
+                bands[rank].below.discard(band.rank)
+                bands[rank].above.discard(band.rank)
+            band.below.clear()
+            band.above.clear()
+            band.opened_at = None
+        for band, other in links:
+            lower, upper = (other, band) if other.rank < band.rank else (band, other)
+            upper.below.add(lower.rank)
+            lower.above.add(upper.rank)
+        active = present
+        for band in touched.union(entering):
+            if band in active:
+                band.opened_at = at
+
+    return [LayoutEntry(ids[band.rank], band.rank + 1, band.segments) for band in bands if band.segments]
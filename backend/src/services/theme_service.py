@@ -1,17 +1,32 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Iterator, Sequence
+from datetime import datetime
 import json
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from sqlmodel import Session
 
 from src.models.theme import Theme
 from src.models.theme_schemas import (
     ThemeCreateRequest,
+    ThemeHitResponse,
     ThemeListResponse,
     ThemeResponse,
     ThemeUpdateRequest,
 )
 from src.repositories.theme_repository import ThemeRepository
+from src.services.change_feed import change_event, change_feed
+from src.services.fast_json import THEME_COLUMNS, encode_theme_layout, encode_theme_list
+from src.services.pagination import STREAM_BATCH_SIZE, InvalidCursorError, decode_cursor, encode_cursor
+from src.services.payload_cache import CachedPayload, payload_cache, payload_key
+from src.services.theme_layout import LAYOUT_COLUMNS, compute_layout
+from src.timestamps import naive_utc, utc_window
+
+if TYPE_CHECKING:
+    from src.async_db import SessionRunner
+
+T = TypeVar('T')
 
 
 class ThemeNotFoundError(Exception):
@@ -24,26 +39,140 @@ class ThemeService:
     def __init__(self, session: Session) -> None:
         self.repo = ThemeRepository(session)
 
-    def list_themes(self, session_id: str) -> ThemeListResponse:
-        rows = self.repo.list_themes(session_id)
+    def session_version(self, session_id: str) -> int:
+        return self.repo.sessions.get_version(session_id)
+
+    def list_themes(
+        self,
+        session_id: str,
+        *,
+        after: str | None = None,
+        limit: int | None = None,
+        tags: Sequence[str] = (),
+    ) -> ThemeListResponse:
+        rows = self.repo.list_themes(session_id, after_key=self._decode_after(after), limit=limit, tags=tags)
         return ThemeListResponse(sessionId=session_id, themes=[self._to_response(row) for row in rows])
 
+    def list_themes_json(
+        self,
+        session_id: str,
+        *,
+        after: str | None = None,
+        limit: int | None = None,
+        tags: Sequence[str] = (),
+    ) -> tuple[bytes, str | None]:
+        """Same page as ``list_themes``, encoded straight from row tuples, plus its next cursor."""
+        rows = self.repo.list_themes(
+            session_id,
+            after_key=self._decode_after(after),
+            limit=limit,
+            tags=tags,
+            columns=THEME_COLUMNS,
+        )
+        next_cursor = None
+        if limit is not None and len(rows) == limit:
+            last = rows[-1]
+            next_cursor = encode_cursor([last.priority, last.created_at.isoformat(), last.id])
+        return encode_theme_list(session_id, rows), next_cursor
+
+    def stream_themes(
+        self,
+        session_id: str,
+        *,
+        after: str | None = None,
+        limit: int | None = None,
+        tags: Sequence[str] = (),
+    ) -> Iterator[bytes]:
+        """Validate eagerly, then yield one NDJSON line per theme as rows are fetched."""
+        rows = self.repo.iter_themes(
+            session_id,
+            after_key=self._decode_after(after),
+            limit=limit,
+            tags=tags,
+            batch_size=STREAM_BATCH_SIZE,
+        )
+        return (self._to_response(row).model_dump_json().encode() + b'\n' for row in rows)
+
+    @staticmethod
+    def next_cursor(page: ThemeListResponse, limit: int | None) -> str | None:
+        if limit is None or len(page.themes) < limit:
+            return None
+        last = page.themes[-1]
+        return encode_cursor([last.priority, last.createdAt.isoformat(), last.id])
+
+    @staticmethod
+    def _decode_after(after: str | None) -> tuple[int, datetime, str] | None:
+        if after is None:
+            return None
+        priority, created_at, theme_id = decode_cursor(after, 3)
+        if not isinstance(priority, int) or not isinstance(created_at, str) or not isinstance(theme_id, str):
+            raise InvalidCursorError('invalid cursor')
+        try:
+            return priority, datetime.fromisoformat(created_at), theme_id
+        except ValueError as error:
+            raise InvalidCursorError('invalid cursor') from error
+
+    def list_themes_in_viewport(
+        self,
+        session_id: str,
+        window_start: datetime,
+        window_end: datetime,
+        top_px: float | None = None,
+        bottom_px: float | None = None,
+    ) -> ThemeListResponse:
+        window_start, window_end = utc_window(window_start, window_end)
+        if window_end < window_start:
+            raise ValueError('to must be >= from')
+        if top_px is not None and bottom_px is not None and bottom_px < top_px:
+            raise ValueError('bottomPx must be >= topPx')
+        rows = self.repo.list_themes_in_viewport(session_id, window_start, window_end, top_px, bottom_px)
+        return ThemeListResponse(sessionId=session_id, themes=[self._to_response(row) for row in rows])
+
+    def get_layout(self, session_id: str, window_start: datetime, window_end: datetime) -> bytes:
+        """Encoded ``ThemeLayoutResponse`` for the themes overlapping the window."""
+        window_start, window_end = naive_utc(window_start), naive_utc(window_end)
+        if window_end <= window_start:
+            raise ValueError('to must be > from')
+        self.repo.sessions.begin_read()
+        version = self.repo.sessions.get_version(session_id)
+        rows = self.repo.list_themes_in_viewport(session_id, window_start, window_end, columns=LAYOUT_COLUMNS)
+        return encode_theme_layout(session_id, version, compute_layout(rows, window_start, window_end))
+
+    def find_topmost_theme(self, session_id: str, at: datetime, px: float) -> ThemeHitResponse:
+        row = self.repo.find_topmost_theme(session_id, at, px)
+        return ThemeHitResponse(sessionId=session_id, theme=self._to_response(row) if row else None)
+
     def create_theme(self, session_id: str, payload: ThemeCreateRequest) -> ThemeResponse:
         self._normalize_payload_geometry(payload)
         row = self.repo.create_theme(session_id, payload)
-        return self._to_response(row)
+        response = self._to_response(row)
+        self._publish(session_id, 'created', response.id, response)
+        return response
 
     def update_theme(self, session_id: str, theme_id: str, payload: ThemeUpdateRequest) -> ThemeResponse:
         self._normalize_payload_geometry(payload)
         row = self.repo.update_theme(session_id, theme_id, payload)
         if row is None:
             raise ThemeNotFoundError(theme_id)
-        return self._to_response(row)
+        response = self._to_response(row)
+        self._publish(session_id, 'updated', theme_id, response)
+        return response
 
     def delete_theme(self, session_id: str, theme_id: str) -> None:
         deleted = self.repo.delete_theme(session_id, theme_id)
         if not deleted:
             raise ThemeNotFoundError(theme_id)
+        self._publish(session_id, 'deleted', theme_id, None)
+
+    def _publish(self, session_id: str, op: str, theme_id: str, theme: ThemeResponse | None) -> None:
+        """Announce a committed change: drop the session's cached lists and push it on the change feed."""
+        version = self.repo.sessions.last_version
+        if version is None:
+            return
+        # Bodies cached under the old version can no longer hit.
+        payload_cache.invalidate_session(session_id)
+        item = theme.model_dump(mode='json') if theme else None
+        change_feed.publish(session_id, [change_event(version, 'theme', op, theme_id, item)])
 
     def _to_response(self, row: Theme) -> ThemeResponse:
         return ThemeResponse(
@@ -86,3 +215,54 @@ class ThemeService:
             if payload.bottomPx - payload.topPx < self.MIN_THEME_HEIGHT_PX:
                 payload.bottomPx = payload.topPx + self.MIN_THEME_HEIGHT_PX
             payload.heightPx = payload.bottomPx - payload.topPx  # type: ignore[attr-defined]
+
+
+class AsyncThemeService:
+    """Awaitable counterpart of ``ThemeService`` for ``async def`` routes."""
+
+    def __init__(self, runner: SessionRunner) -> None:
+        self.runner = runner
+
+    async def _run(self, call: Callable[[ThemeService], T]) -> T:
+        return await self.runner(lambda session: call(ThemeService(session)))
+
+    async def session_version(self, session_id: str) -> int:
+        return await self._run(lambda service: service.session_version(session_id))
+
+    async def list_themes(self, session_id: str, **kwargs: Any) -> ThemeListResponse:
+        return await self._run(lambda service: service.list_themes(session_id, **kwargs))
+
+    async def list_themes_json(self, session_id: str, version: int, **kwargs: Any) -> tuple[bytes, str | None]:
+        """Serve from the payload cache when ``version`` still matches, else query and fill it."""
+        key = payload_key(session_id, version, 'themes', **kwargs)
+        cached = payload_cache.get(key)
+        if cached is None:
+            body, next_cursor = await self._run(lambda service: service.list_themes_json(session_id, **kwargs))
+            cached = CachedPayload(body, next_cursor)
+            payload_cache.put(key, cached)
+        return cached.body, cached.next_cursor
+
+    async def list_themes_in_viewport(self, session_id: str, *args: Any) -> ThemeListResponse:
+        return await self._run(lambda service: service.list_themes_in_viewport(session_id, *args))
+
+    async def get_layout(self, session_id: str, version: int, window_start: datetime, window_end: datetime) -> bytes:
+        """Serve from the payload cache when ``version`` still matches, else compute and fill it."""
+        key = payload_key(session_id, version, 'theme-layout', window_start, window_end)
+        cached = payload_cache.get(key)
+        if cached is None:
+            body = await self._run(lambda service: service.get_layout(session_id, window_start, window_end))
+            cached = CachedPayload(body, None)
+            payload_cache.put(key, cached)
+        return cached.body
+
+    async def find_topmost_theme(self, session_id: str, at: datetime, px: float) -> ThemeHitResponse:
+        return await self._run(lambda service: service.find_topmost_theme(session_id, at, px))
+
+    async def create_theme(self, session_id: str, payload: ThemeCreateRequest) -> ThemeResponse:
+        return await self._run(lambda service: service.create_theme(session_id, payload))
+
+    async def update_theme(self, session_id: str, theme_id: str, payload: ThemeUpdateRequest) -> ThemeResponse:
+        return await self._run(lambda service: service.update_theme(session_id, theme_id, payload))
+
+    async def delete_theme(self, session_id: str, theme_id: str) -> None:
+        await self._run(lambda service: service.delete_theme(session_id, theme_id))
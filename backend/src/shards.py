@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from bisect import bisect
+from collections.abc import Mapping, Sequence
+from hashlib import blake2b
+import os
+from pathlib import Path
+from typing import Generic, TypeVar
+
+from sqlalchemy import Engine, text
+
+DEFAULT_VIRTUAL_NODES = 64
+REBALANCE_COMMAND = 'python -m src.rebalance'
+
+EngineT = TypeVar('EngineT')
+
+
+def load_shard_count(env: Mapping[str, str] = os.environ) -> int:
+    value = env.get('TIMELINE_DB_SHARDS', '1')
+    try:
+        count = int(value)
+    except ValueError as error:
+        raise ValueError(f'TIMELINE_DB_SHARDS must be an integer, got {value!r}') from error
+    if count < 1:
+        raise ValueError(f'TIMELINE_DB_SHARDS must be >= 1, got {value!r}')
+    return count
+
+
+def shard_path(base: Path, index: int) -> Path:
+    """Shard 0 keeps the unsharded file name, so going from one shard to more moves only some sessions."""
+    return base if index == 0 else base.with_name(f'{base.stem}-shard{index}{base.suffix}')
+
+
+def _point(label: str) -> int:
+    return int.from_bytes(blake2b(label.encode(), digest_size=8).digest(), 'big')
+
+
+class ShardRing:
+    """Consistent hashing of session ids onto ``shard_count`` shards.
+
+    Each shard owns ``virtual_nodes`` points on a 64-bit ring and a session belongs
+    to the first point at or after its hash. Adding a shard only takes sessions
+    away from the others, roughly ``1 / shard_count`` of them, instead of
+    reshuffling everything the way ``hash % shard_count`` would.
+    """
+
+    def __init__(self, shard_count: int, virtual_nodes: int = DEFAULT_VIRTUAL_NODES) -> None:
+        if shard_count < 1:
+            raise ValueError('shard_count must be >= 1')
+        self.shard_count = shard_count
+        points = sorted(
+            (_point(f'shard-{shard}-{node}'), shard) for shard in range(shard_count) for node in range(virtual_nodes)
+        )
+        self._points = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_for(self, session_id: str) -> int:
+        if self.shard_count == 1:
+            return 0
+        position = bisect(self._points, _point(session_id))
+        return self._shards[position % len(self._shards)]
+
+
+class ShardRegistry(Generic[EngineT]):
+    """One engine per shard file, looked up by session id."""
+
+    def __init__(self, ring: ShardRing, engines: Sequence[EngineT]) -> None:
+        if len(engines) != ring.shard_count:
+            raise ValueError(f'expected {ring.shard_count} engines, got {len(engines)}')
+        self.ring = ring
+        self.engines = tuple(engines)
+
+    def for_session(self, session_id: str) -> EngineT:
+        return self.engines[self.ring.shard_for(session_id)]
+
+
+# Each shard file records the shard count it was laid out for in PRAGMA user_version
+# (0 = never stamped), so a changed TIMELINE_DB_SHARDS cannot silently route
+# sessions to shards that do not hold them.
+
+
+def read_layout(engine: Engine) -> int:
+    with engine.connect() as connection:
+        return int(connection.exec_driver_sql('PRAGMA user_version').scalar() or 0)
+
+
+def stamp_layout(engine: Engine, shard_count: int) -> None:
+    with engine.connect() as connection:
+        connection.exec_driver_sql(f'PRAGMA user_version = {int(shard_count)}')
+        connection.commit()
+
+
+def holds_sessions(engine: Engine) -> bool:
+    with engine.connect() as connection:
+        return (
+            connection.execute(
+                text(
+                    'SELECT 1 FROM timelinesession UNION ALL SELECT 1 FROM memory UNION ALL SELECT 1 FROM theme LIMIT 1'
+                )
+            ).first()
+            is not None
+        )
+
+
+def check_layout(engine: Engine, index: int, shard_count: int) -> None:
+    """Stamp a new shard file, or raise if it was laid out for another shard count.
+
+    An unstamped shard 0 that already holds sessions is an unsharded database, which
+    is only valid when running with a single shard.
+    """
+    recorded = read_layout(engine)
+    if recorded == shard_count:
+        return
+    if recorded == 0 and (index > 0 or shard_count == 1 or not holds_sessions(engine)):
+        stamp_layout(engine, shard_count)
+        return
+    raise RuntimeError(
+        f'{engine.url.database} is laid out for {recorded or 1} shard(s) but TIMELINE_DB_SHARDS={shard_count}; '
+        f'run `{REBALANCE_COMMAND} --shards {shard_count}` first'
+    )
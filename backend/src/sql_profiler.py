@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+import logging
+import os
+import re
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_MS = 100.0
+DEFAULT_REPEAT_LIMIT = 10
+_PARAMETERS_REPR_LIMIT = 500
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@dataclass(frozen=True)
+class SqlProfilerSettings:
+    slow_ms: float = DEFAULT_SLOW_MS
+    # A request running one statement shape more often than this is reported as N+1.
+    repeat_limit: int = DEFAULT_REPEAT_LIMIT
+
+
+def load_sql_profiler_settings(env: Mapping[str, str] = os.environ) -> SqlProfilerSettings | None:
+    """Settings from ``TIMELINE_SQL_PROFILE*``, or None when profiling is off (the default)."""
+    if env.get('TIMELINE_SQL_PROFILE', '0').strip().lower() not in {'1', 'true', 'on'}:
+        return None
+    try:
+        slow_ms = float(env.get('TIMELINE_SQL_SLOW_MS', DEFAULT_SLOW_MS))
+    except ValueError as error:
+        raise ValueError(f'TIMELINE_SQL_SLOW_MS must be a number, got {env["TIMELINE_SQL_SLOW_MS"]!r}') from error
+    try:
+        repeat_limit = int(env.get('TIMELINE_SQL_REPEAT_LIMIT', DEFAULT_REPEAT_LIMIT))
+    except ValueError as error:
+        raise ValueError(
+            f'TIMELINE_SQL_REPEAT_LIMIT must be an integer, got {env["TIMELINE_SQL_REPEAT_LIMIT"]!r}'
+        ) from error
+    return SqlProfilerSettings(slow_ms=slow_ms, repeat_limit=repeat_limit)
+
+
+def fingerprint(statement: str) -> str:
+    """Statement shape with literals and ``IN (?, ?, ...)`` lists collapsed, for grouping."""
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PLACEHOLDER_LIST.sub('(...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+@dataclass(frozen=True)
+class ExecutedStatement:
+    statement: str
+    parameters: Any
+    seconds: float
+    executemany: bool
+
+
+class SqlProfile:
+    """Statements executed while this profile was active, in order."""
+
+    def __init__(self) -> None:
+        self.statements: list[ExecutedStatement] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def seconds(self) -> float:
+        return sum(executed.seconds for executed in self.statements)
+
+    def matching(self, pattern: str | None = None) -> list[ExecutedStatement]:
+        if pattern is None:
+            return list(self.statements)
+        compiled = re.compile(pattern, re.IGNORECASE)
+        return [executed for executed in self.statements if compiled.search(executed.statement)]
+
+    def repeated(self, limit: int) -> list[tuple[str, int]]:
+        """Statement shapes executed more than ``limit`` times, most frequent first."""
+        counts = Counter(fingerprint(executed.statement) for executed in self.statements)
+        return [(shape, count) for shape, count in counts.most_common() if count > limit]
+
+    def assert_at_most(self, limit: int, pattern: str | None = None) -> None:
+        """Fail with the offending statements when more than ``limit`` (matching ``pattern``) ran."""
+        executed = self.matching(pattern)
+        if len(executed) <= limit:
+            return
+        listing = '\n'.join(f'  {index + 1}. {_single_line(item.statement)}' for index, item in enumerate(executed))
+        scope = f' matching {pattern!r}' if pattern else ''
+        raise AssertionError(f'expected at most {limit} statements{scope}, got {len(executed)}:\n{listing}')
+
+    def assert_no_repeats(self, limit: int = 1) -> None:
+        repeats = self.repeated(limit)
+        if repeats:
+            listing = '\n'.join(f'  {count}x {shape}' for shape, count in repeats)
+            raise AssertionError(f'statements repeated more than {limit} times:\n{listing}')
+
+
+_active_profile: ContextVar[SqlProfile | None] = ContextVar('timeline_sql_profile', default=None)
+_settings: SqlProfilerSettings | None = None
+
+
+def _single_line(statement: str) -> str:
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+def _short_repr(parameters: Any) -> str:
+    text = repr(parameters)
+    return text if len(text) <= _PARAMETERS_REPR_LIMIT else text[:_PARAMETERS_REPR_LIMIT] + '...'
+
+
+def explain_query_plan(dbapi_connection: Any, statement: str, parameters: Any) -> list[str]:
+    """``EXPLAIN QUERY PLAN`` rows as indented lines, one per plan node."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    depth: dict[int, int] = {0: 0}
+    lines = []
+    for node_id, parent_id, _unused, detail in rows:
+        depth[node_id] = depth.get(parent_id, 0) + 1
+        lines.append('  ' * depth[node_id] + str(detail))
+    return lines
+
+
+def _log_slow(conn: Any, statement: str, parameters: Any, executemany: bool, seconds: float) -> None:
+    plan: list[str] = []
+    if not executemany and statement.lstrip().upper().startswith(_EXPLAINABLE):
+        try:
+            plan = explain_query_plan(conn.connection.dbapi_connection, statement, parameters)
+        except Exception as error:  # The plan is a diagnostic; never fail the statement over it.
+            plan = [f'  (plan unavailable: {error})']
+    logger.warning(
+        'slow SQL %.1f ms: %s\n  parameters: %s%s',
+        seconds * 1000,
+        _single_line(statement),
+        _short_repr(parameters),
+        ''.join(f'\n{line}' for line in plan),
+    )
+
+
+def _before_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany) -> None:
+    if _settings is not None or _active_profile.get() is not None:
+        context._timeline_profile_started = perf_counter()
+
+
+def _after_cursor_execute(conn, _cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, '_timeline_profile_started', None)
+    if started is None:
+        return
+    seconds = perf_counter() - started
+    profile = _active_profile.get()
+    if profile is not None:
+        profile.statements.append(ExecutedStatement(statement, parameters, seconds, executemany))
+    if _settings is not None and seconds * 1000 >= _settings.slow_ms:
+        _log_slow(conn, statement, parameters, executemany, seconds)
+
+
+def install_sql_profiler(engine: Engine, settings: SqlProfilerSettings | None = None) -> None:
+    """Attach the profiling listeners to ``engine``; ``settings`` also turns on the slow-query log."""
+    global _settings
+    if settings is not None:
+        _settings = settings
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+@contextmanager
+def capture_sql(*engines: Engine) -> Iterator[SqlProfile]:
+    """Record every statement run in this context, for tests that pin query counts::
+
+        with capture_sql() as sql:
+            MemoryService(session).list_memories(session_id)
+        sql.assert_at_most(1, 'FROM memory')
+
+    Defaults to the application's engines. The profile follows the current context,
+    so statements run from another thread's context are not recorded.
+    """
+    if not engines:
+        from src.async_db import async_shards
+        from src.db import shards
+
+        engines = shards.engines
+        if async_shards is not None:
+            engines += tuple(async_engine.sync_engine for async_engine in async_shards.engines)
+    for engine in engines:
+        install_sql_profiler(engine)
+    profile = SqlProfile()
+    token = _active_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _active_profile.reset(token)
+
+
+class SqlProfilerMiddleware:
+    """Profile each HTTP request and report statement shapes it repeats past the limit.
+
+    Repeats usually mean an N+1 pattern, e.g. a ``session.get`` per item of a batch.
+    """
+
+    def __init__(self, app: ASGIApp, settings: SqlProfilerSettings) -> None:
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        profile = SqlProfile()
+        token = _active_profile.set(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _active_profile.reset(token)
+            logger.debug(
+                '%s %s ran %d SQL statements in %.1f ms',
+                scope['method'],
+                scope['path'],
+                profile.count,
+                profile.seconds * 1000,
+            )
+            for shape, count in profile.repeated(self.settings.repeat_limit):
+                logger.warning('possible N+1: %s %s ran %d x %s', scope['method'], scope['path'], count, shape)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, replace
+import os
+from typing import Any
+
+_JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+_SYNCHRONOUS_LEVELS = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+_TEMP_STORES = {'DEFAULT', 'FILE', 'MEMORY'}
+_SYNCHRONOUS_NAMES = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}
+_TEMP_STORE_NAMES = {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'}
+PRAGMA_NAMES = ('busy_timeout', 'journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store')
+
+
+@dataclass(frozen=True)
+class SQLiteProfile:
+    """Connection pragmas applied to every new SQLite connection.
+
+    ``None`` leaves the SQLite default in place.
+    """
+
+    name: str
+    journal_mode: str | None = None
+    synchronous: str | None = None
+    mmap_size: int | None = None
+    cache_size: int | None = None
+    temp_store: str | None = None
+    busy_timeout_ms: int | None = None
+
+    def pragmas(self) -> list[tuple[str, Any]]:
+        # busy_timeout goes first so switching journal mode can wait out other writers.
+        values = (
+            self.busy_timeout_ms,
+            self.journal_mode,
+            self.synchronous,
+            self.mmap_size,
+            self.cache_size,
+            self.temp_store,
+        )
+        return [(name, value) for name, value in zip(PRAGMA_NAMES, values) if value is not None]
+
+
+SQLITE_PROFILES: dict[str, SQLiteProfile] = {
+    # WAL lets readers proceed while a writer commits; NORMAL only fsyncs at checkpoints.
+    'tuned': SQLiteProfile(
+        name='tuned',
+        journal_mode='WAL',
+        synchronous='NORMAL',
+        mmap_size=256 * 1024 * 1024,
+        cache_size=-64 * 1024,
+        temp_store='MEMORY',
+        busy_timeout_ms=5000,
+    ),
+    'durable': SQLiteProfile(
+        name='durable',
+        journal_mode='WAL',
+        synchronous='FULL',
+        mmap_size=256 * 1024 * 1024,
+        cache_size=-64 * 1024,
+        temp_store='MEMORY',
+        busy_timeout_ms=5000,
+    ),
+    # Plain SQLite defaults (rollback journal), matching the original engine setup.
+    'legacy': SQLiteProfile(name='legacy'),
+}
+
+
+def _choice(env: Mapping[str, str], key: str, allowed: set[str]) -> str | None:
+    value = env.get(key)
+    if value is None:
+        return None
+    normalized = value.strip().upper()
+    if normalized not in allowed:
+        raise ValueError(f'{key} must be one of {sorted(allowed)}, got {value!r}')
+    return normalized
+
+
+def _integer(env: Mapping[str, str], key: str) -> int | None:
+    value = env.get(key)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError as error:
+        raise ValueError(f'{key} must be an integer, got {value!r}') from error
+
+
+def load_sqlite_profile(env: Mapping[str, str] = os.environ) -> SQLiteProfile:
+    """Resolve ``TIMELINE_DB_PROFILE`` plus per-pragma ``TIMELINE_DB_*`` overrides."""
+    name = env.get('TIMELINE_DB_PROFILE', 'tuned').strip().lower()
+    if name not in SQLITE_PROFILES:
+        raise ValueError(f'TIMELINE_DB_PROFILE must be one of {sorted(SQLITE_PROFILES)}, got {name!r}')
+    profile = SQLITE_PROFILES[name]
+    overrides = {
+        'journal_mode': _choice(env, 'TIMELINE_DB_JOURNAL_MODE', _JOURNAL_MODES),
+        'synchronous': _choice(env, 'TIMELINE_DB_SYNCHRONOUS', _SYNCHRONOUS_LEVELS),
+        'mmap_size': _integer(env, 'TIMELINE_DB_MMAP_SIZE'),
+        'cache_size': _integer(env, 'TIMELINE_DB_CACHE_SIZE'),
+        'temp_store': _choice(env, 'TIMELINE_DB_TEMP_STORE', _TEMP_STORES),
+        'busy_timeout_ms': _integer(env, 'TIMELINE_DB_BUSY_TIMEOUT_MS'),
+    }
+    return replace(profile, **{key: value for key, value in overrides.items() if value is not None})
+
+
+def apply_sqlite_profile(dbapi_connection: Any, profile: SQLiteProfile) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in profile.pragmas():
+            # load_sqlite_profile validates every value, so interpolation cannot inject SQL.
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+
+def read_sqlite_pragmas(dbapi_connection: Any) -> dict[str, str | int]:
+    """Report the pragma values actually in effect on ``dbapi_connection``."""
+    cursor = dbapi_connection.cursor()
+    try:
+        active: dict[str, str | int] = {}
+        for name in PRAGMA_NAMES:
+            row = cursor.execute(f'PRAGMA {name}').fetchone()
+            active[name] = row[0] if row else ''
+    finally:
+        cursor.close()
+    active['journal_mode'] = str(active['journal_mode']).upper()
+    active['synchronous'] = _SYNCHRONOUS_NAMES.get(int(active['synchronous']), str(active['synchronous']))
+    active['temp_store'] = _TEMP_STORE_NAMES.get(int(active['temp_store']), str(active['temp_store']))
+    return active
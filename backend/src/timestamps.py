@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+
+def naive_utc(value: datetime) -> datetime:
+    """``value`` in the form datetimes are stored: naive UTC.
+
+    A naive value is taken to be UTC already; one with an offset is converted, so
+    it is compared by the instant it names rather than by its wall clock.
+    """
+    return value if value.tzinfo is None else value.astimezone(UTC).replace(tzinfo=None)
+
+
+def utc_window(start: datetime | None, end: datetime | None) -> tuple[datetime | None, datetime | None]:
+    """Convert both bounds of a ``from``/``to`` window with ``naive_utc``; either may be open."""
+    return (None if start is None else naive_utc(start), None if end is None else naive_utc(end))
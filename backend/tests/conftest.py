@@ -16,12 +16,18 @@ os.environ.setdefault('TIMELINE_DB_PATH', str(ROOT / 'test-timeline.db'))
 
 from src.db import engine, init_db
 from src.main import app
+from src.metrics import metrics
+from src.services.change_feed import change_feed
+from src.services.payload_cache import payload_cache
 
 
 @pytest.fixture(autouse=True)
 def reset_db() -> None:
     SQLModel.metadata.drop_all(engine)
     init_db()
+    payload_cache.clear()
+    change_feed.clear()
+    metrics.clear()
 
 
 @pytest.fixture
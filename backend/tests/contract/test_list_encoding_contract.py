@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from fastapi.responses import JSONResponse
+from sqlmodel import Session
+
+from src.db import engine
+from src.services.memory_service import MemoryService
+from src.services.theme_service import ThemeService
+
+SESSION_ID = 'encoding-session'
+SESSION_URL = f'/api/v1/sessions/{SESSION_ID}'
+
+AWKWARD_TEXT = 'Quote " back\\slash\nnew line\ttab \x01 ünïcödé 日本 😀 </script>'
+
+
+def _model_bytes(page) -> bytes:
+    # What FastAPI sends for a response_model: JSON-mode dump rendered by JSONResponse.
+    return JSONResponse(page.model_dump(mode='json')).body
+
+
+def _seed(client, sample_theme_payload) -> None:
+    memories = [
+        {'anchor': {'type': 'point', 'timestamp': '2026-03-01T10:00:00.123456Z'}, 'title': AWKWARD_TEXT, 'tags': ['日本', 'a"b']},
+        {'anchor': {'type': 'range', 'start': '2026-03-02T00:00:00Z', 'end': '2026-03-05T00:00:00+02:00'}, 'title': 'Range', 'description': ''},
+        {'anchor': {'type': 'point', 'timestamp': '2026-03-03T00:00:00Z'}, 'title': 'Ratio', 'description': AWKWARD_TEXT, 'verticalRatio': 1},
+        {'anchor': {'type': 'point', 'timestamp': '2026-03-04T00:00:00Z'}, 'title': 'Tiny', 'verticalRatio': 0.00001},
+    ]
+    for memory in memories:
+        assert client.post(f'{SESSION_URL}/memories', json=memory).status_code == 201
+    themes = [
+        {**sample_theme_payload, 'title': AWKWARD_TEXT, 'abbreviatedTitle': 'Ab', 'tags': ['ü']},
+        {**sample_theme_payload, 'description': None, 'opacity': 0.05, 'priority': 0, 'topPx': 10.5, 'bottomPx': 61.3},
+    ]
+    for theme in themes:
+        assert client.post(f'{SESSION_URL}/themes', json=theme).status_code == 201
+
+
+def test_memory_lists_are_byte_identical_to_the_response_model(client, sample_theme_payload) -> None:
+    _seed(client, sample_theme_payload)
+    window = (datetime(2026, 3, 2, 12, tzinfo=UTC), datetime(2026, 3, 3, 12, tzinfo=UTC))
+    cases = [
+        ({}, {}),
+        ({'limit': 2}, {'limit': 2}),
+        ({'density': 80}, {'density': 80}),
+        ({'from': window[0].isoformat(), 'to': window[1].isoformat()}, {'window_start': window[0], 'window_end': window[1]}),
+        ({'tag': '日本'}, {'tags': ['日本']}),
+    ]
+    with Session(engine) as session:
+        service = MemoryService(session)
+        for params, arguments in cases:
+            response = client.get(f'{SESSION_URL}/memories', params=params)
+            assert response.status_code == 200
+            assert response.headers['content-type'] == 'application/json'
+
+            expected = service.list_memories(SESSION_ID, **arguments)
+            assert response.content == _model_bytes(expected)
+            assert response.headers.get('x-next-cursor') == service.next_cursor(expected, arguments.get('limit'))
+
+
+def test_theme_lists_are_byte_identical_to_the_response_model(client, sample_theme_payload) -> None:
+    _seed(client, sample_theme_payload)
+    with Session(engine) as session:
+        service = ThemeService(session)
+        for params in ({}, {'limit': 1}, {'tag': 'ü'}):
+            response = client.get(f'{SESSION_URL}/themes', params=params)
+            assert response.status_code == 200
+            tags = [params['tag']] if 'tag' in params else []
+            expected = service.list_themes(SESSION_ID, limit=params.get('limit'), tags=tags)
+            assert response.content == _model_bytes(expected)
+            assert response.headers.get('x-next-cursor') == service.next_cursor(expected, params.get('limit'))
+
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+MEMORIES_URL = '/api/v1/sessions/etag-session/memories'
+THEMES_URL = '/api/v1/sessions/etag-session/themes'
+
+
+def _create_memory(client, title: str) -> str:
+    created = client.post(MEMORIES_URL, json={'anchor': {'type': 'point', 'timestamp': '2026-02-22T00:00:00Z'}, 'title': title})
+    assert created.status_code == 201
+    return created.json()['id']
+
+
+def test_unchanged_list_revalidates_with_304(client) -> None:
+    _create_memory(client, 'First')
+    first = client.get(MEMORIES_URL)
+    assert first.status_code == 200
+    etag = first.headers['etag']
+
+    cached = client.get(MEMORIES_URL, headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.content == b''
+    assert cached.headers['etag'] == etag
+    assert client.get(MEMORIES_URL, headers={'If-None-Match': f'"other", W/{etag}'}).status_code == 304
+
+
+def test_every_write_invalidates_the_etag(client, sample_theme_payload) -> None:
+    memory_id = _create_memory(client, 'First')
+    seen = {client.get(MEMORIES_URL).headers['etag']}
+
+    def assert_changed() -> None:
+        response = client.get(MEMORIES_URL, headers={'If-None-Match': ', '.join(seen)})
+        assert response.status_code == 200
+        assert response.headers['etag'] not in seen
+        seen.add(response.headers['etag'])
+
+    assert client.patch(f'{MEMORIES_URL}/{memory_id}', json={'title': 'Renamed'}).status_code == 200
+    assert_changed()
+    batch = client.post(f'{MEMORIES_URL}:batch', json={'operations': [{'op': 'delete', 'id': memory_id}]})
+    assert batch.status_code == 200
+    assert_changed()
+    assert client.post(THEMES_URL, json=sample_theme_payload).status_code == 201
+    assert_changed()
+
+    themes = client.get(THEMES_URL)
+    assert client.get(THEMES_URL, headers={'If-None-Match': themes.headers['etag']}).status_code == 304
+
+
+def test_json_and_ndjson_have_distinct_etags(client) -> None:
+    _create_memory(client, 'First')
+    json_etag = client.get(MEMORIES_URL).headers['etag']
+    streamed = client.get(MEMORIES_URL, headers={'Accept': 'application/x-ndjson', 'If-None-Match': json_etag})
+    assert streamed.status_code == 200
+    assert streamed.headers['etag'] != json_etag
+    assert 'accept' in streamed.headers['vary'].lower()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+
+
+def _create_memory(client, index: int) -> str:
+    created = client.post(
+        '/api/v1/sessions/page-session/memories',
+        json={'anchor': {'type': 'point', 'timestamp': f'2026-02-{index + 1:02d}T00:00:00Z'}, 'title': f'M{index}'},
+    )
+    assert created.status_code == 201
+    return created.json()['id']
+
+
+def _create_theme(client, sample_theme_payload, priority: int) -> str:
+    created = client.post(
+        '/api/v1/sessions/page-session/themes',
+        json={**sample_theme_payload, 'priority': priority},
+    )
+    assert created.status_code == 201
+    return created.json()['id']
+
+
+def test_memory_pages_follow_cursor_until_exhausted(client) -> None:
+    created = [_create_memory(client, index) for index in range(5)]
+
+    seen: list[str] = []
+    params: dict[str, object] = {'limit': 2}
+    while True:
+        page = client.get('/api/v1/sessions/page-session/memories', params=params)
+        assert page.status_code == 200
+        seen.extend(memory['id'] for memory in page.json()['memories'])
+        cursor = page.headers.get('x-next-cursor')
+        if cursor is None:
+            break
+        params = {'limit': 2, 'after': cursor}
+
+    # Creation order, not id order: the ids are random UUIDs.
+    assert seen == created
+    unpaged = client.get('/api/v1/sessions/page-session/memories').json()['memories']
+    assert [memory['id'] for memory in unpaged] == created
+
+
+def test_theme_pages_keep_render_order(client, sample_theme_payload) -> None:
+    expected = [
+        _create_theme(client, sample_theme_payload, 10),
+        _create_theme(client, sample_theme_payload, 10),
+        _create_theme(client, sample_theme_payload, 500),
+    ]
+
+    first = client.get('/api/v1/sessions/page-session/themes', params={'limit': 2})
+    assert first.status_code == 200
+    second = client.get(
+        '/api/v1/sessions/page-session/themes',
+        params={'limit': 2, 'after': first.headers['x-next-cursor']},
+    )
+    assert second.status_code == 200
+    assert 'x-next-cursor' not in second.headers
+
+    ids = [theme['id'] for theme in first.json()['themes'] + second.json()['themes']]
+    assert ids == expected
+
+
+def test_invalid_cursor_is_rejected(client) -> None:
+    response = client.get('/api/v1/sessions/page-session/memories', params={'after': 'not-a-cursor'})
+    assert response.status_code == 422
+    response = client.get('/api/v1/sessions/page-session/themes', params={'after': 'not-a-cursor'})
+    assert response.status_code == 422
+
+
+def test_ndjson_streams_one_item_per_line(client, sample_theme_payload) -> None:
+    memory_ids = [_create_memory(client, index) for index in range(3)]
+    theme_id = _create_theme(client, sample_theme_payload, 100)
+
+    memories = client.get(
+        '/api/v1/sessions/page-session/memories',
+        headers={'Accept': 'application/x-ndjson'},
+    )
+    assert memories.status_code == 200
+    assert memories.headers['content-type'].startswith('application/x-ndjson')
+    lines = [json.loads(line) for line in memories.text.splitlines()]
+    assert [line['id'] for line in lines] == memory_ids
+
+    themes = client.get(
+        '/api/v1/sessions/page-session/themes',
+        headers={'Accept': 'application/x-ndjson'},
+    )
+    assert [json.loads(line)['id'] for line in themes.text.splitlines()] == [theme_id]
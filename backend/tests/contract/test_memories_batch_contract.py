@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+
+def _create(client, title: str) -> str:
+    created = client.post(
+        '/api/v1/sessions/batch-session/memories',
+        json={'anchor': {'type': 'point', 'timestamp': '2026-02-22T00:00:00Z'}, 'title': title},
+    )
+    assert created.status_code == 201
+    return created.json()['id']
+
+
+def test_batch_applies_creates_patches_and_deletes(client) -> None:
+    keep = _create(client, 'Keep')
+    drop = _create(client, 'Drop')
+
+    response = client.post(
+        '/api/v1/sessions/batch-session/memories:batch',
+        json={
+            'operations': [
+                {
+                    'op': 'create',
+                    'memory': {'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': 'New A'},
+                },
+                {
+                    'op': 'create',
+                    'memory': {
+                        'anchor': {'type': 'range', 'start': '2026-03-01T00:00:00Z', 'end': '2026-03-05T00:00:00Z'},
+                        'title': 'New B',
+                        'tags': ['trip'],
+                    },
+                },
+                {'op': 'patch', 'id': keep, 'memory': {'title': 'Kept and renamed'}},
+                {'op': 'delete', 'id': drop},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert [result['status'] for result in results] == [201, 201, 200, 204]
+    assert [result['index'] for result in results] == [0, 1, 2, 3]
+    assert results[1]['memory']['anchor']['type'] == 'range'
+    assert results[2]['memory']['title'] == 'Kept and renamed'
+    assert results[3]['id'] == drop
+
+    listed = client.get('/api/v1/sessions/batch-session/memories').json()['memories']
+    titles = sorted(memory['title'] for memory in listed)
+    assert titles == ['Kept and renamed', 'New A', 'New B']
+    created_ids = {results[0]['id'], results[1]['id']}
+    assert created_ids <= {memory['id'] for memory in listed}
+
+
+def test_batch_reports_missing_items_and_applies_the_rest(client) -> None:
+    target = _create(client, 'Target')
+
+    response = client.post(
+        '/api/v1/sessions/batch-session/memories:batch',
+        json={
+            'operations': [
+                {'op': 'delete', 'id': target},
+                {'op': 'patch', 'id': target, 'memory': {'title': 'Too late'}},
+                {'op': 'delete', 'id': 'missing'},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    assert [result['status'] for result in response.json()['results']] == [204, 404, 404]
+    assert client.get('/api/v1/sessions/batch-session/memories').json() == {'memories': []}
+
+
+def test_batch_validates_items_with_existing_request_models(client) -> None:
+    response = client.post(
+        '/api/v1/sessions/batch-session/memories:batch',
+        json={
+            'operations': [
+                {'op': 'create', 'memory': {'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': ' '}},
+            ]
+        },
+    )
+    assert response.status_code == 422
+    assert client.get('/api/v1/sessions/batch-session/memories').json() == {'memories': []}
@@ -16,3 +16,34 @@ def test_delete_contract_is_final_without_undo_payload(client) -> None:
     deleted = client.delete(f'/api/v1/sessions/test-session/memories/{memory_id}')
     assert deleted.status_code == 204
     assert deleted.text == ''
+
+
+def test_undo_restores_the_deleted_memory_once(client) -> None:
+    create = client.post(
+        '/api/v1/sessions/test-session/memories',
+        json={
+            'anchor': {'type': 'range', 'start': '2026-02-22T00:00:00Z', 'end': '2026-02-23T00:00:00Z'},
+            'title': 'Bring me back',
+            'tags': ['note'],
+        },
+    )
+    original = create.json()
+
+    deleted = client.delete(f"/api/v1/sessions/test-session/memories/{original['id']}")
+    assert deleted.status_code == 204
+    deletion_id = deleted.headers['x-deletion-id']
+    assert deleted.headers['x-undo-expires-at']
+
+    undone = client.post(f'/api/v1/sessions/test-session/memories/deletions/{deletion_id}/undo')
+    assert undone.status_code == 200
+    restored = undone.json()
+    assert {key: restored[key] for key in ('id', 'anchor', 'title', 'tags', 'createdAt')} == {
+        key: original[key] for key in ('id', 'anchor', 'title', 'tags', 'createdAt')
+    }
+    listed = client.get('/api/v1/sessions/test-session/memories')
+    assert [memory['id'] for memory in listed.json()['memories']] == [original['id']]
+
+    again = client.post(f'/api/v1/sessions/test-session/memories/deletions/{deletion_id}/undo')
+    assert again.status_code == 404
+    other_session = client.post(f'/api/v1/sessions/other-session/memories/deletions/{deletion_id}/undo')
+    assert other_session.status_code == 404
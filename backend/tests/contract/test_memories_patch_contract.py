@@ -37,3 +37,19 @@ def test_patch_memory_updates_metadata_and_anchor(client) -> None:
     assert patched['tags'] == ['media']
     assert patched['anchor']['type'] == 'range'
     assert patched['verticalRatio'] == 0.65
+
+
+def test_patch_response_matches_the_listed_memory(client) -> None:
+    created = client.post(
+        '/api/v1/sessions/patch-session/memories',
+        json={'anchor': {'type': 'point', 'timestamp': '2026-02-22T00:00:00Z'}, 'title': 'Initial memory'},
+    ).json()
+
+    patched = client.patch(
+        f"/api/v1/sessions/patch-session/memories/{created['id']}",
+        json={'anchor': {'type': 'point', 'timestamp': '2026-02-23T05:00:00+02:00'}, 'title': 'Updated memory'},
+    )
+    assert patched.status_code == 200
+
+    listed = client.get('/api/v1/sessions/patch-session/memories').json()['memories']
+    assert patched.json() == next(memory for memory in listed if memory['id'] == created['id'])
@@ -40,3 +40,20 @@ def test_delete_theme_contract(client, sample_theme_payload) -> None:
     listed = client.get('/api/v1/sessions/test-session/themes')
     assert listed.status_code == 200
     assert listed.json()['themes'] == []
+
+
+def test_patch_theme_response_matches_the_listed_theme(client, sample_theme_payload) -> None:
+    theme_id = client.post('/api/v1/sessions/test-session/themes', json=sample_theme_payload).json()['id']
+
+    patched = client.patch(
+        f'/api/v1/sessions/test-session/themes/{theme_id}',
+        json={
+            'startTime': '2026-03-01T05:00:00+02:00',
+            'endTime': '2026-03-02T05:00:00+02:00',
+            'title': 'Renamed theme',
+        },
+    )
+    assert patched.status_code == 200
+
+    listed = client.get('/api/v1/sessions/test-session/themes').json()['themes']
+    assert patched.json() == next(theme for theme in listed if theme['id'] == theme_id)
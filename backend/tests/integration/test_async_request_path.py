@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import sqlite3
+
+import anyio
+import anyio.to_thread
+import httpx
+import pytest
+
+from src import async_db
+from src.db import DB_PATH
+from src.main import app
+
+MEMORIES_URL = '/api/v1/sessions/async-session/memories'
+MEMORY = {'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': 'Async'}
+
+
+def test_blocked_write_does_not_hold_a_worker_thread() -> None:
+    pytest.importorskip('aiosqlite')
+    assert async_db.async_shards is not None
+
+    async def scenario() -> None:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        total_tokens = limiter.total_tokens
+        limiter.total_tokens = 1
+        blocker = sqlite3.connect(DB_PATH, isolation_level=None)
+        blocker.execute('BEGIN IMMEDIATE')
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                written: list[int] = []
+
+                async def write() -> None:
+                    written.append((await client.post(MEMORIES_URL, json=MEMORY)).status_code)
+
+                async with anyio.create_task_group() as group:
+                    group.start_soon(write)
+                    await anyio.sleep(0.2)
+                    # The write is parked on SQLite's lock; with a single worker thread
+                    # a blocking route would leave this read queued behind it.
+                    with anyio.fail_after(2):
+                        listed = await client.get(MEMORIES_URL)
+                    assert listed.status_code == 200
+                    assert written == []
+                    blocker.execute('ROLLBACK')
+                assert written == [201]
+        finally:
+            blocker.close()
+            limiter.total_tokens = total_tokens
+
+    anyio.run(scenario)
+
+
+def test_threadpool_fallback_serves_the_same_routes(client, monkeypatch) -> None:
+    monkeypatch.setattr(async_db, 'async_shards', None)
+
+    created = client.post(MEMORIES_URL, json=MEMORY)
+    assert created.status_code == 201
+    listed = client.get(MEMORIES_URL)
+    assert [memory['id'] for memory in listed.json()['memories']] == [created.json()['id']]
+    assert client.delete(f"{MEMORIES_URL}/{created.json()['id']}").status_code == 204
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from benchmarks.run import SESSION_ID, run_benchmarks
+from benchmarks.seed import seed_session
+from benchmarks.stats import compare, summarize
+from src.db import engine
+
+
+def test_seeded_rows_read_back_like_api_writes(client) -> None:
+    version = seed_session(engine, SESSION_ID, memories=40, themes=6, seed=7)
+
+    memories = client.get(f'/api/v1/sessions/{SESSION_ID}/memories').json()['memories']
+    assert len(memories) == 40
+    assert {memory['anchor']['type'] for memory in memories} == {'point', 'range'}
+    assert len(client.get(f'/api/v1/sessions/{SESSION_ID}/themes').json()['themes']) == 6
+    assert client.get(f'/api/v1/sessions/{SESSION_ID}/changes').json()['version'] == version
+
+    # Derived indexes were rebuilt, so tag facets count the seeded rows.
+    tags = client.get(f'/api/v1/sessions/{SESSION_ID}/tags').json()['tags']
+    assert sum(tag['memories'] for tag in tags) > 0
+
+
+def test_every_scenario_runs_on_both_layers() -> None:
+    report = run_benchmarks(memories=30, themes=6, iterations=2, warmup=0)
+
+    results = report['results']
+    assert {name.split('.', 1)[0] for name in results} == {'service', 'asgi'}
+    for name in ('memories.list.page', 'memories.create', 'memories.patch', 'memories.delete', 'memories.batch'):
+        assert results[f'service.{name}']['samples'] == 2
+        assert results[f'asgi.{name}']['rows'] > 0
+    assert results['asgi.memories.batch']['rows'] == 200
+    assert report['meta']['memories'] == 30
+
+
+def test_baseline_comparison_flags_slowdowns_past_the_tolerance() -> None:
+    baseline = {'list': summarize([0.010] * 10, 100).to_json(), 'create': summarize([0.002] * 10, 10).to_json()}
+    current = {
+        'list': summarize([0.0115] * 10, 100).to_json(),
+        'create': summarize([0.003] * 10, 10).to_json(),
+        'new': summarize([1.0], 1).to_json(),
+    }
+
+    regressions = compare(current, baseline, tolerance=0.2)
+    assert [(regression.scenario, regression.metric) for regression in regressions] == [
+        ('create', 'p50_ms'),
+        ('create', 'p95_ms'),
+    ]
+    assert regressions[0].ratio == 1.5
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import json
+
+import anyio
+import httpx
+from sqlmodel import Session
+
+from src.db import engine
+from src.main import app
+from src.repositories.session_repository import SessionRepository
+from src.services.change_feed import ChangeFeed, VersionWatcher, change_event, change_feed, stream_changes
+
+EVENTS_PATH = '/api/v1/sessions/feed-session/events'
+MEMORIES_URL = '/api/v1/sessions/feed-session/memories'
+THEMES_URL = '/api/v1/sessions/feed-session/themes'
+MEMORY = {'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': 'Live'}
+
+
+def _parse(body: bytes) -> list[dict[str, str]]:
+    frames = []
+    for block in body.decode().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if line and not line.startswith(':'))
+        if fields:
+            frames.append(fields)
+    return frames
+
+
+async def _read_events(
+    count: int,
+    last_event_id: str | None = None,
+    writes: Callable[[httpx.AsyncClient], Awaitable[None]] | None = None,
+) -> tuple[dict[str, str], list[dict[str, str]]]:
+    """Drive the SSE route over raw ASGI until ``count`` frames arrive, then disconnect."""
+    headers = [(b'host', b'test')]
+    if last_event_id is not None:
+        headers.append((b'last-event-id', last_event_id.encode()))
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': EVENTS_PATH,
+        'raw_path': EVENTS_PATH.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': headers,
+        'client': ('test', 1),
+        'server': ('test', 80),
+    }
+    start: dict[str, str] = {}
+    body = bytearray()
+    first_frame = anyio.Event()
+    done = anyio.Event()
+
+    async def receive() -> dict[str, str]:
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message) -> None:
+        if message['type'] == 'http.response.start':
+            start.update({key.decode(): value.decode() for key, value in message['headers']})
+            return
+        body.extend(message.get('body', b''))
+        if body:
+            first_frame.set()
+        if len(_parse(bytes(body))) >= count:
+            done.set()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as group:
+                group.start_soon(app, scope, receive, send)
+                if last_event_id is None:
+                    await first_frame.wait()
+                else:
+                    # A resumed stream may stay silent; wait until it has subscribed and read its version.
+                    while change_feed.subscriber_count('feed-session') == 0 and not done.is_set():
+                        await anyio.sleep(0.01)
+                    await anyio.sleep(0.1)
+                if writes is not None:
+                    await writes(client)
+    return start, _parse(bytes(body))
+
+
+def test_writes_are_pushed_to_open_streams(sample_theme_payload) -> None:
+    async def writes(client: httpx.AsyncClient) -> None:
+        memory_id = (await client.post(MEMORIES_URL, json=MEMORY)).json()['id']
+        assert (await client.patch(f'{MEMORIES_URL}/{memory_id}', json={'title': 'Renamed'})).status_code == 200
+        assert (await client.post(THEMES_URL, json=sample_theme_payload)).status_code == 201
+        assert (await client.delete(f'{MEMORIES_URL}/{memory_id}')).status_code == 204
+
+    headers, frames = anyio.run(_read_events, 5, None, writes)
+
+    assert headers['content-type'].startswith('text/event-stream')
+    assert headers['cache-control'] == 'no-cache'
+    assert frames[0] == {'id': '0', 'event': 'ready', 'data': '{"version": 0}'}
+    assert [frame['event'] for frame in frames[1:]] == ['memory.created', 'memory.updated', 'theme.created', 'memory.deleted']
+    assert [frame['id'] for frame in frames[1:]] == ['1', '2', '3', '4']
+    updated = json.loads(frames[2]['data'])
+    assert updated['item']['title'] == 'Renamed'
+    deleted = json.loads(frames[4]['data'])
+    assert deleted == {'type': 'memory', 'op': 'deleted', 'id': updated['id'], 'version': 4}
+
+
+def test_batch_is_one_version_and_resume_replays_only_missed_events(client) -> None:
+    memory_id = client.post(MEMORIES_URL, json=MEMORY).json()['id']
+    operations = [
+        {'op': 'patch', 'id': memory_id, 'memory': {'title': 'Patched'}},
+        {'op': 'create', 'memory': MEMORY},
+        {'op': 'delete', 'id': 'missing'},
+    ]
+    assert client.post(f'{MEMORIES_URL}:batch', json={'operations': operations}).status_code == 200
+
+    _, frames = anyio.run(_read_events, 2, '1')
+    assert [(frame['id'], frame['event']) for frame in frames] == [('2', 'memory.updated'), ('2', 'memory.created')]
+
+    async def write(client: httpx.AsyncClient) -> None:
+        await client.patch(f'{MEMORIES_URL}/{memory_id}', json={'title': 'Later'})
+
+    # Nothing missed: the stream stays quiet until the next commit.
+    _, frames = anyio.run(_read_events, 1, '2', write)
+    assert [(frame['id'], frame['event']) for frame in frames] == [('3', 'memory.updated')]
+
+
+def test_resume_beyond_retained_history_asks_for_a_refetch(client) -> None:
+    client.post(MEMORIES_URL, json=MEMORY)
+    client.post(MEMORIES_URL, json=MEMORY)
+    change_feed.clear()
+    _, frames = anyio.run(_read_events, 1, '1')
+    assert frames == [{'id': '2', 'event': 'reset', 'data': '{"version": 2}'}]
+
+    assert client.get(EVENTS_PATH, headers={'Last-Event-ID': 'latest'}).status_code == 422
+
+
+def test_slow_consumer_is_reset_instead_of_buffering_without_bound() -> None:
+    async def scenario() -> list[bytes]:
+        feed = ChangeFeed(buffer_size=2)
+        subscriber = feed.subscribe('slow')
+        frames = stream_changes(feed, subscriber, 0, None)
+        assert (await anext(frames)).startswith(b'id: 0\nevent: ready')
+        for version in (1, 2, 3):
+            feed.publish('slow', [change_event(version, 'memory', 'deleted', f'm{version}')])
+        await anyio.sleep(0)
+        assert len(subscriber.pending) == 0
+        reset = await anext(frames)
+        feed.publish('slow', [change_event(4, 'memory', 'deleted', 'm4')])
+        await anyio.sleep(0)
+        after_reset = await anext(frames)
+        await frames.aclose()
+        assert feed.subscriber_count('slow') == 0
+        return [reset, after_reset]
+
+    reset, after_reset = anyio.run(scenario)
+    assert reset == b'id: 3\nevent: reset\ndata: {"version": 3}\n\n'
+    assert after_reset.startswith(b'id: 4\nevent: memory.deleted\n')
+
+
+def test_history_is_kept_for_the_most_recently_written_sessions_only() -> None:
+    feed = ChangeFeed(history_sessions=2)
+    for session_id, version in (('first', 1), ('second', 1), ('first', 2), ('third', 1)):
+        feed.publish(session_id, [change_event(version, 'memory', 'deleted', f'm{version}')])
+
+    assert feed.replay('second', 0, 1) is None
+    assert [event.version for event in feed.replay('first', 0, 2)] == [1, 2]
+    assert [event.version for event in feed.replay('third', 0, 1)] == [1]
+
+
+def test_commits_that_publish_out_of_order_are_streamed_in_version_order() -> None:
+    async def scenario() -> list[bytes]:
+        feed = ChangeFeed()
+        subscriber = feed.subscribe('racing')
+        frames = stream_changes(feed, subscriber, 1, None)
+        await anext(frames)
+        # Version 3 finished publishing before version 2 did.
+        feed.publish('racing', [change_event(3, 'memory', 'deleted', 'm3')])
+        await anyio.sleep(0)
+        assert len(subscriber.pending) == 0
+        feed.publish('racing', [change_event(2, 'memory', 'deleted', 'm2')])
+        received = await anext(frames)
+        await frames.aclose()
+        assert [event.version for event in feed.replay('racing', 1, 3)] == [2, 3]
+        return _parse(received)
+
+    assert [frame['id'] for frame in anyio.run(scenario)] == ['2', '3']
+
+
+def test_commits_from_other_workers_reach_the_stream_as_a_reset() -> None:
+    async def scenario() -> list[bytes]:
+        feed = ChangeFeed()
+        # Version 2 was committed by another worker, so this feed never saw it.
+        feed.publish('shared', [change_event(1, 'memory', 'deleted', 'm1')])
+        feed.publish('shared', [change_event(3, 'memory', 'deleted', 'm3')])
+        assert feed.replay('shared', 0, 3) is None
+
+        subscriber = feed.subscribe('shared')
+        frames = stream_changes(feed, subscriber, 3, None)
+        received = [await anext(frames)]
+        # A local commit is published right after it lands, so the poll never sees it lag.
+        assert feed.observe('shared', 4) is True
+        feed.publish('shared', [change_event(4, 'memory', 'deleted', 'm4')])
+        received.append(await anext(frames))
+        assert feed.observe('shared', 4) is False
+        # Version 6 waits for version 5, which no one here publishes.
+        feed.publish('shared', [change_event(6, 'memory', 'deleted', 'm6')])
+        assert feed.observe('shared', 6) is True
+        assert feed.observe('shared', 6) is False
+        received.append(await anext(frames))
+        feed.publish('shared', [change_event(7, 'memory', 'deleted', 'm7')])
+        received.append(await anext(frames))
+        await frames.aclose()
+        return received
+
+    ready, local, foreign, after = anyio.run(scenario)
+    assert ready.startswith(b'id: 3\nevent: ready')
+    assert local.startswith(b'id: 4\nevent: memory.deleted\n')
+    assert foreign == b'id: 6\nevent: reset\ndata: {"version": 6}\n\n'
+    assert after.startswith(b'id: 7\nevent: memory.deleted\n')
+
+
+def test_one_watcher_task_reads_versions_for_every_stream_of_a_file() -> None:
+    async def scenario() -> list[bytes]:
+        feed = ChangeFeed(watcher=VersionWatcher(poll=0.02))
+        subscribers = [feed.subscribe('feed-session') for _ in range(3)]
+        streams = [stream_changes(feed, subscriber, 0, None) for subscriber in subscribers]
+        for stream in streams:
+            await anext(stream)
+        assert len([task for task in asyncio.all_tasks() if task is not asyncio.current_task()]) == 1
+        # Another worker's commit: the version moves but nothing is published here.
+        with Session(engine) as session:
+            SessionRepository(session).bump_version('feed-session')
+            session.commit()
+        with anyio.fail_after(5):
+            received = [await anext(stream) for stream in streams]
+        for stream in streams:
+            await stream.aclose()
+        await anyio.sleep(0.1)
+        assert not [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        return received
+
+    assert anyio.run(scenario) == [b'id: 1\nevent: reset\ndata: {"version": 1}\n\n'] * 3
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from src.models.changes_schemas import SessionChangesResponse
+from src.services.pagination import encode_cursor
+
+BASE_URL = '/api/v1/sessions/delta-session'
+MEMORY = {'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': 'Kept'}
+
+
+def _changes(client, since: str | None = None) -> SessionChangesResponse:
+    response = client.get(f'{BASE_URL}/changes', params={'since': since} if since else None)
+    assert response.status_code == 200
+    return SessionChangesResponse.model_validate(response.json())
+
+
+def test_delta_returns_only_items_written_after_the_cursor(client, sample_theme_payload) -> None:
+    kept = client.post(f'{BASE_URL}/memories', json=MEMORY).json()['id']
+    edited = client.post(f'{BASE_URL}/memories', json={**MEMORY, 'title': 'Before'}).json()['id']
+    doomed = client.post(f'{BASE_URL}/memories', json={**MEMORY, 'title': 'Doomed'}).json()['id']
+    theme_id = client.post(f'{BASE_URL}/themes', json=sample_theme_payload).json()['id']
+
+    full = _changes(client)
+    assert full.version == 4
+    assert {memory.id for memory in full.memories} == {kept, edited, doomed}
+    assert [theme.id for theme in full.themes] == [theme_id]
+    assert full.deleted == []
+
+    assert client.patch(f'{BASE_URL}/memories/{edited}', json={'title': 'After'}).status_code == 200
+    assert client.delete(f'{BASE_URL}/memories/{doomed}').status_code == 204
+    assert client.delete(f'{BASE_URL}/themes/{theme_id}').status_code == 204
+    added = client.post(f'{BASE_URL}/memories', json={**MEMORY, 'title': 'New'}).json()['id']
+
+    delta = _changes(client, full.cursor)
+    assert delta.version == 8
+    assert sorted((memory.id, memory.title) for memory in delta.memories) == sorted([(edited, 'After'), (added, 'New')])
+    assert delta.themes == []
+    assert [(tombstone.type, tombstone.id, tombstone.version) for tombstone in delta.deleted] == [
+        ('memory', doomed, 6),
+        ('theme', theme_id, 7),
+    ]
+
+    assert _changes(client, delta.cursor).model_dump(include={'memories', 'themes', 'deleted'}) == {
+        'memories': [],
+        'themes': [],
+        'deleted': [],
+    }
+
+
+def test_batch_writes_share_one_version_in_the_delta(client) -> None:
+    first = client.post(f'{BASE_URL}/memories', json=MEMORY).json()['id']
+    cursor = _changes(client).cursor
+    operations = [
+        {'op': 'create', 'memory': {**MEMORY, 'title': 'Batched'}},
+        {'op': 'delete', 'id': first},
+    ]
+    assert client.post(f'{BASE_URL}/memories:batch', json={'operations': operations}).status_code == 200
+
+    delta = _changes(client, cursor)
+    assert [memory.title for memory in delta.memories] == ['Batched']
+    assert [(tombstone.id, tombstone.version) for tombstone in delta.deleted] == [(first, 2)]
+    assert delta.version == 2
+
+
+def test_bad_or_future_cursor_is_rejected(client) -> None:
+    assert client.get(f'{BASE_URL}/changes', params={'since': 'not-a-cursor'}).status_code == 422
+    ahead = client.get(f'{BASE_URL}/changes', params={'since': encode_cursor([5])})
+    assert ahead.status_code == 422
+    assert 'ahead' in ahead.json()['detail']
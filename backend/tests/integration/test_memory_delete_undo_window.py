@@ -1,5 +1,14 @@
 from __future__ import annotations
 
+from datetime import timedelta
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from src.db import engine
+from src.models.memory_deletion import MemoryDeletionRecord
+from src.services import memory_service
+from src.services.deletion_sweeper import DeletionSweeper
 
 def test_memory_delete_is_final_and_record_is_absent(client) -> None:
     created = client.post(
@@ -18,3 +27,65 @@ def test_memory_delete_is_final_and_record_is_absent(client) -> None:
     listed = client.get('/api/v1/sessions/test-session/memories')
     assert listed.status_code == 200
     assert listed.json()['memories'] == []
+
+
+def _create_and_delete(client, title: str) -> tuple[str, str]:
+    created = client.post(
+        '/api/v1/sessions/test-session/memories',
+        json={'anchor': {'type': 'point', 'timestamp': '2026-02-22T00:00:00Z'}, 'title': title, 'tags': ['note']},
+    )
+    memory_id = created.json()['id']
+    deleted = client.delete(f'/api/v1/sessions/test-session/memories/{memory_id}')
+    return memory_id, deleted.headers['x-deletion-id']
+
+
+def test_undo_after_the_window_is_gone_and_the_sweeper_purges_it(client, monkeypatch) -> None:
+    monkeypatch.setattr(memory_service, 'UNDO_WINDOW', timedelta(0))
+    _, deletion_id = _create_and_delete(client, 'Too late')
+
+    expired = client.post(f'/api/v1/sessions/test-session/memories/deletions/{deletion_id}/undo')
+    assert expired.status_code == 410
+
+    assert DeletionSweeper(interval=60, batch_size=100).sweep_once() == 1
+    swept = client.post(f'/api/v1/sessions/test-session/memories/deletions/{deletion_id}/undo')
+    assert swept.status_code == 404
+
+
+def test_sweeper_purges_in_bounded_batches_and_keeps_live_records(client, monkeypatch) -> None:
+    monkeypatch.setattr(memory_service, 'UNDO_WINDOW', timedelta(0))
+    for index in range(5):
+        _create_and_delete(client, f'Expired {index}')
+    monkeypatch.setattr(memory_service, 'UNDO_WINDOW', timedelta(minutes=5))
+    _, live_id = _create_and_delete(client, 'Live')
+
+    commits: list[None] = []
+
+    def on_commit(_session) -> None:
+        commits.append(None)
+
+    event.listen(Session, 'after_commit', on_commit)
+    try:
+        assert DeletionSweeper(interval=60, batch_size=2).sweep_once() == 5
+    finally:
+        event.remove(Session, 'after_commit', on_commit)
+    # One short transaction per batch of at most two records.
+    assert len(commits) == 3
+
+    with Session(engine) as session:
+        assert [record.deletion_id for record in session.exec(select(MemoryDeletionRecord))] == [live_id]
+
+
+def test_restored_memory_is_searchable_tagged_and_not_a_tombstone(client) -> None:
+    memory_id, deletion_id = _create_and_delete(client, 'Lazarus')
+    cursor = client.get('/api/v1/sessions/test-session/changes').json()['cursor']
+    assert client.get('/api/v1/sessions/test-session/search', params={'q': 'lazarus'}).json()['results'] == []
+
+    assert client.post(f'/api/v1/sessions/test-session/memories/deletions/{deletion_id}/undo').status_code == 200
+
+    hits = client.get('/api/v1/sessions/test-session/search', params={'q': 'lazarus'}).json()['results']
+    assert [hit['id'] for hit in hits] == [memory_id]
+    tagged = client.get('/api/v1/sessions/test-session/memories', params={'tag': 'note'}).json()['memories']
+    assert [memory['id'] for memory in tagged] == [memory_id]
+    delta = client.get('/api/v1/sessions/test-session/changes', params={'since': cursor}).json()
+    assert [memory['id'] for memory in delta['memories']] == [memory_id]
+    assert delta['deleted'] == []
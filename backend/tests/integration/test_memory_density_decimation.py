@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+
+def _create(client, day: int) -> str:
+    created = client.post(
+        '/api/v1/sessions/density-session/memories',
+        json={'anchor': {'type': 'point', 'timestamp': f'2026-03-{day:02d}T00:00:00Z'}, 'title': f'Day {day}'},
+    )
+    assert created.status_code == 201
+    return created.json()['id']
+
+
+def test_density_keeps_every_nth_memory_in_anchor_order_plus_selection(client) -> None:
+    # Create out of order to prove the stride follows anchor time, not insertion order.
+    by_day = {day: _create(client, day) for day in (5, 1, 4, 2, 3, 6, 7)}
+
+    halved = client.get('/api/v1/sessions/density-session/memories', params={'density': 40})
+    assert halved.status_code == 200
+    assert [memory['id'] for memory in halved.json()['memories']] == [by_day[1], by_day[3], by_day[5], by_day[7]]
+
+    thirds = client.get(
+        '/api/v1/sessions/density-session/memories',
+        params={'density': 80, 'selectedId': by_day[2]},
+    )
+    assert [memory['id'] for memory in thirds.json()['memories']] == [by_day[1], by_day[2], by_day[4], by_day[7]]
+
+    sparse = client.get('/api/v1/sessions/density-session/memories', params={'density': 10})
+    assert len(sparse.json()['memories']) == 7
+
+
+def test_density_stride_is_stable_inside_a_window(client) -> None:
+    by_day = {day: _create(client, day) for day in range(1, 8)}
+
+    windowed = client.get(
+        '/api/v1/sessions/density-session/memories',
+        params={'density': 40, 'from': '2026-03-02T00:00:00Z', 'to': '2026-03-06T00:00:00Z'},
+    )
+    assert [memory['id'] for memory in windowed.json()['memories']] == [by_day[3], by_day[5]]
+
+
+def test_density_rejects_pagination(client) -> None:
+    response = client.get('/api/v1/sessions/density-session/memories', params={'density': 40, 'limit': 5})
+    assert response.status_code == 422
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from src.db import engine
+
+
+def _create(client, anchor: dict[str, str], title: str) -> str:
+    created = client.post(
+        '/api/v1/sessions/window-session/memories',
+        json={'anchor': anchor, 'title': title},
+    )
+    assert created.status_code == 201
+    return created.json()['id']
+
+
+def test_window_returns_points_inside_and_ranges_overlapping(client) -> None:
+    inside = _create(client, {'type': 'point', 'timestamp': '2026-03-05T12:00:00Z'}, 'Inside')
+    _create(client, {'type': 'point', 'timestamp': '2026-02-01T00:00:00Z'}, 'Before')
+    _create(client, {'type': 'point', 'timestamp': '2026-04-01T00:00:00Z'}, 'After')
+    overlapping = _create(
+        client,
+        {'type': 'range', 'start': '2026-02-20T00:00:00Z', 'end': '2026-03-02T00:00:00Z'},
+        'Overlaps start',
+    )
+    spanning = _create(
+        client,
+        {'type': 'range', 'start': '2026-01-01T00:00:00Z', 'end': '2026-12-31T00:00:00Z'},
+        'Spans window',
+    )
+    _create(client, {'type': 'range', 'start': '2026-01-01T00:00:00Z', 'end': '2026-01-31T00:00:00Z'}, 'Ends before')
+
+    listed = client.get(
+        '/api/v1/sessions/window-session/memories',
+        params={'from': '2026-03-01T00:00:00Z', 'to': '2026-03-31T00:00:00Z'},
+    )
+    assert listed.status_code == 200
+    ids = {memory['id'] for memory in listed.json()['memories']}
+    assert ids == {inside, overlapping, spanning}
+
+
+def test_half_open_window_and_unwindowed_listing(client) -> None:
+    early = _create(client, {'type': 'point', 'timestamp': '2026-02-01T00:00:00Z'}, 'Early')
+    late = _create(client, {'type': 'point', 'timestamp': '2026-04-01T00:00:00Z'}, 'Late')
+
+    from_only = client.get('/api/v1/sessions/window-session/memories', params={'from': '2026-03-01T00:00:00Z'})
+    assert [memory['id'] for memory in from_only.json()['memories']] == [late]
+
+    to_only = client.get('/api/v1/sessions/window-session/memories', params={'to': '2026-03-01T00:00:00Z'})
+    assert [memory['id'] for memory in to_only.json()['memories']] == [early]
+
+    everything = client.get('/api/v1/sessions/window-session/memories')
+    assert {memory['id'] for memory in everything.json()['memories']} == {early, late}
+
+
+def test_inverted_window_is_rejected(client) -> None:
+    response = client.get(
+        '/api/v1/sessions/window-session/memories',
+        params={'from': '2026-03-31T00:00:00Z', 'to': '2026-03-01T00:00:00Z'},
+    )
+    assert response.status_code == 422
+
+
+def test_window_query_uses_composite_indexes() -> None:
+    with Session(engine) as session:
+        plan = session.exec(
+            text(
+                '''
+                EXPLAIN QUERY PLAN
+                SELECT id FROM memory
+                WHERE (session_id = 's' AND timestamp >= '2026' AND timestamp <= '2027')
+                   OR (session_id = 's' AND range_end >= '2026' AND range_start <= '2027')
+                '''
+            )
+        ).all()
+    details = ' '.join(str(row[3]) for row in plan)
+    assert 'ix_memory_session_timestamp' in details
+    assert 'ix_memory_session_range' in details
+
+
+def test_window_bounds_with_an_offset_are_compared_in_utc(client) -> None:
+    inside = _create(client, {'type': 'point', 'timestamp': '2026-03-01T01:00:00Z'}, 'Inside')
+    _create(client, {'type': 'point', 'timestamp': '2026-03-01T03:00:00Z'}, 'After')
+
+    # 00:00-02:30 UTC; compared as wall clock the window would miss the 01:00 point.
+    listed = client.get(
+        '/api/v1/sessions/window-session/memories',
+        params={'from': '2026-03-01T02:00:00+02:00', 'to': '2026-03-01T04:30:00+02:00'},
+    )
+    assert [memory['id'] for memory in listed.json()['memories']] == [inside]
+
+
+def test_window_may_mix_naive_and_offset_bounds(client) -> None:
+    inside = _create(client, {'type': 'point', 'timestamp': '2026-03-01T01:00:00Z'}, 'Inside')
+
+    listed = client.get(
+        '/api/v1/sessions/window-session/memories',
+        params={'from': '2026-03-01T00:00:00', 'to': '2026-03-01T04:30:00+02:00'},
+    )
+    assert listed.status_code == 200
+    assert [memory['id'] for memory in listed.json()['memories']] == [inside]
+
+    inverted = client.get(
+        '/api/v1/sessions/window-session/memories',
+        params={'from': '2026-03-01T03:00:00', 'to': '2026-03-01T04:30:00+02:00'},
+    )
+    assert inverted.status_code == 422
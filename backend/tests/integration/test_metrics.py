@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from src.metrics import MetricsRegistry, RequestSql
+
+MEMORIES_URL = '/api/v1/sessions/metrics-session/memories'
+MEMORIES_ROUTE = '/api/v1/sessions/{session_id}/memories'
+
+
+def _samples(text: str) -> dict[str, float]:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_requests_are_counted_and_timed_per_route_template(client) -> None:
+    created = client.post(MEMORIES_URL, json={'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': 'A'})
+    assert created.status_code == 201
+    client.get(MEMORIES_URL)
+    client.get('/api/v1/sessions/other-session/memories')
+    client.patch(f'{MEMORIES_URL}/missing', json={'title': 'B'})
+    client.get('/api/v1/nowhere')
+
+    response = client.get('/api/v1/metrics')
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'text/plain; version=0.0.4; charset=utf-8'
+    samples = _samples(response.text)
+
+    labels = f'method="GET",route="{MEMORIES_ROUTE}"'
+    assert samples[f'timeline_http_requests_total{{{labels},status="200"}}'] == 2
+    assert samples[f'timeline_http_requests_total{{method="POST",route="{MEMORIES_ROUTE}",status="201"}}'] == 1
+    patch_route = MEMORIES_ROUTE + '/{memory_id}'
+    assert samples[f'timeline_http_requests_total{{method="PATCH",route="{patch_route}",status="404"}}'] == 1
+    assert samples['timeline_http_requests_total{method="GET",route="unmatched",status="404"}'] == 1
+
+    assert samples[f'timeline_http_request_duration_seconds_count{{{labels}}}'] == 2
+    assert samples[f'timeline_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'] == 2
+    assert samples[f'timeline_http_request_duration_seconds_sum{{{labels}}}'] > 0
+    # Every list request reads the session version and the page.
+    assert samples[f'timeline_http_request_sql_statements_sum{{{labels}}}'] >= 4
+    assert samples[f'timeline_http_request_sql_seconds_sum{{{labels}}}'] > 0
+
+    # The scrape itself is the only request in flight.
+    assert samples['timeline_http_requests_in_flight{method="GET",route="/api/v1/metrics"}'] == 1
+    assert samples[f'timeline_http_requests_in_flight{{{labels}}}'] == 0
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive() -> None:
+    registry = MetricsRegistry()
+    for seconds, statements in ((0.001, 0), (0.004, 2), (30.0, 300)):
+        registry.request_started('GET', '/r')
+        registry.request_finished('GET', '/r', 200, seconds, RequestSql(statements, seconds / 2))
+
+    samples = _samples(registry.render())
+    latency = 'timeline_http_request_duration_seconds_bucket{method="GET",route="/r",le="%s"}'
+    assert samples[latency % '0.001'] == 1
+    assert samples[latency % '0.0025'] == 1
+    assert samples[latency % '0.005'] == 2
+    assert samples[latency % '10.0'] == 2
+    assert samples[latency % '+Inf'] == 3
+    statements = 'timeline_http_request_sql_statements_bucket{method="GET",route="/r",le="%s"}'
+    assert samples[statements % '0.0'] == 1
+    assert samples[statements % '2.0'] == 2
+    assert samples[statements % '+Inf'] == 3
+    assert samples['timeline_http_request_sql_statements_sum{method="GET",route="/r"}'] == 302
+    assert samples['timeline_http_requests_in_flight{method="GET",route="/r"}'] == 0
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from sqlmodel import Session
+
+from src.db import engine
+from src.repositories.session_repository import SessionRepository
+from src.services.payload_cache import CachedPayload, PayloadCache, payload_cache, payload_key
+
+MEMORIES_URL = '/api/v1/sessions/cache-session/memories'
+THEMES_URL = '/api/v1/sessions/cache-session/themes'
+
+
+def _create_memory(client, title: str) -> str:
+    created = client.post(MEMORIES_URL, json={'anchor': {'type': 'point', 'timestamp': '2026-02-22T00:00:00Z'}, 'title': title})
+    assert created.status_code == 201
+    return created.json()['id']
+
+
+def test_repeat_list_is_served_from_the_cache(client, sample_theme_payload) -> None:
+    _create_memory(client, 'First')
+    assert client.post(THEMES_URL, json=sample_theme_payload).status_code == 201
+
+    first = client.get(MEMORIES_URL, params={'limit': 1})
+    stats = payload_cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (0, 1, 1)
+
+    again = client.get(MEMORIES_URL, params={'limit': 1})
+    assert again.content == first.content
+    assert again.headers['x-next-cursor'] == first.headers['x-next-cursor']
+    assert payload_cache.stats().hits == 1
+
+    # Different arguments are a different entry.
+    client.get(MEMORIES_URL)
+    client.get(THEMES_URL)
+    client.get(THEMES_URL)
+    stats = payload_cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 3, 3)
+
+
+def test_write_drops_the_session_entries_and_the_next_read_is_fresh(client) -> None:
+    memory_id = _create_memory(client, 'First')
+    client.get(MEMORIES_URL)
+    client.get('/api/v1/sessions/other-session/memories')
+    assert payload_cache.stats().entries == 2
+
+    assert client.patch(f'{MEMORIES_URL}/{memory_id}', json={'title': 'Renamed'}).status_code == 200
+    stats = payload_cache.stats()
+    assert stats.entries == 1
+    assert stats.invalidations == 1
+
+    fresh = client.get(MEMORIES_URL)
+    assert [memory['title'] for memory in fresh.json()['memories']] == ['Renamed']
+    assert payload_cache.stats().misses == 3
+
+
+def test_a_rolled_back_write_keeps_the_cached_lists(client) -> None:
+    memory_id = _create_memory(client, 'First')
+    client.get(MEMORIES_URL)
+
+    with Session(engine) as session:
+        SessionRepository(session).bump_version('cache-session')
+        session.rollback()
+    assert payload_cache.stats().entries == 1
+
+    assert client.patch(f'{MEMORIES_URL}/{memory_id}', json={'title': 'Renamed'}).status_code == 200
+    assert payload_cache.stats().entries == 0
+
+
+def test_least_recently_used_entries_are_evicted_past_the_byte_budget() -> None:
+    cache = PayloadCache(max_bytes=10)
+    first, second, third = (payload_key('s', 1, 'memories', limit=limit) for limit in (1, 2, 3))
+    cache.put(first, CachedPayload(b'aaaa', None))
+    cache.put(second, CachedPayload(b'bbbb', None))
+    assert cache.get(first) is not None
+    cache.put(third, CachedPayload(b'cccc', None))
+
+    assert cache.get(second) is None
+    assert cache.get(first) is not None
+    assert cache.get(third) is not None
+    stats = cache.stats()
+    assert (stats.bytes, stats.entries, stats.evictions) == (8, 2, 1)
+
+    # A body larger than the whole budget is never stored.
+    cache.put(payload_key('s', 1, 'themes'), CachedPayload(b'x' * 11, None))
+    assert cache.stats().entries == 2
+
+
+def test_cache_counters_are_exposed(client) -> None:
+    client.get(MEMORIES_URL)
+    client.get(MEMORIES_URL)
+
+    response = client.get('/api/v1/health/cache')
+    assert response.status_code == 200
+    body = response.json()
+    assert body['hits'] == 1
+    assert body['misses'] == 1
+    assert body['entries'] == 1
+    assert body['bytes'] > 0
+    assert body['maxBytes'] == payload_cache.max_bytes
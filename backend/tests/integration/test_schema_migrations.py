@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+import pytest
+from sqlalchemy import text
+
+from src import migrations
+from src.db import engine
+from src.migrations import LATEST_VERSION, migrate, schema_version
+from src.sql_profiler import capture_sql
+
+SESSION_URL = '/api/v1/sessions/migrated-session'
+DERIVED = {
+    'itemtag': 'SELECT item_id, tag FROM itemtag ORDER BY 1, 2',
+    'timelinehistogrambucket': 'SELECT * FROM timelinehistogrambucket ORDER BY 1, 2, 3',
+    'timeline_search': 'SELECT rowid, session_token FROM timeline_search ORDER BY 1',
+}
+
+
+def _snapshot() -> dict[str, list[tuple]]:
+    with engine.connect() as connection:
+        return {table: [tuple(row) for row in connection.execute(text(query))] for table, query in DERIVED.items()}
+
+
+def _forget_derived_data() -> None:
+    """Turn the test database into one written before tags, histogram and search existed."""
+    with engine.begin() as connection:
+        connection.execute(text('DELETE FROM itemtag'))
+        connection.execute(text('DELETE FROM timelinehistogrambucket'))
+        connection.execute(text('DROP TABLE timeline_search'))
+        connection.execute(text('DELETE FROM schemamigration WHERE version >= 5'))
+
+
+def test_up_to_date_database_costs_one_query() -> None:
+    assert schema_version(engine) == LATEST_VERSION
+
+    with capture_sql(engine) as sql:
+        assert migrate(engine) == []
+    sql.assert_at_most(1)
+
+
+def test_backfills_resume_from_their_last_committed_chunk(client, sample_theme_payload, monkeypatch) -> None:
+    for index in range(7):
+        created = client.post(
+            f'{SESSION_URL}/memories',
+            json={
+                'anchor': {'type': 'point', 'timestamp': f'2026-03-0{index + 1}T00:00:00Z'},
+                'title': f'Memory {index}',
+                'tags': ['travel', f'day-{index}'],
+            },
+        )
+        assert created.status_code == 201
+    assert client.post(f'{SESSION_URL}/themes', json={**sample_theme_payload, 'tags': ['travel']}).status_code == 201
+    expected = _snapshot()
+    _forget_derived_data()
+
+    chunks = 0
+    tag_migration = next(migration for migration in migrations.MIGRATIONS if migration.name == 'tag_index')
+
+    def interrupted(connection, cursor, chunk_size):
+        nonlocal chunks
+        chunks += 1
+        if chunks == 3:
+            raise RuntimeError('process killed')
+        return tag_migration.backfill(connection, cursor, chunk_size)
+
+    monkeypatch.setattr(
+        migrations,
+        'MIGRATIONS',
+        tuple(replace(m, backfill=interrupted) if m is tag_migration else m for m in migrations.MIGRATIONS),
+    )
+    with pytest.raises(RuntimeError, match='process killed'):
+        migrate(engine, chunk_size=3)
+    monkeypatch.undo()
+
+    assert schema_version(engine) == 5
+    with engine.connect() as connection:
+        cursor = connection.execute(text('SELECT backfill_cursor FROM schemamigration WHERE version = 6')).scalar()
+        indexed = connection.execute(text('SELECT count(DISTINCT item_id) FROM itemtag')).scalar()
+    assert cursor.startswith('memory:')
+    assert indexed == 6
+
+    assert migrate(engine, chunk_size=3) == ['tag_index', 'search_index', 'memory_creation_order']
+    assert schema_version(engine) == LATEST_VERSION
+    assert _snapshot() == expected
+    titles = client.get(f'{SESSION_URL}/memories', params={'tag': 'day-6'}).json()['memories']
+    assert [memory['title'] for memory in titles] == ['Memory 6']
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from sqlmodel import Session
+
+from src.db import engine
+from src.repositories.search_repository import SearchRepository
+
+SESSION_URL = '/api/v1/sessions/search-session'
+
+
+def _create_memory(client, title: str, description: str = '', timestamp: str = '2026-03-01T00:00:00Z') -> str:
+    created = client.post(
+        f'{SESSION_URL}/memories',
+        json={'anchor': {'type': 'point', 'timestamp': timestamp}, 'title': title, 'description': description},
+    )
+    assert created.status_code == 201
+    return created.json()['id']
+
+
+def _search(client, q: str, **params) -> list[dict]:
+    response = client.get(f'{SESSION_URL}/search', params={'q': q, **params})
+    assert response.status_code == 200
+    return response.json()['results']
+
+
+def test_search_ranks_title_matches_and_highlights(client, sample_theme_payload) -> None:
+    in_description = _create_memory(client, 'Lunch', 'Dinner plans in Paris with friends')
+    in_title = _create_memory(client, 'Paris trip')
+    _create_memory(client, 'Berlin')
+    theme = client.post(f'{SESSION_URL}/themes', json={**sample_theme_payload, 'title': 'Parisian summer'})
+    assert theme.status_code == 201
+    assert client.post(
+        '/api/v1/sessions/other-session/memories',
+        json={'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': 'Paris'},
+    ).status_code == 201
+
+    # The last word is matched as a prefix for search-as-you-type, and title hits outrank descriptions.
+    results = _search(client, 'paris')
+    assert [result['id'] for result in results] == [in_title, theme.json()['id'], in_description]
+    assert results[0]['titleHighlight'] == '<mark>Paris</mark> trip'
+    assert '<mark>Paris</mark>' in results[2]['snippet']
+    assert _search(client, 'paris trip')[0]['id'] == in_title
+    assert [result['itemType'] for result in _search(client, 'par', type='theme')] == ['theme']
+
+
+def test_search_follows_updates_deletes_and_windows(client) -> None:
+    march = _create_memory(client, 'Kyoto', timestamp='2026-03-01T00:00:00Z')
+    june = _create_memory(client, 'Kyoto again', timestamp='2026-06-01T00:00:00Z')
+
+    in_window = _search(client, 'kyoto', **{'from': '2026-05-01T00:00:00Z', 'to': '2026-07-01T00:00:00Z'})
+    assert [result['id'] for result in in_window] == [june]
+
+    assert client.patch(f'{SESSION_URL}/memories/{march}', json={'title': 'Osaka'}).status_code == 200
+    assert client.delete(f'{SESSION_URL}/memories/{june}').status_code == 204
+    assert _search(client, 'kyoto') == []
+    assert [result['id'] for result in _search(client, 'osaka')] == [march]
+
+
+def test_search_pages_with_cursor(client) -> None:
+    created = {_create_memory(client, f'Note {index}') for index in range(5)}
+    seen: list[str] = []
+    params: dict[str, object] = {'q': 'note', 'limit': 2}
+    while True:
+        response = client.get(f'{SESSION_URL}/search', params=params)
+        assert response.status_code == 200
+        seen.extend(result['id'] for result in response.json()['results'])
+        cursor = response.headers.get('x-next-cursor')
+        if cursor is None:
+            break
+        params = {'q': 'note', 'limit': 2, 'after': cursor}
+    assert sorted(seen) == sorted(created)
+    assert len(seen) == 5
+
+
+def test_search_treats_query_as_plain_text(client) -> None:
+    _create_memory(client, 'Quote "test"')
+    assert len(_search(client, '"test" OR NEAR(')) == 0
+    assert len(_search(client, '"test"')) == 1
+    assert client.get(f'{SESSION_URL}/search', params={'q': '***'}).status_code == 422
+
+
+def test_search_highlights_escape_the_item_text(client) -> None:
+    _create_memory(client, '<img src=x onerror=alert(1)> party', 'Bring <script>alert(1)</script> & party hats')
+
+    [result] = _search(client, 'party')
+    assert result['title'] == '<img src=x onerror=alert(1)> party'
+    assert result['titleHighlight'] == '&lt;img src=x onerror=alert(1)&gt; <mark>party</mark>'
+    assert result['snippet'] == 'Bring &lt;script&gt;alert(1)&lt;/script&gt; &amp; <mark>party</mark> hats'
+
+
+def test_rebuild_matches_incremental_index(client, sample_theme_payload) -> None:
+    _create_memory(client, 'Alpha', 'first')
+    assert client.post(f'{SESSION_URL}/themes', json={**sample_theme_payload, 'title': 'Alpha theme'}).status_code == 201
+
+    with Session(engine) as session:
+        SearchRepository(session).rebuild()
+        session.commit()
+    assert len(_search(client, 'alpha')) == 2
+
+
+def test_search_window_with_an_offset_is_read_in_utc(client) -> None:
+    late = _create_memory(client, 'Harbour', timestamp='2026-03-01T23:00:00Z')
+
+    # 00:30+02:00 is 22:30Z, before the memory; read as wall clock it would be after it.
+    window = {'from': '2026-03-02T00:30:00+02:00', 'to': '2026-03-02T00:00:00'}
+    assert [result['id'] for result in _search(client, 'harbour', **window)] == [late]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from sqlmodel import Session, func, select
+
+from src.db import engine
+from src.models.memory import Memory
+from src.models.memory_schemas import MemoryCreateRequest
+from src.repositories.memory_repository import MemoryRepository
+from src.repositories.session_repository import SessionRepository
+
+SESSION_ID = 'snapshot-session'
+SESSION_URL = f'/api/v1/sessions/{SESSION_ID}'
+
+
+def _create_memory(client, timestamp: str) -> str:
+    created = client.post(
+        f'{SESSION_URL}/memories',
+        json={'anchor': {'type': 'point', 'timestamp': timestamp}, 'title': 'Memory'},
+    )
+    assert created.status_code == 201
+    return created.json()['id']
+
+
+def test_snapshot_matches_the_separate_endpoints(client, sample_theme_payload) -> None:
+    _create_memory(client, '2026-03-01T00:00:00Z')
+    _create_memory(client, '2026-06-01T00:00:00Z')
+    assert client.post(f'{SESSION_URL}/themes', json=sample_theme_payload).status_code == 201
+
+    response = client.get(f'{SESSION_URL}/snapshot')
+    assert response.status_code == 200
+    snapshot = response.json()
+    assert snapshot['sessionId'] == SESSION_ID
+    assert snapshot['version'] == 3
+    assert snapshot['timeline']['timeline']['id'] == 'timeline-main'
+    assert snapshot['memories'] == client.get(f'{SESSION_URL}/memories').json()['memories']
+    assert snapshot['themes'] == client.get(f'{SESSION_URL}/themes').json()['themes']
+
+
+def test_snapshot_honours_the_viewport_window(client, sample_theme_payload) -> None:
+    inside = _create_memory(client, '2026-03-01T12:00:00Z')
+    _create_memory(client, '2026-06-01T00:00:00Z')
+    assert client.post(f'{SESSION_URL}/themes', json=sample_theme_payload).status_code == 201
+
+    window = {'from': '2026-03-01T00:00:00Z', 'to': '2026-03-02T00:00:00Z'}
+    snapshot = client.get(f'{SESSION_URL}/snapshot', params=window).json()
+    assert [memory['id'] for memory in snapshot['memories']] == [inside]
+    assert len(snapshot['themes']) == 1
+
+    later = client.get(f'{SESSION_URL}/snapshot', params={'from': '2027-01-01T00:00:00Z', 'to': '2027-02-01T00:00:00Z'})
+    assert later.json()['memories'] == [] and later.json()['themes'] == []
+    assert client.get(f'{SESSION_URL}/snapshot', params={'from': window['from']}).status_code == 422
+
+    # One naive and one offset bound: 2026-03-02T02:00+02:00 is midnight UTC.
+    mixed = client.get(f'{SESSION_URL}/snapshot', params={'from': '2026-03-01T00:00:00', 'to': '2026-03-02T02:00:00+02:00'})
+    assert mixed.status_code == 200
+    assert [memory['id'] for memory in mixed.json()['memories']] == [inside]
+
+
+def test_snapshot_reports_an_unavailable_timeline(client, monkeypatch) -> None:
+    monkeypatch.setenv('TIMELINE_FORCE_UNAVAILABLE', '1')
+    response = client.get(f'{SESSION_URL}/snapshot')
+    assert response.status_code == 503
+    assert response.json()['code'] == 'SERVICE_UNAVAILABLE'
+
+
+def test_read_transaction_ignores_concurrent_commits() -> None:
+    payload = MemoryCreateRequest.model_validate(
+        {'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': 'Memory'}
+    )
+    count = select(func.count()).select_from(Memory)
+    with Session(engine) as reader, Session(engine) as writer:
+        SessionRepository(reader).begin_read()
+        before = reader.exec(count).one()
+        MemoryRepository(writer).create_memory(SESSION_ID, payload)
+        assert reader.exec(count).one() == before
+    with Session(engine) as fresh:
+        assert fresh.exec(count).one() == before + 1
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Engine, text
+
+from src import async_db, db
+from src.db import create_shard_engine
+from src.migrations import migrate
+from src.rebalance import rebalance
+from src.shards import ShardRegistry, ShardRing, check_layout, read_layout, shard_path
+
+SESSION_IDS = [f'session-{index}' for index in range(12)]
+# Rows that must survive a move unchanged, derived indexes included.
+SNAPSHOT = {
+    'memory': 'SELECT id, session_id, title, tags_json, version FROM memory ORDER BY id',
+    'theme': 'SELECT id, session_id, title, version FROM theme ORDER BY id',
+    'itemtag': 'SELECT * FROM itemtag ORDER BY 1, 2, 3, 4',
+    'timelinehistogrambucket': 'SELECT * FROM timelinehistogrambucket ORDER BY 1, 2, 3',
+    'timeline_search': 'SELECT rowid, session_token, item_id FROM timeline_search ORDER BY 1',
+    'theme_rtree': 'SELECT id, min_session, min_time, theme_id FROM theme_rtree ORDER BY 1',
+}
+
+
+def _snapshot(engines: list[Engine]) -> dict[str, list[tuple]]:
+    rows: dict[str, list[tuple]] = {}
+    for engine in engines:
+        with engine.connect() as connection:
+            for table, query in SNAPSHOT.items():
+                rows.setdefault(table, []).extend(tuple(row) for row in connection.execute(text(query)))
+    return {table: sorted(values) for table, values in rows.items()}
+
+
+def _sessions_in(engine: Engine) -> set[str]:
+    with engine.connect() as connection:
+        return {str(row[0]) for row in connection.execute(text('SELECT session_id FROM memory'))}
+
+
+def _populate(client, sample_theme_payload) -> None:
+    for session_id in SESSION_IDS:
+        url = f'/api/v1/sessions/{session_id}'
+        memory = {'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': session_id, 'tags': ['trip']}
+        assert client.post(f'{url}/memories', json=memory).status_code == 201
+        assert client.post(f'{url}/themes', json=sample_theme_payload).status_code == 201
+
+
+def test_ring_spreads_sessions_and_growing_only_moves_sessions_to_the_new_shard() -> None:
+    ids = [f'user-{index}' for index in range(4000)]
+    four, five = ShardRing(4), ShardRing(5)
+
+    counts = [0] * 4
+    for session_id in ids:
+        counts[four.shard_for(session_id)] += 1
+    assert all(600 < count < 1400 for count in counts)
+
+    moved = [session_id for session_id in ids if four.shard_for(session_id) != five.shard_for(session_id)]
+    assert {five.shard_for(session_id) for session_id in moved} == {4}
+    assert 400 < len(moved) < 1300
+
+
+def test_requests_are_routed_to_the_shard_owning_the_session(client, tmp_path: Path, monkeypatch) -> None:
+    ring = ShardRing(2)
+    engines = [create_shard_engine(shard_path(tmp_path / 'sharded.db', index)) for index in range(2)]
+    for engine in engines:
+        migrate(engine)
+    monkeypatch.setattr(db, 'shards', ShardRegistry(ring, engines))
+    monkeypatch.setattr(async_db, 'async_shards', None)
+    first = next(session_id for session_id in SESSION_IDS if ring.shard_for(session_id) == 0)
+    second = next(session_id for session_id in SESSION_IDS if ring.shard_for(session_id) == 1)
+
+    for session_id in (first, second):
+        memory = {'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': session_id}
+        assert client.post(f'/api/v1/sessions/{session_id}/memories', json=memory).status_code == 201
+        listed = client.get(f'/api/v1/sessions/{session_id}/memories').json()['memories']
+        assert [item['title'] for item in listed] == [session_id]
+
+    assert [_sessions_in(engine) for engine in engines] == [{first}, {second}]
+    for engine in engines:
+        engine.dispose()
+
+
+def test_rebalance_moves_sessions_with_their_indexes_and_back(client, sample_theme_payload, tmp_path: Path) -> None:
+    _populate(client, sample_theme_payload)
+    base = tmp_path / 'timeline.db'
+    with db.engine.connect() as connection:
+        connection.exec_driver_sql(f"VACUUM INTO '{base}'")
+    unsharded = create_shard_engine(base)
+    expected = _snapshot([unsharded])
+
+    with pytest.raises(RuntimeError, match='laid out for 1 shard'):
+        check_layout(unsharded, 0, 3)
+
+    report = rebalance(base, 3, create_shard_engine)
+    ring = ShardRing(3)
+    assert sorted(session_id for session_id, _, _ in report.moved) == sorted(
+        session_id for session_id in SESSION_IDS if ring.shard_for(session_id) != 0
+    )
+    engines = [create_shard_engine(shard_path(base, index)) for index in range(3)]
+    for index, engine in enumerate(engines):
+        assert _sessions_in(engine) == {session_id for session_id in SESSION_IDS if ring.shard_for(session_id) == index}
+        assert read_layout(engine) == 3
+        check_layout(engine, index, 3)
+    assert _snapshot(engines) == expected
+
+    report = rebalance(base, 1, create_shard_engine)
+    assert report.previous_shard_count == 3
+    assert report.retired == [shard_path(base, 1), shard_path(base, 2)]
+    assert _snapshot([engines[0]]) == expected
+    assert read_layout(engines[0]) == 1
+    for engine in (unsharded, *engines):
+        engine.dispose()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+
+import anyio
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+
+from src import sql_profiler
+from src.db import engine
+from src.models.memory_schemas import MemoryBatchRequest
+from src.services.memory_service import MemoryService
+from src.services.theme_service import ThemeService
+from src.sql_profiler import SqlProfile, SqlProfilerMiddleware, SqlProfilerSettings, capture_sql, fingerprint
+
+SESSION_ID = 'profiled-session'
+
+
+def _create_memories(count: int) -> list[str]:
+    operations = [
+        {'op': 'create', 'memory': {'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': f'M{index}'}}
+        for index in range(count)
+    ]
+    with Session(engine) as session:
+        response = MemoryService(session).apply_batch(SESSION_ID, MemoryBatchRequest.model_validate({'operations': operations}))
+    return [result.id for result in response.results]
+
+
+def _patch_all(memory_ids: list[str]) -> SqlProfile:
+    payload = MemoryBatchRequest.model_validate(
+        {'operations': [{'op': 'patch', 'id': memory_id, 'memory': {'title': 'Patched'}} for memory_id in memory_ids]}
+    )
+    with Session(engine) as session, capture_sql() as sql:
+        MemoryService(session).apply_batch(SESSION_ID, payload)
+    return sql
+
+
+def test_list_paths_issue_a_single_query() -> None:
+    _create_memories(3)
+
+    with Session(engine) as session, capture_sql() as sql:
+        MemoryService(session).list_memories(SESSION_ID)
+    sql.assert_at_most(1)
+
+    with Session(engine) as session, capture_sql() as sql:
+        MemoryService(session).list_memories_json(SESSION_ID, limit=2)
+        ThemeService(session).list_themes_json(SESSION_ID, limit=2)
+    sql.assert_at_most(1, r'FROM memory\b')
+    sql.assert_at_most(1, r'FROM theme\b')
+
+
+def test_batch_patch_query_count_does_not_grow_with_the_batch() -> None:
+    few = _patch_all(_create_memories(3))
+    many = _patch_all(_create_memories(30))
+
+    assert many.count == few.count
+    # The histogram is adjusted twice (old rows out, new rows in); nothing runs per item.
+    many.assert_no_repeats(limit=2)
+
+
+def test_assertion_lists_the_statements_that_ran() -> None:
+    with capture_sql() as sql, engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+        connection.execute(text('SELECT 2'))
+
+    with pytest.raises(AssertionError, match=r'at most 1 statements, got 2:\n  1\. SELECT 1\n  2\. SELECT 2'):
+        sql.assert_at_most(1)
+    assert fingerprint('SELECT * FROM t WHERE a = 7 AND b IN (?, ?, ?)') == 'SELECT * FROM t WHERE a = ? AND b IN (...)'
+
+
+def test_requests_repeating_a_statement_are_reported_as_n_plus_one(caplog) -> None:
+    async def endpoint(scope, receive, send) -> None:
+        def lookups() -> None:
+            with engine.connect() as connection:
+                for item_id in range(5):
+                    connection.execute(text('SELECT id FROM memory WHERE id = :id'), {'id': str(item_id)})
+
+        await anyio.to_thread.run_sync(lookups)
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    app = SqlProfilerMiddleware(endpoint, SqlProfilerSettings(repeat_limit=3))
+
+    async def call() -> None:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+            await client.get('/items')
+
+    sql_profiler.install_sql_profiler(engine)
+    with caplog.at_level(logging.WARNING, logger='src.sql_profiler'):
+        anyio.run(call)
+
+    assert [record.getMessage() for record in caplog.records] == [
+        'possible N+1: GET /items ran 5 x SELECT id FROM memory WHERE id = ?'
+    ]
+
+
+def test_slow_statements_are_logged_with_parameters_and_plan(monkeypatch, caplog) -> None:
+    sql_profiler.install_sql_profiler(engine)
+    monkeypatch.setattr(sql_profiler, '_settings', SqlProfilerSettings(slow_ms=0))
+    with caplog.at_level(logging.WARNING, logger='src.sql_profiler'), engine.connect() as connection:
+        connection.execute(text('SELECT id FROM memory WHERE session_id = :session_id'), {'session_id': SESSION_ID})
+
+    (record,) = caplog.records
+    message = record.getMessage()
+    assert message.startswith('slow SQL ')
+    assert 'SELECT id FROM memory WHERE session_id = ?' in message
+    assert f"parameters: ('{SESSION_ID}',)" in message
+    assert '\n  SEARCH memory USING ' in message
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pytest
+
+from src.sqlite_profile import SQLITE_PROFILES, load_sqlite_profile
+
+
+def test_storage_health_reports_active_tuned_pragmas(client) -> None:
+    response = client.get('/api/v1/health/storage')
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload['profile'] == 'tuned'
+    assert payload['active']['journal_mode'] == 'WAL'
+    assert payload['active']['synchronous'] == 'NORMAL'
+    assert payload['active']['temp_store'] == 'MEMORY'
+    assert payload['active']['busy_timeout'] == 5000
+    assert payload['configured']['cache_size'] == payload['active']['cache_size']
+
+
+def test_profile_selection_and_overrides_from_environment() -> None:
+    profile = load_sqlite_profile(
+        {
+            'TIMELINE_DB_PROFILE': 'durable',
+            'TIMELINE_DB_SYNCHRONOUS': 'extra',
+            'TIMELINE_DB_MMAP_SIZE': '0',
+        }
+    )
+    assert profile.name == 'durable'
+    assert profile.synchronous == 'EXTRA'
+    assert profile.mmap_size == 0
+    assert profile.journal_mode == 'WAL'
+
+    assert load_sqlite_profile({'TIMELINE_DB_PROFILE': 'legacy'}).pragmas() == []
+    assert load_sqlite_profile({}) == SQLITE_PROFILES['tuned']
+
+
+@pytest.mark.parametrize(
+    'env',
+    [
+        {'TIMELINE_DB_PROFILE': 'fastest'},
+        {'TIMELINE_DB_JOURNAL_MODE': 'WAL; DROP TABLE memory'},
+        {'TIMELINE_DB_CACHE_SIZE': 'lots'},
+    ],
+)
+def test_invalid_profile_settings_are_rejected(env: dict[str, str]) -> None:
+    with pytest.raises(ValueError):
+        load_sqlite_profile(env)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+from benchmarks.startup import BACKEND_ROOT, PHASES, measure_startup, over_budget
+
+
+def test_importing_the_app_leaves_the_database_alone(tmp_path: Path) -> None:
+    db_path = tmp_path / 'startup.db'
+    subprocess.run(
+        [sys.executable, '-c', 'import src.main'],
+        cwd=BACKEND_ROOT,
+        env={**os.environ, 'TIMELINE_DB_PATH': str(db_path)},
+        check=True,
+    )
+    assert not db_path.exists()
+
+    # The lifespan migrates the fresh database before the first request is served.
+    report = measure_startup(db_path, runs=1, warmup=False)
+    assert db_path.exists()
+    assert set(report) == set(PHASES)
+    assert report['ready_ms']['p50'] >= report['import_ms']['p50'] > 0
+
+
+def test_budget_check_reports_only_phases_over_their_median_budget() -> None:
+    report = {phase: {'p50': 100.0, 'max': 400.0} for phase in PHASES}
+
+    assert over_budget(report, {'import_ms': 150, 'ready_ms': 100}) == []
+    assert over_budget(report, {'import_ms': 50, 'ready_ms': 300}) == ['import_ms p50 100.0 ms exceeds the 50 ms budget']
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from sqlmodel import Session, select
+
+from src.db import engine
+from src.models.tag import ItemTag
+from src.repositories.tag_repository import TagRepository
+
+SESSION_URL = '/api/v1/sessions/tag-session'
+
+
+def _create_memory(client, title: str, tags: list[str]) -> str:
+    created = client.post(
+        f'{SESSION_URL}/memories',
+        json={'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': title, 'tags': tags},
+    )
+    assert created.status_code == 201
+    return created.json()['id']
+
+
+def _titles(client, *tags: str) -> list[str]:
+    response = client.get(f'{SESSION_URL}/memories', params={'tag': list(tags)})
+    assert response.status_code == 200
+    return sorted(memory['title'] for memory in response.json()['memories'])
+
+
+def test_tag_filter_requires_every_tag(client, sample_theme_payload) -> None:
+    _create_memory(client, 'Paris', ['travel', 'food'])
+    _create_memory(client, 'Rome', ['travel'])
+    _create_memory(client, 'Home', ['food'])
+    theme = client.post(f'{SESSION_URL}/themes', json={**sample_theme_payload, 'tags': ['travel']})
+    assert theme.status_code == 201
+
+    assert _titles(client, 'travel') == ['Paris', 'Rome']
+    assert _titles(client, 'travel', 'food') == ['Paris']
+    assert _titles(client, 'missing') == []
+    assert _titles(client) == ['Home', 'Paris', 'Rome']
+
+    themes = client.get(f'{SESSION_URL}/themes', params={'tag': 'travel'}).json()['themes']
+    assert [item['id'] for item in themes] == [theme.json()['id']]
+    assert client.get(f'{SESSION_URL}/themes', params={'tag': 'food'}).json()['themes'] == []
+
+
+def test_facets_follow_updates_deletes_and_batches(client, sample_theme_payload) -> None:
+    renamed = _create_memory(client, 'A', ['travel', 'food'])
+    removed = _create_memory(client, 'B', ['travel'])
+    assert client.post(f'{SESSION_URL}/themes', json={**sample_theme_payload, 'tags': ['travel']}).status_code == 201
+
+    assert client.patch(f'{SESSION_URL}/memories/{renamed}', json={'tags': ['work']}).status_code == 200
+    assert client.delete(f'{SESSION_URL}/memories/{removed}').status_code == 204
+    batch = client.post(
+        f'{SESSION_URL}/memories:batch',
+        json={
+            'operations': [
+                {'op': 'create', 'memory': {'anchor': {'type': 'point', 'timestamp': '2026-04-01T00:00:00Z'}, 'title': 'C', 'tags': ['work', 'work']}},
+            ]
+        },
+    )
+    assert batch.status_code == 200
+
+    facets = client.get(f'{SESSION_URL}/tags').json()
+    assert facets['tags'] == [
+        {'tag': 'work', 'memories': 2, 'themes': 0},
+        {'tag': 'travel', 'memories': 0, 'themes': 1},
+    ]
+    assert [facet['tag'] for facet in client.get(f'{SESSION_URL}/tags', params={'limit': 1}).json()['tags']] == ['work']
+
+
+def test_rebuild_matches_incremental_index(client, sample_theme_payload) -> None:
+    _create_memory(client, 'A', ['travel', 'food'])
+    _create_memory(client, 'B', [])
+    assert client.post(f'{SESSION_URL}/themes', json={**sample_theme_payload, 'tags': ['travel']}).status_code == 201
+
+    with Session(engine) as session:
+        incremental = sorted(session.exec(select(ItemTag.tag, ItemTag.item_type, ItemTag.item_id)).all())
+        TagRepository(session).rebuild()
+        session.commit()
+        assert sorted(session.exec(select(ItemTag.tag, ItemTag.item_type, ItemTag.item_id)).all()) == incremental
+        assert len(incremental) == 3
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import random
+
+from src.models.theme_schemas import ThemeLayoutResponse
+from src.services.fast_json import encode_model, encode_theme_layout
+from src.services.payload_cache import payload_cache
+from src.services.theme_layout import compute_layout
+
+LAYOUT_URL = '/api/v1/sessions/layout-session/themes/layout'
+THEMES_URL = '/api/v1/sessions/layout-session/themes'
+T0 = datetime(2026, 3, 1, tzinfo=UTC)
+
+
+def _at(hours: float) -> datetime:
+    return T0 + timedelta(hours=hours)
+
+
+def _row(theme_id: str, start: float, end: float, top: float, bottom: float) -> tuple:
+    # Stored rows come back naive.
+    return (theme_id, _at(start).replace(tzinfo=None), _at(end).replace(tzinfo=None), top, bottom)
+
+
+def _segments(entries) -> dict[str, list[tuple[float, float, list[str], list[str]]]]:
+    def hours(value: datetime) -> float:
+        return (value - T0).total_seconds() / 3600
+
+    return {
+        entry.theme_id: [(hours(s.start), hours(s.end), list(s.occludes), list(s.occluded_by)) for s in entry.segments]
+        for entry in entries
+    }
+
+
+ROWS = [
+    _row('a', 0, 10, 0, 100),
+    _row('b', 5, 15, 50, 150),
+    _row('c', 5, 8, 200, 300),
+    # Starts exactly where 'a' ends, so the two never overlap.
+    _row('d', 10, 20, 0, 100),
+]
+
+
+def test_segments_split_where_vertical_neighbours_change() -> None:
+    layout = compute_layout(ROWS, _at(0), _at(20))
+    assert [(entry.theme_id, entry.z_index) for entry in layout] == [('a', 1), ('b', 2), ('c', 3), ('d', 4)]
+    assert _segments(layout) == {
+        'a': [(0, 5, [], []), (5, 10, [], ['b'])],
+        'b': [(5, 10, ['a'], []), (10, 15, [], ['d'])],
+        'c': [(5, 8, [], [])],
+        'd': [(10, 15, ['b'], []), (15, 20, [], [])],
+    }
+
+
+def test_segments_are_clipped_to_the_window() -> None:
+    assert _segments(compute_layout(ROWS, _at(6), _at(12))) == {
+        'a': [(6, 10, [], ['b'])],
+        'b': [(6, 10, ['a'], []), (10, 12, [], ['d'])],
+        'c': [(6, 8, [], [])],
+        'd': [(10, 12, ['b'], [])],
+    }
+
+
+def test_sweep_matches_pairwise_overlap_checks() -> None:
+    generator = random.Random(7)
+    rows = []
+    for index in range(60):
+        start = generator.randint(0, 90)
+        top = generator.randint(0, 30) * 8
+        rows.append(_row(f't{index:02d}', start, start + generator.randint(1, 20), top, top + generator.randint(3, 12) * 8))
+    layout = compute_layout(rows, _at(0), _at(100))
+
+    for entry in layout:
+        rank = entry.z_index - 1
+        _, _, _, top, bottom = rows[rank]
+        covered = 0.0
+        for segment in entry.segments:
+            covered += (segment.end - segment.start).total_seconds()
+            middle = (segment.start + (segment.end - segment.start) / 2).replace(tzinfo=None)
+            neighbours = [
+                (other_rank, other[0])
+                for other_rank, other in enumerate(rows)
+                if other_rank != rank and other[1] <= middle < other[2] and other[3] < bottom and top < other[4]
+            ]
+            assert list(segment.occludes) == [theme_id for other_rank, theme_id in neighbours if other_rank < rank]
+            assert list(segment.occluded_by) == [theme_id for other_rank, theme_id in neighbours if other_rank > rank]
+        start, end = rows[rank][1], min(rows[rank][2], _at(100).replace(tzinfo=None))
+        assert covered == (end - start).total_seconds()
+
+    # The direct encoder renders exactly what the response model would.
+    body = encode_theme_layout('s', 3, layout)
+    assert body == encode_model(ThemeLayoutResponse.model_validate_json(body)).encode()
+
+
+def test_layout_endpoint_is_cached_per_session_version(client, sample_theme_payload) -> None:
+    lower = client.post(THEMES_URL, json={**sample_theme_payload, 'priority': 10}).json()
+    upper = client.post(THEMES_URL, json={**sample_theme_payload, 'priority': 20, 'topPx': 160, 'bottomPx': 240}).json()
+    params = {'from': '2026-03-01T00:00:00Z', 'to': '2026-03-03T00:00:00Z'}
+
+    first = client.get(LAYOUT_URL, params=params)
+    assert first.status_code == 200
+    body = first.json()
+    assert body['version'] == 2
+    assert [(theme['id'], theme['zIndex']) for theme in body['themes']] == [(lower['id'], 1), (upper['id'], 2)]
+    assert body['themes'][0]['segments'] == [
+        {'start': '2026-03-01T00:00:00Z', 'end': '2026-03-02T00:00:00Z', 'occludes': [], 'occludedBy': [upper['id']]}
+    ]
+
+    assert client.get(LAYOUT_URL, params=params).content == first.content
+    assert payload_cache.stats().hits == 1
+    assert client.get(LAYOUT_URL, params=params, headers={'If-None-Match': first.headers['etag']}).status_code == 304
+
+    assert client.patch(f"{THEMES_URL}/{upper['id']}", json={'topPx': 400, 'bottomPx': 480}).status_code == 200
+    moved = client.get(LAYOUT_URL, params=params).json()
+    assert moved['version'] == 3
+    assert moved['themes'][0]['segments'][0]['occludedBy'] == []
+
+    assert client.get(LAYOUT_URL, params={'from': params['to'], 'to': params['from']}).status_code == 422
+
+    mixed = client.get(LAYOUT_URL, params={'from': '2026-03-01T00:00:00', 'to': '2026-03-01T14:00:00+02:00'})
+    assert mixed.status_code == 200
+    assert mixed.json()['themes'][0]['segments'][0]['end'] == '2026-03-01T12:00:00Z'
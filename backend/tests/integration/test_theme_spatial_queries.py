@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from src.db import engine
+
+
+def _create_theme(client, session_id: str = 'spatial-session', **overrides) -> str:
+    payload = {
+        'startTime': '2026-03-01T00:00:00Z',
+        'endTime': '2026-03-10T00:00:00Z',
+        'title': 'Theme',
+        'color': '#3b82f6',
+        'opacity': 0.25,
+        'priority': 100,
+        'topPx': 120,
+        'bottomPx': 216,
+        **overrides,
+    }
+    created = client.post(f'/api/v1/sessions/{session_id}/themes', json=payload)
+    assert created.status_code == 201
+    return created.json()['id']
+
+
+def test_viewport_returns_intersecting_themes_in_render_order(client) -> None:
+    high = _create_theme(client, title='High', priority=900)
+    low = _create_theme(client, title='Low', priority=10)
+    _create_theme(client, title='Later', startTime='2026-05-01T00:00:00Z', endTime='2026-05-02T00:00:00Z')
+    _create_theme(client, title='Below', topPx=400, bottomPx=480)
+    _create_theme(client, session_id='other-session', title='Other session')
+
+    response = client.get(
+        '/api/v1/sessions/spatial-session/themes/viewport',
+        params={'from': '2026-03-05T00:00:00Z', 'to': '2026-03-06T00:00:00Z', 'topPx': 0, 'bottomPx': 300},
+    )
+    assert response.status_code == 200
+    assert [theme['id'] for theme in response.json()['themes']] == [low, high]
+
+
+def test_hit_picks_topmost_theme_and_follows_updates(client) -> None:
+    low = _create_theme(client, title='Low', priority=10)
+    high = _create_theme(client, title='High', priority=900)
+
+    hit = client.get(
+        '/api/v1/sessions/spatial-session/themes/hit',
+        params={'at': '2026-03-05T00:00:00Z', 'px': 150},
+    )
+    assert hit.status_code == 200
+    assert hit.json()['theme']['id'] == high
+
+    moved = client.patch(
+        f'/api/v1/sessions/spatial-session/themes/{high}',
+        json={'startTime': '2026-06-01T00:00:00Z', 'endTime': '2026-06-02T00:00:00Z'},
+    )
+    assert moved.status_code == 200
+    hit = client.get(
+        '/api/v1/sessions/spatial-session/themes/hit',
+        params={'at': '2026-03-05T00:00:00Z', 'px': 150},
+    )
+    assert hit.json()['theme']['id'] == low
+
+    assert client.delete(f'/api/v1/sessions/spatial-session/themes/{low}').status_code == 204
+    hit = client.get(
+        '/api/v1/sessions/spatial-session/themes/hit',
+        params={'at': '2026-03-05T00:00:00Z', 'px': 150},
+    )
+    assert hit.json() == {'sessionId': 'spatial-session', 'theme': None}
+
+
+def test_rtree_rows_track_theme_rows(client) -> None:
+    first = _create_theme(client)
+    _create_theme(client)
+    assert client.delete(f'/api/v1/sessions/spatial-session/themes/{first}').status_code == 204
+
+    with Session(engine) as session:
+        indexed = session.exec(text('SELECT theme_id FROM theme_rtree')).all()
+        stored = session.exec(text('SELECT id FROM theme')).all()
+    assert sorted(row[0] for row in indexed) == sorted(row[0] for row in stored)
+
+
+def test_viewport_rejects_inverted_window(client) -> None:
+    response = client.get(
+        '/api/v1/sessions/spatial-session/themes/viewport',
+        params={'from': '2026-03-06T00:00:00Z', 'to': '2026-03-05T00:00:00Z'},
+    )
+    assert response.status_code == 422
+
+
+def test_offset_times_are_looked_up_in_utc(client) -> None:
+    theme_id = _create_theme(client, startTime='2026-01-01T03:00:00Z', endTime='2026-01-01T04:00:00Z')
+
+    # 03:30Z; read as wall clock, 05:30 would fall after the theme.
+    hit = client.get(
+        '/api/v1/sessions/spatial-session/themes/hit',
+        params={'at': '2026-01-01T05:30:00+02:00', 'px': 150},
+    )
+    assert hit.json()['theme']['id'] == theme_id
+
+    for window in (
+        {'from': '2026-01-01T05:00:00+02:00', 'to': '2026-01-01T06:00:00+02:00'},
+        {'from': '2026-01-01T03:00:00', 'to': '2026-01-01T06:00:00+02:00'},
+    ):
+        response = client.get('/api/v1/sessions/spatial-session/themes/viewport', params=window)
+        assert response.status_code == 200
+        assert [theme['id'] for theme in response.json()['themes']] == [theme_id]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from sqlmodel import Session, select
+
+from src.db import engine
+from src.models.histogram import TimelineHistogramBucket
+from src.repositories.histogram_repository import HistogramRepository
+
+SESSION_URL = '/api/v1/sessions/histogram-session'
+
+
+def _create_memory(client, anchor: dict[str, str]) -> str:
+    created = client.post(f'{SESSION_URL}/memories', json={'anchor': anchor, 'title': 'Memory'})
+    assert created.status_code == 201
+    return created.json()['id']
+
+
+def _buckets(client, granularity: str, **params: str) -> list[tuple[str, int, int]]:
+    response = client.get(f'{SESSION_URL}/histogram', params={'granularity': granularity, **params})
+    assert response.status_code == 200
+    return [(bucket['start'][:10], bucket['memories'], bucket['themes']) for bucket in response.json()['buckets']]
+
+
+def test_histogram_counts_memories_and_themes_per_bucket(client, sample_theme_payload) -> None:
+    _create_memory(client, {'type': 'point', 'timestamp': '2026-03-01T10:00:00Z'})
+    _create_memory(client, {'type': 'point', 'timestamp': '2026-03-01T23:00:00Z'})
+    _create_memory(client, {'type': 'range', 'start': '2026-04-15T00:00:00Z', 'end': '2026-05-01T00:00:00Z'})
+    assert client.post(f'{SESSION_URL}/themes', json=sample_theme_payload).status_code == 201
+
+    assert _buckets(client, 'month') == [('2026-03-01', 2, 1), ('2026-04-01', 1, 0)]
+    assert _buckets(client, 'year') == [('2026-01-01', 3, 1)]
+    assert _buckets(client, 'day', **{'from': '2026-03-01T12:00:00Z', 'to': '2026-03-31T00:00:00Z'}) == [
+        ('2026-03-01', 2, 1)
+    ]
+    assert len(_buckets(client, 'hour')) == 4
+
+
+def test_histogram_follows_moves_deletes_and_batches(client) -> None:
+    moved = _create_memory(client, {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'})
+    removed = _create_memory(client, {'type': 'point', 'timestamp': '2026-03-02T00:00:00Z'})
+
+    patched = client.patch(
+        f'{SESSION_URL}/memories/{moved}',
+        json={'anchor': {'type': 'point', 'timestamp': '2027-01-05T00:00:00Z'}},
+    )
+    assert patched.status_code == 200
+    assert client.delete(f'{SESSION_URL}/memories/{removed}').status_code == 204
+    assert _buckets(client, 'year') == [('2027-01-01', 1, 0)]
+
+    batch = client.post(
+        f'{SESSION_URL}/memories:batch',
+        json={
+            'operations': [
+                {'op': 'create', 'memory': {'anchor': {'type': 'point', 'timestamp': '2028-02-01T00:00:00Z'}, 'title': 'A'}},
+                {'op': 'patch', 'id': moved, 'memory': {'anchor': {'type': 'point', 'timestamp': '2028-06-01T00:00:00Z'}}},
+            ]
+        },
+    )
+    assert batch.status_code == 200
+    assert _buckets(client, 'year') == [('2028-01-01', 2, 0)]
+
+
+def test_rebuild_matches_incremental_rollup(client, sample_theme_payload) -> None:
+    for day in (1, 2, 2, 9):
+        _create_memory(client, {'type': 'point', 'timestamp': f'2026-03-{day:02d}T06:00:00Z'})
+    assert client.post(f'{SESSION_URL}/themes', json=sample_theme_payload).status_code == 201
+
+    def snapshot(session: Session) -> list[tuple]:
+        rows = session.exec(select(TimelineHistogramBucket)).all()
+        return sorted(
+            (row.session_id, row.granularity, row.bucket_start, row.memory_count, row.theme_count)
+            for row in rows
+            if row.memory_count or row.theme_count
+        )
+
+    with Session(engine) as session:
+        incremental = snapshot(session)
+        HistogramRepository(session).rebuild()
+        session.commit()
+        assert snapshot(session) == incremental
+
+
+def test_histogram_rejects_unknown_granularity(client) -> None:
+    response = client.get(f'{SESSION_URL}/histogram', params={'granularity': 'week'})
+    assert response.status_code == 422
+
+
+def test_histogram_window_with_an_offset_is_read_in_utc(client) -> None:
+    _create_memory(client, {'type': 'point', 'timestamp': '2026-03-01T23:00:00Z'})
+
+    # 00:30+02:00 is 22:30Z on March 1st, so that day's bucket is in the window.
+    assert _buckets(client, 'day', **{'from': '2026-03-02T00:30:00+02:00', 'to': '2026-03-03T00:00:00'}) == [
+        ('2026-03-01', 1, 0)
+    ]
+    inverted = client.get(
+        f'{SESSION_URL}/histogram',
+        params={'granularity': 'day', 'from': '2026-03-02T00:30:00+02:00', 'to': '2026-03-01T12:00:00'},
+    )
+    assert inverted.status_code == 422
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from src.db import engine
+from src.models.memory import TimelineSession
+from src.models.memory_schemas import MemoryCreateRequest, MemoryUpdateRequest
+from src.models.theme_schemas import ThemeCreateRequest
+from src.repositories.memory_repository import MemoryRepository
+from src.repositories.theme_repository import ThemeRepository
+
+
+@contextmanager
+def _recorded(session: Session):
+    statements: list[str] = []
+    commits: list[None] = []
+
+    def on_execute(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement.lstrip().split(None, 1)[0].upper())
+
+    event.listen(engine, 'before_cursor_execute', on_execute)
+    event.listen(session, 'after_commit', lambda _session: commits.append(None))
+    try:
+        yield statements, commits
+    finally:
+        event.remove(engine, 'before_cursor_execute', on_execute)
+
+
+def test_first_create_in_a_session_reads_nothing_and_commits_once(sample_theme_payload) -> None:
+    memory_payload = MemoryCreateRequest.model_validate(
+        {'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': 'First'}
+    )
+    with Session(engine) as session:
+        with _recorded(session) as (statements, commits):
+            memory = MemoryRepository(session).create_memory('fresh-session', memory_payload)
+            # The returned row is usable after commit without a reload.
+            assert memory.title == 'First'
+        assert 'SELECT' not in statements
+        assert len(commits) == 1
+
+        with _recorded(session) as (statements, commits):
+            theme = ThemeRepository(session).create_theme('fresh-session', ThemeCreateRequest.model_validate(sample_theme_payload))
+            assert theme.top_px == 120
+        assert 'SELECT' not in statements
+        assert len(commits) == 1
+
+        stored = session.exec(select(TimelineSession).where(TimelineSession.id == 'fresh-session')).one()
+        assert stored.version == 2
+
+
+def test_update_reads_the_row_once_and_skips_the_refresh() -> None:
+    with Session(engine) as session:
+        repo = MemoryRepository(session)
+        memory = repo.create_memory(
+            'update-session',
+            MemoryCreateRequest.model_validate({'anchor': {'type': 'point', 'timestamp': '2026-03-01T00:00:00Z'}, 'title': 'A'}),
+        )
+        with _recorded(session) as (statements, commits):
+            updated = repo.update_memory('update-session', memory.id, MemoryUpdateRequest(title='B'))
+            assert updated is not None and updated.title == 'B'
+        assert statements.count('SELECT') == 1
+        assert len(commits) == 1